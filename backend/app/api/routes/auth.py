@@ -11,11 +11,11 @@ router = APIRouter(prefix='/api/auth', tags=['auth'])
 
 
 @router.post('/firebase-login', response_model=AuthTokenOut)
-def firebase_login(
+async def firebase_login(
     payload: FirebaseLoginIn,
     auth_service: AuthService = Depends(get_auth_service),
 ) -> AuthTokenOut:
-    return auth_service.firebase_login(payload.firebase_id_token)
+    return await auth_service.firebase_login_async(payload.firebase_id_token)
 
 
 @router.post('/dev-login', response_model=AuthTokenOut)
@@ -1,28 +1,57 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import time
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 
+from app.core.cache import SingleFlightCache
 from app.core.config import settings
-from app.core.container import get_night_service
-from app.core.security import create_access_token, require_user
-from app.core.telegram_webapp import TelegramInitDataError, verify_telegram_init_data
+from app.core.container import get_auth_service, get_leaderboard_cache, get_night_service
+from app.core.cursors import CursorError
+from app.core.security import decode_access_token_with_expiry, require_user
+from app.core.telegram_webapp import TelegramInitDataError, verify_telegram_init_data_cached
 from app.domain.schemas import (
     ClickerAuthOut,
     ClickerAuthTelegramIn,
     ClickerDailyBonusOut,
     ClickerLeaderboardOut,
+    ClickerLogoutIn,
+    ClickerLogoutOut,
     ClickerLotteryAdminOut,
     ClickerLotteryOut,
+    ClickerRankOut,
     ClickerReferralApplyIn,
     ClickerReferralOut,
+    ClickerRefreshIn,
+    ClickerState,
     ClickerStateOut,
+    ClickerTapBatchIn,
     ClickerTapIn,
     ClickerTapOut,
+    ClickerTokenOut,
 )
+from app.infrastructure.repositories.night_repository import ClickerSession
+from app.services.auth_service import AuthService
 from app.services.night_service import NightService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix='/api/clicker', tags=['clicker'])
 
 
@@ -30,12 +59,13 @@ router = APIRouter(prefix='/api/clicker', tags=['clicker'])
 def clicker_auth_telegram(
     payload: ClickerAuthTelegramIn,
     night_service: NightService = Depends(get_night_service),
+    auth_service: AuthService = Depends(get_auth_service),
 ) -> ClickerAuthOut:
     start_param: str | None = None
 
     if payload.init_data:
         try:
-            tg_user = verify_telegram_init_data(
+            tg_user, verified_before = verify_telegram_init_data_cached(
                 init_data=payload.init_data,
                 bot_token=settings.telegram_bot_token,
                 max_age_seconds=settings.telegram_initdata_max_age_seconds,
@@ -46,12 +76,15 @@ def clicker_auth_telegram(
                 detail=str(exc),
             ) from exc
 
-        state = night_service.upsert_clicker_user(
-            telegram_user_id=tg_user.telegram_user_id,
-            username=tg_user.username,
-            first_name=tg_user.first_name,
-            last_name=tg_user.last_name,
-        )
+        if verified_before:
+            state = night_service.get_clicker_state(night_service.build_clicker_uid(tg_user.telegram_user_id))
+        else:
+            state = night_service.upsert_clicker_user(
+                telegram_user_id=tg_user.telegram_user_id,
+                username=tg_user.username,
+                first_name=tg_user.first_name,
+                last_name=tg_user.last_name,
+            )
         start_param = tg_user.start_param
     else:
         if settings.app_env.lower() == 'production':
@@ -72,16 +105,35 @@ def clicker_auth_telegram(
             last_name=payload.last_name,
         )
 
-    token, expires_in = create_access_token(uid=state.uid)
+    session = auth_service.issue_session(state.uid)
     return ClickerAuthOut(
-        access_token=token,
-        expires_in=expires_in,
+        access_token=session.access_token,
+        expires_in=session.expires_in,
+        refresh_token=session.refresh_token,
+        refresh_expires_in=session.refresh_expires_in,
         uid=state.uid,
         start_param=start_param,
         state=state,
     )
 
 
+@router.post('/auth/refresh', response_model=ClickerTokenOut)
+def clicker_auth_refresh(
+    payload: ClickerRefreshIn,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> ClickerTokenOut:
+    return auth_service.refresh_session(payload.refresh_token)
+
+
+@router.post('/auth/logout', response_model=ClickerLogoutOut)
+def clicker_auth_logout(
+    payload: ClickerLogoutIn,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> ClickerLogoutOut:
+    revoked = auth_service.revoke_session(payload.refresh_token, all_sessions=payload.all_sessions)
+    return ClickerLogoutOut(revoked=revoked)
+
+
 @router.get('/state', response_model=ClickerStateOut)
 def clicker_state(
     current_user=Depends(require_user),
@@ -117,6 +169,120 @@ def clicker_tap(
     )
 
 
+@router.post('/tap/batch', response_model=ClickerTapOut)
+def clicker_tap_batch(
+    payload: ClickerTapBatchIn,
+    current_user=Depends(require_user),
+    night_service: NightService = Depends(get_night_service),
+) -> ClickerTapOut:
+    (
+        ok,
+        accepted_taps,
+        rejected_taps,
+        added_points,
+        throttled,
+        message,
+        state,
+    ) = night_service.tap_clicker_batch(
+        uid=current_user.uid,
+        timestamps_ms=payload.timestamps_ms,
+        buckets=payload.buckets,
+    )
+    return ClickerTapOut(
+        ok=ok,
+        accepted_taps=accepted_taps,
+        rejected_taps=rejected_taps,
+        added_points=added_points,
+        throttled=throttled,
+        message=message,
+        state=state,
+    )
+
+
+@router.websocket('/ws')
+async def clicker_ws(
+    websocket: WebSocket,
+    token: str = Query(default=''),
+    night_service: NightService = Depends(get_night_service),
+) -> None:
+    try:
+        current_user, expires_at = decode_access_token_with_expiry(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        session, state = await run_in_threadpool(night_service.open_clicker_session, current_user.uid)
+        last_state = state.model_dump(mode='json')
+        await websocket.send_json({'ok': True, 'state': last_state})
+
+        while True:
+            frame = await websocket.receive()
+            if frame['type'] == 'websocket.disconnect':
+                return
+            if expires_at and time.time() >= expires_at:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason='Access token expired.')
+                return
+            raw = frame.get('text')
+            if raw is None:
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason='Send text frames.')
+                return
+            try:
+                message = json.loads(raw)
+                result = await run_in_threadpool(_tap_from_ws_message, night_service, session, message)
+            except (ValueError, ValidationError):
+                await websocket.send_json({'ok': False, 'message': 'Invalid tap message.'})
+                continue
+
+            ok, accepted_taps, rejected_taps, added_points, throttled, message_text, state = result
+            delta = {}
+            if state is not None:
+                current_state = state.model_dump(mode='json')
+                delta = {key: value for key, value in current_state.items() if last_state.get(key) != value}
+                last_state = current_state
+            await websocket.send_json(
+                {
+                    'ok': ok,
+                    'accepted_taps': accepted_taps,
+                    'rejected_taps': rejected_taps,
+                    'added_points': added_points,
+                    'throttled': throttled,
+                    'message': message_text,
+                    'delta': delta,
+                }
+            )
+    except WebSocketDisconnect:
+        return
+    except Exception:
+        logger.exception('Clicker websocket failed for %s', current_user.uid)
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass
+
+
+def _tap_from_ws_message(
+    night_service: NightService,
+    session: ClickerSession,
+    message: object,
+) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
+    if not isinstance(message, dict):
+        raise ValueError('Tap message must be an object')
+
+    if 'timestamps_ms' in message or 'buckets' in message:
+        batch = ClickerTapBatchIn.model_validate(message)
+        return night_service.tap_clicker_batch(
+            uid=session.uid,
+            timestamps_ms=batch.timestamps_ms,
+            buckets=batch.buckets,
+            session=session,
+        )
+
+    payload = ClickerTapIn.model_validate(message)
+    return night_service.tap_clicker(uid=session.uid, taps=payload.taps, session=session)
+
+
 @router.post('/daily-bonus', response_model=ClickerDailyBonusOut)
 def clicker_daily_bonus(
     current_user=Depends(require_user),
@@ -147,10 +313,92 @@ def clicker_apply_referral(
 @router.get('/leaderboard', response_model=ClickerLeaderboardOut)
 def clicker_leaderboard(
     limit: int = Query(default=50, ge=1, le=50),
+    cursor: str | None = Query(default=None, max_length=512),
+    period: str = Query(default='all', pattern='^(all|daily|weekly)$'),
+    if_none_match: str | None = Header(default=None),
+    night_service: NightService = Depends(get_night_service),
+    leaderboard_cache: SingleFlightCache[tuple[str, int], tuple[bytes, str]] = Depends(get_leaderboard_cache),
+) -> Response:
+    if cursor and period != 'all':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Cursor pagination is only available for the all-time leaderboard',
+        )
+
+    try:
+        if cursor:
+            body, etag = _render_leaderboard(night_service, limit, cursor=cursor)
+        else:
+            body, etag = leaderboard_cache.get_or_load(
+                (period, limit),
+                lambda: _render_leaderboard(night_service, limit, period=period),
+            )
+    except CursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'max-age={int(settings.clicker_leaderboard_cache_ttl_seconds)}',
+    }
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+@router.get('/rank', response_model=ClickerRankOut)
+def clicker_rank(
+    above: int = Query(default=5, ge=0, le=25),
+    below: int = Query(default=5, ge=0, le=25),
+    current_user=Depends(require_user),
     night_service: NightService = Depends(get_night_service),
-) -> ClickerLeaderboardOut:
-    items = night_service.clicker_leaderboard(limit=limit)
-    return ClickerLeaderboardOut(items=items, updated_at=datetime.now(timezone.utc))
+) -> ClickerRankOut:
+    rank, total, me, neighbours_above, neighbours_below, snapshot_at = night_service.clicker_rank(
+        uid=current_user.uid,
+        above=above,
+        below=below,
+    )
+    return ClickerRankOut(
+        rank=rank,
+        total=total,
+        me=me,
+        above=neighbours_above,
+        below=neighbours_below,
+        snapshot_at=snapshot_at,
+    )
+
+
+def _render_leaderboard(
+    night_service: NightService,
+    limit: int,
+    cursor: str | None = None,
+    period: str = 'all',
+) -> tuple[bytes, str]:
+    next_cursor: str | None = None
+    period_id: str | None = None
+    snapshot_at: datetime | None = None
+    if period == 'all':
+        items, next_cursor, snapshot_at = night_service.clicker_leaderboard_page(limit=limit, cursor=cursor)
+    else:
+        period_id, items = night_service.clicker_period_leaderboard(period=period, limit=limit)
+
+    items_json = json.dumps([item.model_dump(mode='json') for item in items], separators=(',', ':'))
+    etag = f'W/"{hashlib.sha1(f"{period_id or period}:{items_json}".encode("utf-8")).hexdigest()}"'
+    now = datetime.now(timezone.utc)
+    body = ClickerLeaderboardOut(
+        items=items,
+        updated_at=snapshot_at or now,
+        next_cursor=next_cursor,
+        period=period,
+        period_id=period_id,
+        snapshot_at=snapshot_at,
+        snapshot_age_seconds=round((now - snapshot_at).total_seconds(), 3) if snapshot_at else None,
+    ).model_dump_json()
+    return body.encode('utf-8'), etag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {candidate.strip() for candidate in if_none_match.split(',')}
+    return '*' in candidates or etag in candidates or etag.removeprefix('W/') in candidates
 
 
 @router.post('/lottery/enter', response_model=ClickerLotteryOut)
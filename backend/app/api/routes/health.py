@@ -4,8 +4,9 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter
 
+from app.core.cache import cache_stats
 from app.core.config import settings
-from app.domain.schemas import HealthOut
+from app.domain.schemas import CacheStatsOut, HealthOut
 
 router = APIRouter(tags=['health'])
 
@@ -13,3 +14,8 @@ router = APIRouter(tags=['health'])
 @router.get('/health', response_model=HealthOut)
 def healthcheck() -> HealthOut:
     return HealthOut(service=settings.app_name, timestamp=datetime.now(timezone.utc))
+
+
+@router.get('/health/caches', response_model=CacheStatsOut)
+def cache_metrics() -> CacheStatsOut:
+    return CacheStatsOut(caches=cache_stats())
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.core.container import get_night_service
+from app.core.geohash import BoundingBox
 from app.core.security import enforce_uid, get_current_user_optional
-from app.domain.schemas import LocationCreateOut, LocationsOut, UserLocationCreate
+from app.domain.schemas import (
+    LocationCluster,
+    LocationClustersOut,
+    LocationCreateOut,
+    LocationsOut,
+    NearbyLocation,
+    NearbyLocationsOut,
+    UserLocationCreate,
+)
 from app.services.night_service import NightService
 
 router = APIRouter(prefix='/api/locations', tags=['locations'])
@@ -12,9 +21,91 @@ router = APIRouter(prefix='/api/locations', tags=['locations'])
 
 @router.get('', response_model=LocationsOut)
 def list_locations(
+    bbox: str | None = Query(default=None, max_length=128, description='min_lng,min_lat,max_lng,max_lat'),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=512),
+    since: str | None = Query(default=None, max_length=512),
+    uid: str | None = Query(default=None, min_length=2, max_length=128),
+    city: str | None = Query(default=None, min_length=1, max_length=128),
     night_service: NightService = Depends(get_night_service),
 ) -> LocationsOut:
-    return LocationsOut(locations=night_service.list_locations())
+    if uid is not None or city is not None:
+        if bbox is not None or cursor is not None or since is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='uid and city filters only support limit',
+            )
+        return LocationsOut(locations=night_service.filter_locations(uid=uid, city=city, limit=limit or 200))
+
+    if since is not None and (bbox is not None or cursor is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='since cannot be combined with bbox or cursor',
+        )
+
+    try:
+        if since is not None or (bbox is None and limit is None and cursor is None):
+            locations, sync_token, has_more = night_service.sync_locations(since=since, limit=limit or 500)
+            return LocationsOut(locations=locations, sync_token=sync_token, has_more=has_more)
+
+        locations, next_cursor = night_service.list_locations_page(
+            bbox=BoundingBox.parse(bbox) if bbox is not None else None,
+            limit=limit or 200,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return LocationsOut(locations=locations, next_cursor=next_cursor)
+
+
+@router.get('/nearby', response_model=NearbyLocationsOut)
+def nearby_locations(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius_km: float = Query(default=5.0, gt=0, le=500),
+    limit: int = Query(default=50, ge=1, le=200),
+    night_service: NightService = Depends(get_night_service),
+) -> NearbyLocationsOut:
+    found = night_service.nearby_locations(lat=lat, lng=lng, radius_km=radius_km, limit=limit)
+    return NearbyLocationsOut(
+        locations=[
+            NearbyLocation(**location.model_dump(), distance_km=round(distance, 3))
+            for distance, location in found
+        ]
+    )
+
+
+@router.get('/clusters', response_model=LocationClustersOut)
+def location_clusters(
+    zoom: int = Query(ge=0, le=22),
+    bbox: str = Query(max_length=128, description='min_lng,min_lat,max_lng,max_lat'),
+    night_service: NightService = Depends(get_night_service),
+) -> LocationClustersOut:
+    try:
+        grid_zoom, clusters = night_service.location_clusters(zoom=zoom, bbox=BoundingBox.parse(bbox))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return LocationClustersOut(
+        zoom=grid_zoom,
+        clusters=[
+            LocationCluster(
+                lat=round(cluster.lat, 6),
+                lng=round(cluster.lng, 6),
+                count=cluster.count,
+                cell=f'{cluster.zoom}/{cluster.x}/{cluster.y}',
+            )
+            for cluster in clusters
+        ],
+    )
+
+
+@router.get('/{uid}/history', response_model=LocationsOut)
+def location_history(
+    uid: str,
+    limit: int = Query(default=20, ge=1, le=500),
+    night_service: NightService = Depends(get_night_service),
+) -> LocationsOut:
+    return LocationsOut(locations=night_service.location_history(uid=uid, limit=limit))
 
 
 @router.post('', response_model=LocationCreateOut)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_registry: dict[str, 'TtlLruCache'] = {}
+
+
+class TtlLruCache(Generic[K, V]):
+    def __init__(self, name: str, max_size: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: K) -> V | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if expires_at <= now:
+                del self._items[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: K) -> V | None:
+        with self._lock:
+            item = self._items.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else max(0.0, ttl_seconds)
+        if ttl <= 0:
+            self.pop(key)
+            return
+
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            item = self._items.pop(key, None)
+        return item[1] if item is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'size': len(self._items),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class SingleFlightCache(Generic[K, V]):
+    def __init__(self, name: str, max_size: int, ttl_seconds: float) -> None:
+        self._cache: TtlLruCache[K, V] = TtlLruCache(name=name, max_size=max_size, ttl_seconds=ttl_seconds)
+        self._locks: dict[K, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.loads = 0
+
+    def get_or_load(self, key: K, loader: Callable[[], V]) -> V:
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            value = self._cache.peek(key)
+            if value is not None:
+                return value
+            value = loader()
+            self.loads += 1
+            self._cache.set(key, value)
+            return value
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
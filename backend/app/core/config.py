@@ -33,11 +33,28 @@ class Settings:
     jwt_secret: str = os.getenv('JWT_SECRET', 'change-me-night-mode-dev-secret')
     jwt_algorithm: str = os.getenv('JWT_ALGORITHM', 'HS256')
     jwt_expire_minutes: int = int(os.getenv('JWT_EXPIRE_MINUTES', '120'))
+    jwt_cache_size: int = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+    jwt_refresh_expire_days: int = int(os.getenv('JWT_REFRESH_EXPIRE_DAYS', '30'))
+    refresh_token_store: str = os.getenv('REFRESH_TOKEN_STORE', 'sqlite')
+    refresh_token_store_path: str = os.getenv('REFRESH_TOKEN_STORE_PATH', '/tmp/night_mode_refresh_tokens.sqlite3')
 
     use_firebase: bool = _as_bool(os.getenv('USE_FIREBASE', 'true'), True)
     firebase_project_id: str = os.getenv('FIREBASE_PROJECT_ID', '')
     firebase_service_account_file: str = os.getenv('FIREBASE_SERVICE_ACCOUNT_FILE', '')
     firebase_service_account_json: str = os.getenv('FIREBASE_SERVICE_ACCOUNT_JSON', '')
+    firebase_token_verifier: str = os.getenv('FIREBASE_TOKEN_VERIFIER', 'cached')
+    firebase_certs_url: str = os.getenv(
+        'FIREBASE_CERTS_URL',
+        'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com',
+    )
+    firebase_token_cache_size: int = int(os.getenv('FIREBASE_TOKEN_CACHE_SIZE', '10000'))
+
+    locations_memory_capacity: int = int(os.getenv('LOCATIONS_MEMORY_CAPACITY', '100000'))
+    locations_live_mode: bool = _as_bool(os.getenv('LOCATIONS_LIVE_MODE', 'false'), False)
+    locations_history_size: int = int(os.getenv('LOCATIONS_HISTORY_SIZE', '20'))
+    locations_coalesce_meters: float = float(os.getenv('LOCATIONS_COALESCE_METERS', '50'))
+    locations_coalesce_seconds: float = float(os.getenv('LOCATIONS_COALESCE_SECONDS', '60'))
+    locations_cluster_shards: int = int(os.getenv('LOCATIONS_CLUSTER_SHARDS', '8'))
 
     geocoder_primary: str = os.getenv('GEOCODER_PRIMARY', 'nominatim')
     geocoder_timeout_seconds: int = int(os.getenv('GEOCODER_TIMEOUT_SECONDS', '1'))
@@ -67,11 +84,29 @@ class Settings:
     telegram_webapp_url: str = os.getenv('TELEGRAM_WEBAPP_URL', '')
     telegram_webapp_title: str = os.getenv('TELEGRAM_WEBAPP_TITLE', 'NM Clicker')
     telegram_initdata_max_age_seconds: int = int(os.getenv('TELEGRAM_INITDATA_MAX_AGE_SECONDS', '86400'))
+    telegram_initdata_cache_ttl_seconds: float = float(os.getenv('TELEGRAM_INITDATA_CACHE_TTL_SECONDS', '300'))
+    telegram_initdata_cache_size: int = int(os.getenv('TELEGRAM_INITDATA_CACHE_SIZE', '10000'))
 
     clicker_max_taps_per_second: int = int(os.getenv('CLICKER_MAX_TAPS_PER_SECOND', '10'))
+    clicker_tap_burst: int = int(os.getenv('CLICKER_TAP_BURST', '10'))
+    clicker_tap_batch_max_seconds: int = int(os.getenv('CLICKER_TAP_BATCH_MAX_SECONDS', '10'))
+    clicker_rate_limiter: str = os.getenv('CLICKER_RATE_LIMITER', 'memory')
+    clicker_rate_limiter_path: str = os.getenv('CLICKER_RATE_LIMITER_PATH', '/tmp/night_mode_rate_limit.sqlite3')
     clicker_referral_bonus_levels: int = int(os.getenv('CLICKER_REFERRAL_BONUS_LEVELS', '3'))
     clicker_daily_bonus_per_level: int = int(os.getenv('CLICKER_DAILY_BONUS_PER_LEVEL', '1000'))
+    clicker_level_curve: str = os.getenv('CLICKER_LEVEL_CURVE', '30:10000,*:100000')
     clicker_admin_token: str = os.getenv('CLICKER_ADMIN_TOKEN', '')
+    clicker_write_behind: bool = _as_bool(os.getenv('CLICKER_WRITE_BEHIND', 'false'), False)
+    clicker_flush_interval_seconds: float = float(os.getenv('CLICKER_FLUSH_INTERVAL_SECONDS', '2'))
+    clicker_flush_max_dirty: int = int(os.getenv('CLICKER_FLUSH_MAX_DIRTY', '200'))
+    clicker_point_shards: int = int(os.getenv('CLICKER_POINT_SHARDS', '0'))
+    clicker_rating_rollup_seconds: float = float(os.getenv('CLICKER_RATING_ROLLUP_SECONDS', '5'))
+    clicker_record_cache_size: int = int(os.getenv('CLICKER_RECORD_CACHE_SIZE', '0'))
+    clicker_record_cache_ttl_seconds: float = float(os.getenv('CLICKER_RECORD_CACHE_TTL_SECONDS', '30'))
+    clicker_leaderboard_cache_ttl_seconds: float = float(os.getenv('CLICKER_LEADERBOARD_CACHE_TTL_SECONDS', '2'))
+    clicker_rank_snapshot_seconds: float = float(os.getenv('CLICKER_RANK_SNAPSHOT_SECONDS', '60'))
+    clicker_leaderboard_snapshot_seconds: float = float(os.getenv('CLICKER_LEADERBOARD_SNAPSHOT_SECONDS', '0'))
+    clicker_leaderboard_snapshot_size: int = int(os.getenv('CLICKER_LEADERBOARD_SNAPSHOT_SIZE', '50'))
 
     @property
     def cors_origins(self) -> list[str]:
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from functools import lru_cache
 
+from app.core.cache import SingleFlightCache
+from app.core.config import settings
+from app.core.token_revocation import TokenRevocationList, build_token_revocation_list
 from app.infrastructure.repositories.night_repository import NightRepository
 from app.services.auth_service import AuthService
 from app.services.night_service import NightService
@@ -12,11 +15,25 @@ def get_repository() -> NightRepository:
     return NightRepository()
 
 
+@lru_cache(maxsize=1)
+def get_token_revocations() -> TokenRevocationList:
+    return build_token_revocation_list(settings)
+
+
 @lru_cache(maxsize=1)
 def get_auth_service() -> AuthService:
-    return AuthService()
+    return AuthService(revocations=get_token_revocations())
 
 
 @lru_cache(maxsize=1)
 def get_night_service() -> NightService:
     return NightService(repository=get_repository())
+
+
+@lru_cache(maxsize=1)
+def get_leaderboard_cache() -> SingleFlightCache[tuple[str, int], tuple[bytes, str]]:
+    return SingleFlightCache(
+        name='clicker_leaderboard',
+        max_size=64,
+        ttl_seconds=settings.clicker_leaderboard_cache_ttl_seconds,
+    )
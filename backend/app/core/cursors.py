@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, size: int) -> list[Any]:
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise CursorError('Invalid cursor') from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise CursorError('Invalid cursor')
+    return values
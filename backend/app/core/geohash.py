@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+PREFIX_END = '~'
+EARTH_RADIUS_KM = 6371.0088
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    @classmethod
+    def parse(cls, raw: str) -> BoundingBox:
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(part) for part in raw.split(','))
+        except ValueError as exc:
+            raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat') from exc
+        if not all(math.isfinite(value) for value in (min_lng, min_lat, max_lng, max_lat)):
+            raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+        if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+            raise ValueError('bbox is outside of valid coordinates')
+        return cls(min_lat=min_lat, min_lng=min_lng, max_lat=max_lat, max_lng=max_lng)
+
+    def parts(self) -> list[BoundingBox]:
+        if self.min_lng <= self.max_lng:
+            return [self]
+        return [
+            BoundingBox(self.min_lat, self.min_lng, self.max_lat, 180.0),
+            BoundingBox(self.min_lat, -180.0, self.max_lat, self.max_lng),
+        ]
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if not self.min_lat <= lat <= self.max_lat:
+            return False
+        if self.min_lng <= self.max_lng:
+            return self.min_lng <= lng <= self.max_lng
+        return lng >= self.min_lng or lng <= self.max_lng
+
+
+def encode(lat: float, lng: float, precision: int = 9) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars: list[str] = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def decode_bounds(geohash: str) -> BoundingBox:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lng_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return BoundingBox(min_lat=lat_range[0], min_lng=lng_range[0], max_lat=lat_range[1], max_lng=lng_range[1])
+
+
+def children(geohash: str) -> list[str]:
+    return [geohash + char for char in _BASE32]
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def cover(bbox: BoundingBox, max_cells: int = 8, max_precision: int = 9) -> list[str]:
+    best = ['']
+    for precision in range(1, max_precision + 1):
+        cells = _cells(bbox, precision, max_cells)
+        if cells is None:
+            break
+        best = cells
+    return best
+
+
+def _cells(bbox: BoundingBox, precision: int, max_cells: int) -> list[str] | None:
+    height, width = cell_size(precision)
+    result: set[str] = set()
+    for part in bbox.parts():
+        rows = _span(part.min_lat + 90.0, part.max_lat + 90.0, height, 180.0)
+        columns = _span(part.min_lng + 180.0, part.max_lng + 180.0, width, 360.0)
+        if len(result) + len(rows) * len(columns) > max_cells:
+            return None
+        for row in rows:
+            for column in columns:
+                result.add(encode(-90.0 + (row + 0.5) * height, -180.0 + (column + 0.5) * width, precision))
+    return sorted(result)
+
+
+def _span(low: float, high: float, size: float, total: float) -> range:
+    last = int(total / size) - 1
+    return range(min(last, int(low // size)), min(last, int(high // size)) + 1)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lng2 - lng1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lng: float, radius_km: float) -> BoundingBox:
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = lat - dlat
+    max_lat = lat + dlat
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if min_lat <= -90 or max_lat >= 90 or cos_lat <= 1e-9:
+        return BoundingBox(max(-90.0, min_lat), -180.0, min(90.0, max_lat), 180.0)
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if dlng >= 180:
+        return BoundingBox(min_lat, -180.0, max_lat, 180.0)
+    min_lng = (lng - dlng + 540.0) % 360.0 - 180.0
+    max_lng = (lng + dlng + 540.0) % 360.0 - 180.0
+    return BoundingBox(min_lat, min_lng, max_lat, max_lng)
+
+
+def min_distance_km(lat: float, lng: float, bbox: BoundingBox) -> float:
+    lat_gap = max(0.0, bbox.min_lat - lat, lat - bbox.max_lat)
+    lng_gap = 0.0
+    if not bbox.contains(bbox.min_lat, lng):
+        lng_gap = min((bbox.min_lng - lng) % 360.0, (lng - bbox.max_lng) % 360.0)
+    cross_track = 0.0
+    if lng_gap < 90.0:
+        cross_track = math.asin(min(1.0, math.cos(math.radians(lat)) * math.sin(math.radians(lng_gap))))
+    return EARTH_RADIUS_KM * max(math.radians(lat_gap), cross_track)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Sequence
+
+from app.core.config import Settings
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+
+@dataclass(frozen=True)
+class CurveSegment:
+    until_level: int | None
+    step: int
+    growth: float = 1.0
+
+
+class LevelCurve:
+    def __init__(self, segments: Sequence[CurveSegment]) -> None:
+        if not segments:
+            raise ValueError('Level curve needs at least one segment')
+
+        thresholds = [0]
+        previous_level = 1
+        for position, segment in enumerate(segments):
+            if segment.step <= 0 or segment.growth < 1.0:
+                raise ValueError('Level curve steps must be positive and non-decreasing')
+            if segment.until_level is None:
+                if position != len(segments) - 1:
+                    raise ValueError('Only the last level curve segment can be open-ended')
+                if segment.growth != 1.0:
+                    raise ValueError('The open-ended level curve segment needs a constant step')
+                continue
+            if segment.until_level <= previous_level:
+                raise ValueError('Level curve segments must cover increasing levels')
+
+            step = float(segment.step)
+            for _ in range(previous_level, segment.until_level):
+                thresholds.append(thresholds[-1] + int(step))
+                step *= segment.growth
+            previous_level = segment.until_level
+
+        tail = segments[-1]
+        self.thresholds: tuple[int, ...] = tuple(thresholds)
+        self.tail_step: int | None = tail.step if tail.until_level is None else None
+        self.max_level: int | None = None if self.tail_step is not None else len(self.thresholds)
+        self._array = np.asarray(self.thresholds, dtype=np.int64) if np is not None else None
+
+    @classmethod
+    def parse(cls, spec: str) -> LevelCurve:
+        segments: list[CurveSegment] = []
+        for chunk in spec.split(','):
+            chunk = chunk.strip()
+            if not chunk:
+                continue
+            try:
+                level_raw, step_raw = chunk.split(':', 1)
+                step_part, _, growth_part = step_raw.strip().partition('x')
+                segments.append(
+                    CurveSegment(
+                        until_level=None if level_raw.strip() == '*' else int(level_raw),
+                        step=int(step_part),
+                        growth=float(growth_part) if growth_part else 1.0,
+                    )
+                )
+            except ValueError as exc:
+                raise ValueError(f'Invalid level curve segment: {chunk!r}') from exc
+        return cls(segments)
+
+    def points_for_level(self, level: int) -> int:
+        level = max(1, level)
+        if level <= len(self.thresholds):
+            return self.thresholds[level - 1]
+        if self.tail_step is None:
+            return self.thresholds[-1]
+        return self.thresholds[-1] + (level - len(self.thresholds)) * self.tail_step
+
+    def level_from_points(self, points: int) -> int:
+        points = max(0, points)
+        last = self.thresholds[-1]
+        if self.tail_step is not None and points >= last:
+            return len(self.thresholds) + (points - last) // self.tail_step
+        return bisect_right(self.thresholds, points)
+
+    def next_level_points(self, level: int) -> int | None:
+        level = max(1, level)
+        if self.max_level is not None and level >= self.max_level:
+            return None
+        return self.points_for_level(level + 1)
+
+    def levels_from_points(self, points: Sequence[int]):
+        if self._array is None:
+            return [self.level_from_points(int(value)) for value in points]
+
+        values = np.maximum(np.asarray(points, dtype=np.int64), 0)
+        levels = np.searchsorted(self._array, values, side='right')
+        if self.tail_step is not None:
+            last = self.thresholds[-1]
+            tail = values >= last
+            levels[tail] = len(self.thresholds) + (values[tail] - last) // self.tail_step
+        return levels
+
+
+def build_level_curve(settings: Settings) -> LevelCurve:
+    return LevelCurve.parse(settings.clicker_level_curve)
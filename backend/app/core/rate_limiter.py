@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from app.core.config import Settings
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    granted: int
+    remaining: float
+    capacity: int
+    used: int = 0
+
+
+class TokenBucketLimiter(ABC):
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = max(0.001, float(rate))
+        self.capacity = max(1, int(capacity))
+        self._max_capacity = self.capacity
+
+    @abstractmethod
+    def acquire(
+        self,
+        key: str,
+        requested: int = 1,
+        now: float | None = None,
+        capacity: int | None = None,
+        recent: int | None = None,
+    ) -> RateLimitDecision:
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+    def _take(
+        self,
+        tokens: float,
+        updated_at: float,
+        requested: int,
+        now: float,
+        capacity: int,
+    ) -> tuple[int, float]:
+        elapsed = max(0.0, now - updated_at)
+        available = min(float(capacity), tokens + elapsed * self.rate)
+        granted = max(0, min(int(requested), int(available)))
+        return granted, available - granted
+
+    @staticmethod
+    def _count_second(second: int, count: int, granted: int, now: float, recent: int | None) -> tuple[int, int]:
+        current = int(now)
+        accepted = granted if recent is None else max(0, min(granted, int(recent)))
+        return current, (count if second == current else 0) + accepted
+
+    def _capacity(self, capacity: int | None) -> int:
+        capacity = self.capacity if capacity is None else max(1, int(capacity))
+        self._max_capacity = max(self._max_capacity, capacity)
+        return capacity
+
+    @property
+    def _idle_seconds(self) -> float:
+        return self._max_capacity / self.rate
+
+
+class InMemoryTokenBucket(TokenBucketLimiter):
+    def __init__(self, rate: float, capacity: int, max_keys: int = 100_000) -> None:
+        super().__init__(rate=rate, capacity=capacity)
+        self.max_keys = max(1, max_keys)
+        self._buckets: dict[str, tuple[float, float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        key: str,
+        requested: int = 1,
+        now: float | None = None,
+        capacity: int | None = None,
+        recent: int | None = None,
+    ) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        capacity = self._capacity(capacity)
+        with self._lock:
+            tokens, updated_at, second, count = self._buckets.get(key, (float(capacity), now, 0, 0))
+            granted, remaining = self._take(tokens, updated_at, requested, now, capacity)
+            second, count = self._count_second(second, count, granted, now, recent)
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (remaining, now, second, count)
+        return RateLimitDecision(granted=granted, remaining=remaining, capacity=capacity, used=count)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def _prune(self, now: float) -> None:
+        deadline = now - self._idle_seconds
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[1] >= deadline
+        }
+
+
+class SqliteTokenBucket(TokenBucketLimiter):
+    _PRUNE_EVERY = 1_000
+
+    def __init__(self, path: str, rate: float, capacity: int) -> None:
+        super().__init__(rate=rate, capacity=capacity)
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS token_buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, '
+            'second INTEGER NOT NULL DEFAULT 0, second_count INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in connection.execute('PRAGMA table_info(token_buckets)')}
+        for column in ('second', 'second_count'):
+            if column not in columns:
+                connection.execute(f'ALTER TABLE token_buckets ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+
+    def acquire(
+        self,
+        key: str,
+        requested: int = 1,
+        now: float | None = None,
+        capacity: int | None = None,
+        recent: int | None = None,
+    ) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        capacity = self._capacity(capacity)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated_at, second, second_count FROM token_buckets WHERE key = ?',
+                (key,),
+            ).fetchone()
+            tokens, updated_at, second, count = row if row is not None else (float(capacity), now, 0, 0)
+            granted, remaining = self._take(tokens, updated_at, requested, now, capacity)
+            second, count = self._count_second(second, count, granted, now, recent)
+            connection.execute(
+                'INSERT INTO token_buckets (key, tokens, updated_at, second, second_count) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at, '
+                'second = excluded.second, second_count = excluded.second_count',
+                (key, remaining, now, second, count),
+            )
+            self._calls += 1
+            if self._calls % self._PRUNE_EVERY == 0:
+                connection.execute(
+                    'DELETE FROM token_buckets WHERE updated_at < ?',
+                    (now - self._idle_seconds,),
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return RateLimitDecision(granted=granted, remaining=remaining, capacity=capacity, used=count)
+
+    def reset(self) -> None:
+        connection = self._connection()
+        connection.execute('DELETE FROM token_buckets')
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+
+def build_tap_rate_limiter(settings: Settings) -> TokenBucketLimiter:
+    rate = max(1, settings.clicker_max_taps_per_second)
+    capacity = max(1, settings.clicker_tap_burst)
+    if settings.clicker_rate_limiter.strip().lower() == 'sqlite':
+        return SqliteTokenBucket(path=settings.clicker_rate_limiter_path, rate=rate, capacity=capacity)
+    return InMemoryTokenBucket(rate=rate, capacity=capacity)
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import secrets
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
@@ -8,17 +11,26 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt import InvalidTokenError
 
+from .cache import TtlLruCache
 from .config import settings
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-@dataclass
+@dataclass(frozen=True)
 class AuthUser:
     uid: str
     email: str | None = None
 
 
+@dataclass(frozen=True)
+class RefreshClaims:
+    uid: str
+    jti: str
+    issued_at: float
+    expires_at: float
+
+
 def create_access_token(uid: str, email: str | None = None) -> tuple[str, int]:
     now = datetime.now(timezone.utc)
     expires_at = now + timedelta(minutes=settings.jwt_expire_minutes)
@@ -34,7 +46,67 @@ def create_access_token(uid: str, email: str | None = None) -> tuple[str, int]:
     return token, int((expires_at - now).total_seconds())
 
 
+def create_refresh_token(uid: str) -> tuple[str, int]:
+    now = time.time()
+    expires_at = now + settings.jwt_refresh_expire_days * 86400
+    payload = {
+        'sub': uid,
+        'typ': 'refresh',
+        'jti': secrets.token_urlsafe(16),
+        'iss': 'night-mode-api',
+        'aud': 'night-mode-refresh',
+        'iat': now,
+        'exp': int(expires_at),
+    }
+    token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return token, int(expires_at - now)
+
+
+def decode_refresh_token(token: str) -> RefreshClaims:
+    try:
+        payload = jwt.decode(
+            token,
+            settings.jwt_secret,
+            algorithms=[settings.jwt_algorithm],
+            audience='night-mode-refresh',
+            issuer='night-mode-api',
+            options={'require': ['sub', 'jti', 'iat', 'exp']},
+        )
+    except InvalidTokenError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid refresh token') from exc
+
+    uid, jti = payload.get('sub'), payload.get('jti')
+    if payload.get('typ') != 'refresh' or not isinstance(uid, str) or not isinstance(jti, str):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid refresh token')
+    return RefreshClaims(uid=uid, jti=jti, issued_at=float(payload['iat']), expires_at=float(payload['exp']))
+
+
+_verified_tokens: TtlLruCache[bytes, AuthUser] | None = (
+    TtlLruCache(name='verified_tokens', max_size=settings.jwt_cache_size, ttl_seconds=settings.jwt_expire_minutes * 60)
+    if settings.jwt_cache_size > 0
+    else None
+)
+
+
 def decode_access_token(token: str) -> AuthUser:
+    if _verified_tokens is None:
+        return _verify_access_token(token)[0]
+
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    user = _verified_tokens.get(digest)
+    if user is not None:
+        return user
+
+    user, expires_at = _verify_access_token(token)
+    _verified_tokens.set(digest, user, ttl_seconds=expires_at - time.time())
+    return user
+
+
+def decode_access_token_with_expiry(token: str) -> tuple[AuthUser, float]:
+    return _verify_access_token(token)
+
+
+def _verify_access_token(token: str) -> tuple[AuthUser, float]:
     try:
         payload = jwt.decode(
             token,
@@ -54,7 +126,10 @@ def decode_access_token(token: str) -> AuthUser:
     if email is not None and not isinstance(email, str):
         email = None
 
-    return AuthUser(uid=uid, email=email)
+    expires_at = payload.get('exp')
+    if not isinstance(expires_at, (int, float)):
+        expires_at = 0.0
+    return AuthUser(uid=uid, email=email), float(expires_at)
 
 
 def get_current_user_optional(
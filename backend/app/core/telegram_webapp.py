@@ -5,8 +5,12 @@ import hmac
 import json
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import parse_qsl
 
+from app.core.cache import TtlLruCache
+from app.core.config import settings
+
 
 class TelegramInitDataError(ValueError):
     pass
@@ -19,6 +23,28 @@ class TelegramInitDataUser:
     first_name: str | None
     last_name: str | None
     start_param: str | None
+    auth_date: int = 0
+
+
+_verified_init_data: TtlLruCache[bytes, TelegramInitDataUser] | None = (
+    TtlLruCache(
+        name='telegram_init_data',
+        max_size=settings.telegram_initdata_cache_size,
+        ttl_seconds=settings.telegram_initdata_cache_ttl_seconds,
+    )
+    if settings.telegram_initdata_cache_size > 0 and settings.telegram_initdata_cache_ttl_seconds > 0
+    else None
+)
+
+
+@lru_cache(maxsize=8)
+def _secret_key(bot_token: str) -> bytes:
+    return hmac.new(b'WebAppData', bot_token.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _check_age(auth_date: int, max_age_seconds: int, now: int) -> None:
+    if max_age_seconds > 0 and now - auth_date > max_age_seconds:
+        raise TelegramInitDataError('initData is expired')
 
 
 def verify_telegram_init_data(
@@ -37,9 +63,8 @@ def verify_telegram_init_data(
         raise TelegramInitDataError('initData hash is missing')
 
     data_check_string = '\n'.join(f'{key}={parsed[key]}' for key in sorted(parsed))
-    secret_key = hmac.new(b'WebAppData', bot_token.encode('utf-8'), hashlib.sha256).digest()
     expected_hash = hmac.new(
-        secret_key,
+        _secret_key(bot_token),
         data_check_string.encode('utf-8'),
         hashlib.sha256,
     ).hexdigest()
@@ -56,9 +81,7 @@ def verify_telegram_init_data(
     if auth_date <= 0:
         raise TelegramInitDataError('initData auth_date is missing')
 
-    now = int(time.time())
-    if max_age_seconds > 0 and now - auth_date > max_age_seconds:
-        raise TelegramInitDataError('initData is expired')
+    _check_age(auth_date, max_age_seconds, int(time.time()))
 
     raw_user = parsed.get('user')
     if not raw_user:
@@ -95,5 +118,27 @@ def verify_telegram_init_data(
         first_name=first_name,
         last_name=last_name,
         start_param=start_param,
+        auth_date=auth_date,
     )
 
+
+def verify_telegram_init_data_cached(
+    init_data: str,
+    bot_token: str,
+    max_age_seconds: int = 86400,
+) -> tuple[TelegramInitDataUser, bool]:
+    if _verified_init_data is None or not bot_token.strip():
+        return verify_telegram_init_data(init_data, bot_token, max_age_seconds), False
+
+    digest = hashlib.sha256(f'{bot_token}\n{init_data}'.encode('utf-8')).digest()
+    cached = _verified_init_data.get(digest)
+    if cached is not None:
+        _check_age(cached.auth_date, max_age_seconds, int(time.time()))
+        return cached, True
+
+    user = verify_telegram_init_data(init_data, bot_token, max_age_seconds)
+    ttl = _verified_init_data.ttl_seconds
+    if max_age_seconds > 0:
+        ttl = min(ttl, user.auth_date + max_age_seconds - time.time())
+    _verified_init_data.set(digest, user, ttl_seconds=ttl)
+    return user, False
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from app.core.config import Settings
+
+
+class TokenRevocationList(ABC):
+    @abstractmethod
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        ...
+
+    @abstractmethod
+    def revoke_user(self, uid: str, issued_before: float) -> None:
+        ...
+
+    @abstractmethod
+    def is_revoked(self, jti: str, uid: str, issued_at: float) -> bool:
+        ...
+
+
+class InMemoryTokenRevocationList(TokenRevocationList):
+    _PRUNE_EVERY = 1_000
+
+    def __init__(self) -> None:
+        self._revoked: dict[str, float] = {}
+        self._users: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.started_at = float(int(time.time()))
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        with self._lock:
+            if jti in self._revoked:
+                return False
+            self._revoked[jti] = expires_at
+            self._calls += 1
+            if self._calls % self._PRUNE_EVERY == 0:
+                now = time.time()
+                self._revoked = {key: value for key, value in self._revoked.items() if value > now}
+            return True
+
+    def revoke_user(self, uid: str, issued_before: float) -> None:
+        with self._lock:
+            self._users[uid] = max(issued_before, self._users.get(uid, 0.0))
+
+    def is_revoked(self, jti: str, uid: str, issued_at: float) -> bool:
+        if issued_at < self.started_at:
+            return True
+        with self._lock:
+            return jti in self._revoked or issued_at < self._users.get(uid, 0.0)
+
+
+class SqliteTokenRevocationList(TokenRevocationList):
+    _PRUNE_EVERY = 1_000
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS revoked_tokens (jti TEXT PRIMARY KEY, expires_at REAL NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS revoked_users (uid TEXT PRIMARY KEY, issued_before REAL NOT NULL)'
+        )
+        connection.execute('CREATE TABLE IF NOT EXISTS revocation_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)')
+        connection.execute(
+            "INSERT OR IGNORE INTO revocation_meta (key, value) VALUES ('started_at', ?)",
+            (float(int(time.time())),),
+        )
+        self.started_at = connection.execute(
+            "SELECT value FROM revocation_meta WHERE key = 'started_at'"
+        ).fetchone()[0]
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        connection = self._connection()
+        cursor = connection.execute(
+            'INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)',
+            (jti, expires_at),
+        )
+        self._calls += 1
+        if self._calls % self._PRUNE_EVERY == 0:
+            connection.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (time.time(),))
+        return cursor.rowcount == 1
+
+    def revoke_user(self, uid: str, issued_before: float) -> None:
+        self._connection().execute(
+            'INSERT INTO revoked_users (uid, issued_before) VALUES (?, ?) '
+            'ON CONFLICT(uid) DO UPDATE SET issued_before = MAX(issued_before, excluded.issued_before)',
+            (uid, issued_before),
+        )
+
+    def is_revoked(self, jti: str, uid: str, issued_at: float) -> bool:
+        if issued_at < self.started_at:
+            return True
+        connection = self._connection()
+        if connection.execute('SELECT 1 FROM revoked_tokens WHERE jti = ?', (jti,)).fetchone() is not None:
+            return True
+        row = connection.execute('SELECT issued_before FROM revoked_users WHERE uid = ?', (uid,)).fetchone()
+        return row is not None and issued_at < row[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+
+def build_token_revocation_list(settings: Settings) -> TokenRevocationList:
+    if settings.refresh_token_store.strip().lower() == 'memory':
+        return InMemoryTokenRevocationList()
+    return SqliteTokenRevocationList(path=settings.refresh_token_store_path)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class HealthOut(BaseModel):
@@ -11,6 +12,11 @@ class HealthOut(BaseModel):
     timestamp: datetime
 
 
+class CacheStatsOut(BaseModel):
+    ok: bool = True
+    caches: dict[str, dict[str, float]]
+
+
 class UserLocation(BaseModel):
     id: str
     uid: str
@@ -34,6 +40,31 @@ class UserLocationCreate(BaseModel):
 class LocationsOut(BaseModel):
     ok: bool = True
     locations: list[UserLocation]
+    next_cursor: str | None = None
+    sync_token: str | None = None
+    has_more: bool = False
+
+
+class NearbyLocation(UserLocation):
+    distance_km: float
+
+
+class NearbyLocationsOut(BaseModel):
+    ok: bool = True
+    locations: list[NearbyLocation]
+
+
+class LocationCluster(BaseModel):
+    lat: float
+    lng: float
+    count: int = Field(ge=1)
+    cell: str
+
+
+class LocationClustersOut(BaseModel):
+    ok: bool = True
+    zoom: int
+    clusters: list[LocationCluster]
 
 
 class LocationCreateOut(BaseModel):
@@ -132,15 +163,54 @@ class ClickerAuthOut(BaseModel):
     access_token: str
     token_type: str = 'bearer'
     expires_in: int
+    refresh_token: str | None = None
+    refresh_expires_in: int | None = None
     uid: str
     start_param: str | None = None
     state: ClickerState
 
 
+class ClickerRefreshIn(BaseModel):
+    refresh_token: str = Field(min_length=16, max_length=4096)
+
+
+class ClickerLogoutIn(BaseModel):
+    refresh_token: str = Field(min_length=16, max_length=4096)
+    all_sessions: bool = False
+
+
+class ClickerTokenOut(BaseModel):
+    ok: bool = True
+    access_token: str
+    token_type: str = 'bearer'
+    expires_in: int
+    refresh_token: str
+    refresh_expires_in: int
+    uid: str
+
+
+class ClickerLogoutOut(BaseModel):
+    ok: bool = True
+    revoked: bool
+
+
 class ClickerTapIn(BaseModel):
     taps: int = Field(default=1, ge=1, le=50)
 
 
+class ClickerTapBatchIn(BaseModel):
+    timestamps_ms: list[int] = Field(default_factory=list, max_length=600)
+    buckets: list[Annotated[int, Field(ge=0, le=50)]] = Field(default_factory=list, max_length=600)
+
+    @model_validator(mode='after')
+    def _require_taps(self) -> 'ClickerTapBatchIn':
+        if bool(self.timestamps_ms) == bool(self.buckets):
+            raise ValueError('Provide either timestamps_ms or buckets')
+        if self.buckets and sum(self.buckets) == 0:
+            raise ValueError('buckets contain no taps')
+        return self
+
+
 class ClickerTapOut(BaseModel):
     ok: bool
     accepted_taps: int = Field(default=0, ge=0)
@@ -148,7 +218,7 @@ class ClickerTapOut(BaseModel):
     added_points: int = Field(default=0, ge=0)
     throttled: bool = False
     message: str
-    state: ClickerState
+    state: ClickerState | None = None
 
 
 class ClickerDailyBonusOut(BaseModel):
@@ -190,6 +260,21 @@ class ClickerLeaderboardOut(BaseModel):
     ok: bool = True
     items: list[ClickerLeaderboardItem]
     updated_at: datetime
+    next_cursor: str | None = None
+    period: str = 'all'
+    period_id: str | None = None
+    snapshot_at: datetime | None = None
+    snapshot_age_seconds: float | None = None
+
+
+class ClickerRankOut(BaseModel):
+    ok: bool = True
+    rank: int | None = None
+    total: int = Field(ge=0)
+    me: ClickerLeaderboardItem | None = None
+    above: list[ClickerLeaderboardItem]
+    below: list[ClickerLeaderboardItem]
+    snapshot_at: datetime | None = None
 
 
 class ClickerLotteryEntry(BaseModel):
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+from functools import lru_cache
 from typing import Any
 
 from app.core.config import settings
+from app.infrastructure.firebase_tokens import FirebaseTokenError, FirebaseTokenVerifier
+
+logger = logging.getLogger(__name__)
 
 try:
     import firebase_admin
@@ -67,7 +73,65 @@ def get_firestore_client() -> Any | None:
         return None
 
 
+@lru_cache
+def get_firebase_token_verifier() -> FirebaseTokenVerifier | None:
+    if not settings.use_firebase or settings.firebase_token_verifier != 'cached':
+        return None
+    if not settings.firebase_project_id:
+        return None
+    return FirebaseTokenVerifier(
+        project_id=settings.firebase_project_id,
+        certs_url=settings.firebase_certs_url,
+        cache_size=settings.firebase_token_cache_size,
+    )
+
+
+def start_firebase_token_verifier() -> None:
+    verifier = get_firebase_token_verifier()
+    if verifier is None:
+        return
+    try:
+        verifier.keys.refresh()
+    except Exception:
+        logger.warning('Could not prefetch Firebase public keys', exc_info=True)
+    verifier.start()
+
+
+def close_firebase_token_verifier() -> None:
+    verifier = get_firebase_token_verifier()
+    if verifier is not None:
+        verifier.close()
+
+
 def verify_firebase_token(id_token: str) -> dict[str, Any] | None:
+    verifier = get_firebase_token_verifier()
+    if verifier is not None:
+        try:
+            return verifier.verify(id_token)
+        except FirebaseTokenError:
+            return None
+        except Exception:
+            logger.warning('Firebase ID token verification failed', exc_info=True)
+            return None
+
+    return _verify_with_admin_sdk(id_token)
+
+
+async def verify_firebase_token_async(id_token: str) -> dict[str, Any] | None:
+    verifier = get_firebase_token_verifier()
+    if verifier is not None:
+        try:
+            return await verifier.verify_async(id_token)
+        except FirebaseTokenError:
+            return None
+        except Exception:
+            logger.warning('Firebase ID token verification failed', exc_info=True)
+            return None
+
+    return await asyncio.to_thread(_verify_with_admin_sdk, id_token)
+
+
+def _verify_with_admin_sdk(id_token: str) -> dict[str, Any] | None:
     if not init_firebase() or auth is None:
         return None
 
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+from jwt import InvalidTokenError
+
+from app.core.cache import TtlLruCache
+from app.infrastructure.stores.periodic_worker import PeriodicWorker
+
+
+class FirebaseTokenError(ValueError):
+    pass
+
+
+class FirebaseKeyCache:
+    _MAX_AGE = re.compile(r'max-age=(\d+)')
+
+    def __init__(
+        self,
+        certs_url: str,
+        timeout_seconds: float = 5.0,
+        default_max_age_seconds: float = 3600.0,
+        min_refresh_interval_seconds: float = 30.0,
+    ) -> None:
+        self.certs_url = certs_url
+        self.timeout_seconds = timeout_seconds
+        self.default_max_age_seconds = default_max_age_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.fetches = 0
+
+    @property
+    def fresh(self) -> bool:
+        return bool(self._keys) and time.monotonic() < self._expires_at
+
+    def get(self, kid: str) -> Any | None:
+        generation = self.generation
+        key = self._keys.get(kid) if self.fresh else None
+        if key is None and self.refresh_allowed(kid):
+            self.refresh(generation)
+            key = self._keys.get(kid)
+        return key
+
+    def lookup(self, kid: str) -> Any | None:
+        return self._keys.get(kid) if self.fresh else None
+
+    def refresh_allowed(self, kid: str) -> bool:
+        if not self.fresh:
+            return True
+        return kid not in self._keys and time.monotonic() - self._fetched_at >= self.min_refresh_interval_seconds
+
+    def refresh_due(self, margin: float = 0.2) -> bool:
+        if not self._keys:
+            return True
+        lifetime = self._expires_at - self._fetched_at
+        return time.monotonic() >= self._expires_at - lifetime * margin
+
+    def refresh(self, seen_generation: int | None = None) -> None:
+        with self._lock:
+            if seen_generation is not None and self.generation != seen_generation:
+                return
+            request = urllib.request.Request(self.certs_url, headers={'Accept': 'application/json'})
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+                payload = json.loads(response.read().decode('utf-8'))
+                cache_control = response.headers.get('Cache-Control', '')
+
+            keys = {
+                kid: load_pem_x509_certificate(pem.encode('utf-8')).public_key()
+                for kid, pem in payload.items()
+            }
+            match = self._MAX_AGE.search(cache_control)
+            max_age = float(match.group(1)) if match else self.default_max_age_seconds
+            now = time.monotonic()
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + max_age
+            self.generation += 1
+            self.fetches += 1
+
+
+class FirebaseTokenVerifier:
+    def __init__(
+        self,
+        project_id: str,
+        certs_url: str,
+        cache_size: int = 10_000,
+        refresh_check_seconds: float = 60.0,
+        timeout_seconds: float = 5.0,
+    ) -> None:
+        self.project_id = project_id
+        self.issuer = f'https://securetoken.google.com/{project_id}'
+        self.keys = FirebaseKeyCache(certs_url=certs_url, timeout_seconds=timeout_seconds)
+        self._claims: TtlLruCache[bytes, dict] | None = (
+            TtlLruCache(name='firebase_claims', max_size=cache_size, ttl_seconds=3600)
+            if cache_size > 0
+            else None
+        )
+        self._fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='firebase-keys')
+        self._refresher = PeriodicWorker(
+            name='firebase-key-refresher',
+            interval_seconds=refresh_check_seconds,
+            task=self._refresh_if_due,
+        )
+
+    def start(self) -> None:
+        self._refresher.start()
+
+    def close(self) -> None:
+        self._refresher.close()
+        self._fetcher.shutdown(wait=False)
+
+    def verify(self, id_token: str) -> dict:
+        digest, cached = self._cached(id_token)
+        if cached is not None:
+            return dict(cached)
+
+        kid = self._kid(id_token)
+        key = self.keys.get(kid)
+        return self._decode(id_token, digest, key)
+
+    async def verify_async(self, id_token: str) -> dict:
+        digest, cached = self._cached(id_token)
+        if cached is not None:
+            return dict(cached)
+
+        kid = self._kid(id_token)
+        generation = self.keys.generation
+        key = self.keys.lookup(kid)
+        if key is None and self.keys.refresh_allowed(kid):
+            await asyncio.wrap_future(self._fetcher.submit(self.keys.refresh, generation))
+            key = self.keys.lookup(kid)
+        return self._decode(id_token, digest, key)
+
+    def _refresh_if_due(self) -> None:
+        generation = self.keys.generation
+        if self.keys.refresh_due():
+            self.keys.refresh(generation)
+
+    def _cached(self, id_token: str) -> tuple[bytes, dict | None]:
+        digest = hashlib.sha256(id_token.encode('utf-8')).digest()
+        if self._claims is None:
+            return digest, None
+        return digest, self._claims.get(digest)
+
+    @staticmethod
+    def _kid(id_token: str) -> str:
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except InvalidTokenError as exc:
+            raise FirebaseTokenError('Malformed Firebase ID token') from exc
+        kid = header.get('kid')
+        if header.get('alg') != 'RS256' or not isinstance(kid, str):
+            raise FirebaseTokenError('Firebase ID token has an unexpected header')
+        return kid
+
+    def _decode(self, id_token: str, digest: bytes, key: Any | None) -> dict:
+        if key is None:
+            raise FirebaseTokenError('Firebase ID token was signed by an unknown key')
+        try:
+            claims = jwt.decode(
+                id_token,
+                key=key,
+                algorithms=['RS256'],
+                audience=self.project_id,
+                issuer=self.issuer,
+                options={'require': ['exp', 'iat', 'sub']},
+            )
+        except InvalidTokenError as exc:
+            raise FirebaseTokenError(f'Invalid Firebase ID token: {exc}') from exc
+
+        subject = claims.get('sub')
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise FirebaseTokenError('Firebase ID token has an invalid subject')
+        auth_time = claims.get('auth_time')
+        if isinstance(auth_time, (int, float)) and auth_time > time.time() + 60:
+            raise FirebaseTokenError('Firebase ID token auth_time is in the future')
+        claims['uid'] = subject
+
+        if self._claims is not None:
+            self._claims.set(digest, claims, ttl_seconds=float(claims['exp']) - time.time())
+        return dict(claims)
@@ -0,0 +1,593 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from app.core import geohash
+from app.core.config import settings
+from app.core.cursors import CursorError, decode_cursor, encode_cursor
+from app.core.geocoder import ReverseGeocoder
+from app.core.geohash import BoundingBox
+from app.domain.schemas import UserLocation, UserLocationCreate
+from app.infrastructure.stores.cluster_grid import Cluster, ClusterGrid, cell_ranges, range_size
+from app.infrastructure.stores.live_location_set import LiveLocationSet
+from app.infrastructure.stores.location_ring import LocationRing
+from app.infrastructure.stores.memory_store import store
+from app.infrastructure.stores.sorted_index import SortedIndex
+from app.infrastructure.stores.spatial_index import SpatialGridIndex
+
+try:
+    from firebase_admin import firestore
+    from google.api_core import exceptions as google_exceptions
+except Exception:  # pragma: no cover
+    firestore = None
+    google_exceptions = None
+
+
+class LocationRepository:
+    _PLACEHOLDER_VALUES = {
+        '',
+        'unknown',
+        'custom point',
+        'custom',
+        'n/a',
+        'none',
+        'null',
+    }
+    _LOCATIONS_LEGACY_LIMIT = 2000
+    _LOCATIONS_PAGE_LIMIT = 500
+    _LOCATIONS_BBOX_CELLS = 16
+    _LOCATION_GEOHASH_PRECISION = 9
+    _LOCATION_GRID_DEGREES = 0.25
+    _NEARBY_CELL_LIMIT = 64
+    _LOCATION_CLUSTERS_COLLECTION = 'location_clusters'
+    _CLUSTER_MAX_ZOOM = 14
+    _CLUSTER_CELL_BITS = 2
+    _CLUSTERS_MAX_CELLS = 4096
+    _CLUSTER_SHARDED_MAX_ZOOM = 7
+    _LIVE_LOCATION_ATTEMPTS = 5
+
+    def __init__(self, db) -> None:
+        self.db = db
+        self.geocoder = ReverseGeocoder(settings=settings)
+        self._location_index: SpatialGridIndex[UserLocation] = SpatialGridIndex(self._LOCATION_GRID_DEGREES)
+        self._location_geohashes = SortedIndex()
+        self._live_locations = LiveLocationSet()
+        self._location_history: dict[str, deque[UserLocation]] = {}
+        self._live_locations_lock = threading.Lock()
+        self._location_id_lock = threading.Lock()
+        self._last_location_stamp = 0
+        self._location_clusters = ClusterGrid(max_zoom=self._CLUSTER_MAX_ZOOM, cell_bits=self._CLUSTER_CELL_BITS)
+        self._cluster_shard_cursor = itertools.count(random.randrange(max(1, settings.locations_cluster_shards)))
+        if not self.using_firestore:
+            if settings.locations_live_mode:
+                for location in reversed(list(store.locations)):
+                    self._live_locations.upsert(location.model_copy(update={'id': location.uid}))
+            for location in self._location_feed:
+                self._index_location(location)
+                self._location_clusters.add(location.lat, location.lng)
+
+    @property
+    def using_firestore(self) -> bool:
+        return self.db is not None
+
+    @property
+    def _location_feed(self) -> LocationRing | LiveLocationSet:
+        return self._live_locations if settings.locations_live_mode else store.locations
+
+    def list_locations(self) -> list[UserLocation]:
+        if not self.using_firestore:
+            return self._location_feed.latest(self._LOCATIONS_LEGACY_LIMIT)[0]
+
+        docs = (
+            self.db.collection('locations')
+            .order_by('created_at', direction=firestore.Query.DESCENDING)
+            .limit(self._LOCATIONS_LEGACY_LIMIT)
+            .stream()
+        )
+        return [self._to_user_location(doc.to_dict() or {}, doc.id) for doc in docs]
+
+    def filter_locations(
+        self,
+        uid: str | None = None,
+        city: str | None = None,
+        limit: int = 200,
+    ) -> list[UserLocation]:
+        normalized_limit = min(self._LOCATIONS_PAGE_LIMIT, max(1, int(limit)))
+        if not self.using_firestore:
+            feed = self._location_feed
+            if uid is not None:
+                locations = feed.by_uid(uid, normalized_limit if city is None else len(feed))
+            else:
+                locations = feed.by_city(city or '', normalized_limit)
+            if uid is not None and city is not None:
+                locations = [location for location in locations if location.city.strip() == city.strip()]
+            return locations[:normalized_limit]
+
+        query = self.db.collection('locations')
+        if uid is not None:
+            query = query.where(filter=firestore.FieldFilter('uid', '==', uid))
+        if city is not None:
+            query = query.where(filter=firestore.FieldFilter('city', '==', city.strip()))
+        docs = query.order_by('created_at', direction=firestore.Query.DESCENDING).limit(normalized_limit).stream()
+        return [self._to_user_location(doc.to_dict() or {}, doc.id) for doc in docs]
+
+    def sync_locations(
+        self,
+        since: str | None = None,
+        limit: int = 500,
+    ) -> tuple[list[UserLocation], str, bool]:
+        normalized_limit = min(self._LOCATIONS_PAGE_LIMIT, max(1, int(limit)))
+        if not self.using_firestore:
+            feed = self._location_feed
+            if since is None:
+                locations, sequence = feed.latest(self._LOCATIONS_LEGACY_LIMIT)
+                return locations, encode_cursor(['s', feed.epoch, sequence]), False
+            epoch, sequence = self._decode_sync_token(since, 's')
+            if (
+                epoch != feed.epoch
+                or not isinstance(sequence, int)
+                or not feed.oldest_sequence <= sequence <= feed.sequence
+            ):
+                raise CursorError('Sync token is no longer valid')
+            fresh, sequence = feed.since(sequence, normalized_limit)
+            return fresh, encode_cursor(['s', feed.epoch, sequence]), sequence < feed.sequence
+
+        if since is None:
+            locations = self.list_locations()
+            if not locations:
+                return [], encode_cursor(['c', datetime.fromtimestamp(0, timezone.utc).isoformat(), '']), False
+            latest = locations[0]
+            return locations, encode_cursor(['c', latest.created_at.isoformat(), latest.id]), False
+
+        created_at, location_id = self._decode_sync_token(since, 'c')
+        query = (
+            self.db.collection('locations')
+            .order_by('created_at', direction=firestore.Query.ASCENDING)
+            .order_by('__name__', direction=firestore.Query.ASCENDING)
+        )
+        if location_id:
+            query = query.start_after({'created_at': created_at, '__name__': location_id})
+        else:
+            query = query.where(filter=firestore.FieldFilter('created_at', '>', created_at))
+        docs = query.limit(normalized_limit + 1).stream()
+        fresh = [self._to_user_location(doc.to_dict() or {}, doc.id) for doc in docs]
+        has_more = len(fresh) > normalized_limit
+        fresh = fresh[:normalized_limit]
+        if not fresh:
+            return [], since, False
+        last = fresh[-1]
+        return fresh, encode_cursor(['c', last.created_at.isoformat(), last.id]), has_more
+
+    def _decode_sync_token(self, token: str, kind: str):
+        values = decode_cursor(token, size=3)
+        if values[0] != kind:
+            raise CursorError('Invalid sync token')
+        if kind == 's':
+            return values[1], values[2]
+        try:
+            created_at = datetime.fromisoformat(str(values[1]))
+        except ValueError as exc:
+            raise CursorError('Invalid sync token') from exc
+        if created_at.tzinfo is None or not isinstance(values[2], str):
+            raise CursorError('Invalid sync token')
+        return created_at, values[2]
+
+    def list_locations_page(
+        self,
+        bbox: BoundingBox | None = None,
+        limit: int = 200,
+        cursor: str | None = None,
+    ) -> tuple[list[UserLocation], str | None]:
+        normalized_limit = min(self._LOCATIONS_PAGE_LIMIT, max(1, int(limit)))
+        after = self._decode_locations_cursor(cursor, spatial=bbox is not None) if cursor else None
+
+        if bbox is not None:
+            rows = self._locations_in_bbox(bbox, normalized_limit + 1, after)
+        else:
+            rows = self._latest_locations(normalized_limit + 1, after)
+
+        next_cursor = None
+        if len(rows) > normalized_limit:
+            key, location = rows[normalized_limit - 1]
+            next_cursor = encode_cursor(['g' if bbox is not None else 't', key, location.id])
+        return [location for _, location in rows[:normalized_limit]], next_cursor
+
+    def _latest_locations(self, limit: int, after: tuple[str, str] | None) -> list[tuple[str, UserLocation]]:
+        if not self.using_firestore:
+            rows = []
+            for location in self._location_feed:
+                key = location.created_at.isoformat()
+                if after is not None and (key, location.id) >= after:
+                    continue
+                rows.append((key, location))
+                if len(rows) >= limit:
+                    break
+            return rows
+
+        query = (
+            self.db.collection('locations')
+            .order_by('created_at', direction=firestore.Query.DESCENDING)
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        )
+        if after is not None:
+            query = query.start_after({'created_at': datetime.fromisoformat(after[0]), '__name__': after[1]})
+        rows = []
+        for doc in query.limit(limit).stream():
+            location = self._to_user_location(doc.to_dict() or {}, doc.id)
+            rows.append((location.created_at.isoformat(), location))
+        return rows
+
+    def _locations_in_bbox(
+        self,
+        bbox: BoundingBox,
+        limit: int,
+        after: tuple[str, str] | None,
+    ) -> list[tuple[str, UserLocation]]:
+        rows: list[tuple[str, UserLocation]] = []
+        for prefix in geohash.cover(bbox, max_cells=self._LOCATIONS_BBOX_CELLS):
+            end = prefix + geohash.PREFIX_END
+            if after is not None and after[0] >= end:
+                continue
+            if not self.using_firestore:
+                last = after if after is not None and after[0] >= prefix else (prefix,)
+                while len(rows) < limit:
+                    entries = self._location_geohashes.entries_after(last, limit)
+                    for entry in entries:
+                        if entry[0] >= end:
+                            break
+                        last = entry
+                        location = self._location_index.get(entry[1])
+                        if location is not None and bbox.contains(location.lat, location.lng):
+                            rows.append((entry[0], location))
+                    if len(entries) < limit or last is not entries[-1]:
+                        break
+                if len(rows) >= limit:
+                    break
+                continue
+            base = (
+                self.db.collection('locations')
+                .where(filter=firestore.FieldFilter('geohash', '>=', prefix))
+                .where(filter=firestore.FieldFilter('geohash', '<', end))
+                .order_by('geohash')
+                .order_by('__name__')
+            )
+            last = after if after is not None and after[0] >= prefix else None
+            while len(rows) < limit:
+                query = base.start_after({'geohash': last[0], '__name__': last[1]}) if last else base
+                docs = list(query.limit(limit).stream())
+                for doc in docs:
+                    raw = doc.to_dict() or {}
+                    last = (str(raw.get('geohash', '')), doc.id)
+                    location = self._to_user_location(raw, doc.id)
+                    if bbox.contains(location.lat, location.lng):
+                        rows.append((last[0], location))
+                if len(docs) < limit:
+                    break
+            if len(rows) >= limit:
+                break
+        return rows[:limit]
+
+    def nearby_locations(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: int = 50,
+    ) -> list[tuple[float, UserLocation]]:
+        normalized_limit = min(self._LOCATIONS_PAGE_LIMIT, max(1, int(limit)))
+        if not self.using_firestore:
+            return self._location_index.nearby(lat, lng, radius_km, normalized_limit)
+
+        found: list[tuple[float, UserLocation]] = []
+        pending = [
+            (geohash.min_distance_km(lat, lng, geohash.decode_bounds(prefix)), prefix)
+            for prefix in geohash.cover(geohash.radius_bbox(lat, lng, radius_km), max_cells=self._LOCATIONS_BBOX_CELLS)
+        ]
+        heapq.heapify(pending)
+        while pending:
+            bound, prefix = heapq.heappop(pending)
+            if bound > radius_km:
+                break
+            if len(found) >= normalized_limit and found[normalized_limit - 1][0] <= bound:
+                break
+            docs = self._locations_with_prefix(prefix, self._NEARBY_CELL_LIMIT + 1)
+            if len(docs) > self._NEARBY_CELL_LIMIT and len(prefix) < self._LOCATION_GEOHASH_PRECISION:
+                for child in geohash.children(prefix):
+                    child_bound = geohash.min_distance_km(lat, lng, geohash.decode_bounds(child))
+                    if child_bound <= radius_km:
+                        heapq.heappush(pending, (child_bound, child))
+                continue
+            if len(docs) > self._NEARBY_CELL_LIMIT:
+                docs = self._locations_with_prefix(prefix, normalized_limit)
+            for location in docs:
+                distance = geohash.haversine_km(lat, lng, location.lat, location.lng)
+                if distance <= radius_km:
+                    found.append((distance, location))
+            found.sort(key=lambda item: item[0])
+        return found[:normalized_limit]
+
+    def _locations_with_prefix(self, prefix: str, limit: int) -> list[UserLocation]:
+        docs = (
+            self.db.collection('locations')
+            .where(filter=firestore.FieldFilter('geohash', '>=', prefix))
+            .where(filter=firestore.FieldFilter('geohash', '<', prefix + geohash.PREFIX_END))
+            .limit(limit)
+            .stream()
+        )
+        return [self._to_user_location(doc.to_dict() or {}, doc.id) for doc in docs]
+
+    def location_clusters(self, zoom: int, bbox: BoundingBox) -> tuple[int, list[Cluster]]:
+        zoom = min(self._CLUSTER_MAX_ZOOM, max(0, int(zoom)))
+        ranges = cell_ranges(bbox, zoom, self._CLUSTER_CELL_BITS)
+        if range_size(ranges) > self._CLUSTERS_MAX_CELLS:
+            raise ValueError('bbox is too large for this zoom level')
+
+        if not self.using_firestore:
+            return zoom, self._location_clusters.clusters(zoom, bbox)
+
+        aggregates: dict[tuple[int, int], list[float]] = {}
+        for low_x, high_x, low_y, high_y in ranges:
+            docs = (
+                self.db.collection(self._LOCATION_CLUSTERS_COLLECTION)
+                .where(filter=firestore.FieldFilter('zoom', '==', zoom))
+                .where(filter=firestore.FieldFilter('x', '>=', low_x))
+                .where(filter=firestore.FieldFilter('x', '<=', high_x))
+                .where(filter=firestore.FieldFilter('y', '>=', low_y))
+                .where(filter=firestore.FieldFilter('y', '<=', high_y))
+                .stream()
+            )
+            for doc in docs:
+                raw = doc.to_dict() or {}
+                aggregate = aggregates.setdefault((int(raw.get('x', 0)), int(raw.get('y', 0))), [0, 0.0, 0.0])
+                aggregate[0] += int(raw.get('count') or 0)
+                aggregate[1] += float(raw.get('sum_lat') or 0.0)
+                aggregate[2] += float(raw.get('sum_lng') or 0.0)
+        clusters = [
+            Cluster(zoom=zoom, x=x, y=y, count=int(count), lat=sum_lat / count, lng=sum_lng / count)
+            for (x, y), (count, sum_lat, sum_lng) in aggregates.items()
+            if count > 0
+        ]
+        return zoom, clusters
+
+    def _location_cluster_writes(
+        self,
+        points: list[tuple[float, float]],
+        removed: list[tuple[float, float]] | None = None,
+    ) -> list[tuple[str, dict]]:
+        aggregates: dict[tuple[int, int, int], list[float]] = {}
+        weighted = [(lat, lng, 1) for lat, lng in points] + [(lat, lng, -1) for lat, lng in removed or []]
+        for lat, lng, weight in weighted:
+            for cell in self._location_clusters.cells(lat, lng):
+                aggregate = aggregates.setdefault(cell, [0, 0.0, 0.0])
+                aggregate[0] += weight
+                aggregate[1] += lat * weight
+                aggregate[2] += lng * weight
+        shard = self._next_cluster_shard()
+        return [
+            (
+                f'{zoom}-{x}-{y}-{shard}' if shard is not None and zoom <= self._CLUSTER_SHARDED_MAX_ZOOM else f'{zoom}-{x}-{y}',
+                {
+                    'zoom': zoom,
+                    'x': x,
+                    'y': y,
+                    'count': firestore.Increment(int(count)),
+                    'sum_lat': firestore.Increment(sum_lat),
+                    'sum_lng': firestore.Increment(sum_lng),
+                },
+            )
+            for (zoom, x, y), (count, sum_lat, sum_lng) in aggregates.items()
+            if count or sum_lat or sum_lng
+        ]
+
+    def _next_cluster_shard(self) -> int | None:
+        if settings.locations_cluster_shards <= 1:
+            return None
+        return next(self._cluster_shard_cursor) % settings.locations_cluster_shards
+
+    def _decode_locations_cursor(self, cursor: str, spatial: bool) -> tuple[str, str]:
+        kind, key, location_id = decode_cursor(cursor, size=3)
+        if kind != ('g' if spatial else 't') or not isinstance(key, str) or not isinstance(location_id, str):
+            raise CursorError('Invalid cursor')
+        if kind == 't':
+            try:
+                created_at = datetime.fromisoformat(key)
+            except ValueError as exc:
+                raise CursorError('Invalid cursor') from exc
+            if created_at.tzinfo is None:
+                raise CursorError('Invalid cursor')
+        return key, location_id
+
+    @staticmethod
+    def _to_user_location(raw: dict, doc_id: str) -> UserLocation:
+        created_at = raw.get('created_at')
+        if not isinstance(created_at, datetime):
+            created_at = datetime.now(timezone.utc)
+        return UserLocation(
+            id=str(raw.get('id', doc_id)),
+            uid=str(raw.get('uid', 'unknown')),
+            name=str(raw.get('name', 'User')),
+            city=str(raw.get('city', 'Unknown')),
+            country=str(raw.get('country', 'Unknown')),
+            lat=float(raw.get('lat', 0.0)),
+            lng=float(raw.get('lng', 0.0)),
+            created_at=created_at,
+        )
+
+    def _location_document(self, location: UserLocation) -> dict:
+        return {
+            **location.model_dump(),
+            'geohash': geohash.encode(location.lat, location.lng, self._LOCATION_GEOHASH_PRECISION),
+            'clustered': True,
+        }
+
+    def _next_location_id(self) -> str:
+        with self._location_id_lock:
+            stamp = max(int(datetime.now(timezone.utc).timestamp() * 1000), self._last_location_stamp + 1)
+            self._last_location_stamp = stamp
+        return f'loc-{stamp}'
+
+    def create_location(self, payload: UserLocationCreate) -> UserLocation:
+        if settings.locations_live_mode:
+            return self._upsert_live_location(payload)
+
+        city, country = self._resolve_location_details(payload)
+        location = UserLocation(
+            id=self._next_location_id(),
+            uid=payload.uid,
+            name=payload.name,
+            city=city,
+            country=country,
+            lat=payload.lat,
+            lng=payload.lng,
+            created_at=datetime.now(timezone.utc),
+        )
+
+        if not self.using_firestore:
+            evicted = store.locations.append(location)
+            if evicted is not None:
+                self._evict_location(evicted)
+            self._index_location(location)
+            self._location_clusters.add(location.lat, location.lng)
+            return location
+
+        batch = self.db.batch()
+        batch.set(self.db.collection('locations').document(location.id), self._location_document(location))
+        clusters = self.db.collection(self._LOCATION_CLUSTERS_COLLECTION)
+        for doc_id, payload in self._location_cluster_writes([(location.lat, location.lng)]):
+            batch.set(clusters.document(doc_id), payload, merge=True)
+        batch.commit()
+        return location
+
+    def location_history(self, uid: str, limit: int = 20) -> list[UserLocation]:
+        normalized_limit = min(self._LOCATIONS_PAGE_LIMIT, max(1, int(limit)))
+        if not settings.locations_live_mode:
+            return self.filter_locations(uid=uid, limit=normalized_limit)
+
+        if not self.using_firestore:
+            with self._live_locations_lock:
+                return list(self._location_history.get(uid, ()))[:normalized_limit]
+
+        docs = (
+            self.db.collection('locations')
+            .document(uid)
+            .collection('history')
+            .order_by('seq', direction=firestore.Query.DESCENDING)
+            .limit(normalized_limit)
+            .stream()
+        )
+        return [self._to_user_location(doc.to_dict() or {}, uid) for doc in docs]
+
+    def _upsert_live_location(self, payload: UserLocationCreate) -> UserLocation:
+        now = datetime.now(timezone.utc)
+        if not self.using_firestore:
+            previous = self._live_locations.get(payload.uid)
+            if self._should_coalesce(previous, payload, now):
+                return previous
+        else:
+            reference = self.db.collection('locations').document(payload.uid)
+            snapshot = reference.get()
+            raw = (snapshot.to_dict() or {}) if snapshot.exists else {}
+            previous = self._to_user_location(raw, payload.uid) if raw else None
+            if self._should_coalesce(previous, payload, now):
+                return previous
+
+        city, country = self._resolve_location_details(payload)
+        location = UserLocation(
+            id=payload.uid,
+            uid=payload.uid,
+            name=payload.name,
+            city=city,
+            country=country,
+            lat=payload.lat,
+            lng=payload.lng,
+            created_at=now,
+        )
+        history_size = max(1, settings.locations_history_size)
+
+        if not self.using_firestore:
+            with self._live_locations_lock:
+                previous = self._live_locations.upsert(location)
+                history = self._location_history.setdefault(location.uid, deque(maxlen=history_size))
+                history.appendleft(location)
+                if previous is not None:
+                    self._location_clusters.remove(previous.lat, previous.lng)
+                self._index_location(location)
+                self._location_clusters.add(location.lat, location.lng)
+            return location
+
+        for attempt in range(self._LIVE_LOCATION_ATTEMPTS):
+            if attempt:
+                snapshot = reference.get()
+            try:
+                self._write_live_location(reference, snapshot, location, history_size)
+                return location
+            except (google_exceptions.FailedPrecondition, google_exceptions.AlreadyExists, google_exceptions.NotFound):
+                if attempt + 1 == self._LIVE_LOCATION_ATTEMPTS:
+                    raise
+        return location
+
+    def _write_live_location(self, reference, snapshot, location: UserLocation, history_size: int) -> None:
+        raw = (snapshot.to_dict() or {}) if snapshot.exists else {}
+        previous = self._to_user_location(raw, location.uid) if raw else None
+        sequence = int(raw.get('history_seq') or 0)
+        removed = [(previous.lat, previous.lng)] if previous is not None and raw.get('clustered') else []
+        document = {**self._location_document(location), 'history_seq': sequence + 1}
+        batch = self.db.batch()
+        if snapshot.exists:
+            batch.update(reference, document, option=self.db.write_option(last_update_time=snapshot.update_time))
+        else:
+            batch.create(reference, document)
+        batch.set(
+            reference.collection('history').document(f'slot-{sequence % history_size}'),
+            {**location.model_dump(), 'seq': sequence},
+        )
+        clusters = self.db.collection(self._LOCATION_CLUSTERS_COLLECTION)
+        for doc_id, cluster_payload in self._location_cluster_writes([(location.lat, location.lng)], removed):
+            batch.set(clusters.document(doc_id), cluster_payload, merge=True)
+        batch.commit()
+
+    @staticmethod
+    def _should_coalesce(previous: UserLocation | None, payload: UserLocationCreate, now: datetime) -> bool:
+        if previous is None or settings.locations_coalesce_seconds <= 0:
+            return False
+        if (now - previous.created_at).total_seconds() > settings.locations_coalesce_seconds:
+            return False
+        distance_m = geohash.haversine_km(previous.lat, previous.lng, payload.lat, payload.lng) * 1000
+        return distance_m <= settings.locations_coalesce_meters
+
+    def _index_location(self, location: UserLocation) -> None:
+        self._location_index.upsert(location.id, location.lat, location.lng, location)
+        self._location_geohashes.upsert(
+            location.id,
+            (geohash.encode(location.lat, location.lng, self._LOCATION_GEOHASH_PRECISION),),
+        )
+
+    def _evict_location(self, evicted: UserLocation) -> None:
+        if self._location_index.get(evicted.id) is evicted:
+            self._location_index.discard(evicted.id)
+            self._location_geohashes.discard(evicted.id)
+        self._location_clusters.remove(evicted.lat, evicted.lng)
+
+    def _resolve_location_details(self, payload: UserLocationCreate) -> tuple[str, str]:
+        city = payload.city.strip() if isinstance(payload.city, str) else ''
+        country = payload.country.strip() if isinstance(payload.country, str) else ''
+
+        if not self._is_placeholder(city) and not self._is_placeholder(country):
+            return city, country
+
+        geocoded = self.geocoder.reverse(payload.lat, payload.lng)
+        if not geocoded:
+            return city or 'Unknown', country or 'Unknown'
+
+        resolved_city = geocoded.city if self._is_placeholder(city) and geocoded.city else city
+        resolved_country = geocoded.country if self._is_placeholder(country) and geocoded.country else country
+        return resolved_city or 'Unknown', resolved_country or 'Unknown'
+
+    @classmethod
+    def _is_placeholder(cls, value: str) -> bool:
+        return value.strip().lower() in cls._PLACEHOLDER_VALUES
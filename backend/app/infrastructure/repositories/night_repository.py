@@ -1,20 +1,31 @@
 from __future__ import annotations
 
+import itertools
+import random
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
+from app.core.cache import TtlLruCache
 from app.core.config import settings
-from app.core.geocoder import ReverseGeocoder
+from app.core.cursors import CursorError, decode_cursor, encode_cursor
+from app.core.progression import build_level_curve
+from app.core.rate_limiter import RateLimitDecision, build_tap_rate_limiter
 from app.domain.schemas import (
     CityRankingItem,
     ClickerLeaderboardItem,
     ClickerLotteryEntry,
     ClickerState,
     QrBindIn,
-    UserLocation,
-    UserLocationCreate,
 )
 from app.infrastructure.firebase_admin import get_firestore_client
+from app.infrastructure.repositories.location_repository import LocationRepository
+from app.infrastructure.stores.clicker_write_buffer import ClickerWriteBuffer
 from app.infrastructure.stores.memory_store import make_qr_hash, store
+from app.infrastructure.stores.periodic_worker import PeriodicWorker
+from app.infrastructure.stores.sorted_index import SortedIndex
 
 try:
     from firebase_admin import firestore
@@ -22,98 +33,124 @@ except Exception:  # pragma: no cover
     firestore = None
 
 
-class NightRepository:
-    _PLACEHOLDER_VALUES = {
-        '',
-        'unknown',
-        'custom point',
-        'custom',
-        'n/a',
-        'none',
-        'null',
-    }
+@dataclass
+class ClickerSession:
+    uid: str
+    record: dict | None = None
+    version: int = -1
+
+
+@dataclass
+class ClickerRankSnapshot:
+    built_at: datetime
+    rows: list[dict]
+    keys: list[tuple]
+    positions: dict[str, int]
 
+
+class NightRepository:
+    _FIRESTORE_BATCH_LIMIT = 500
+    _POINT_SHARDS_COLLECTION = 'point_shards'
+    _SHARDED_COUNTERS = ('points', 'referrals')
+    _RATING_FIELDS = (
+        'points',
+        'level',
+        'display_name',
+        'referrals',
+        'daily_id',
+        'daily_points',
+        'weekly_id',
+        'weekly_points',
+    )
+    _LEADERBOARD_PERIODS = ('daily', 'weekly')
+    _LEADERBOARD_SNAPSHOTS_COLLECTION = 'leaderboard_snapshots'
+    _TAP_SLOTS_PER_SECOND = 10
+    _RECORD_VERSIONS_LIMIT = 100_000
+    _LEADERBOARD_PAGE_LIMIT = 50
     def __init__(self) -> None:
         self.db = get_firestore_client()
-        self.geocoder = ReverseGeocoder(settings=settings)
+        self.tap_limiter = build_tap_rate_limiter(settings)
+        self.level_curve = build_level_curve(settings)
         self._clicker_users: dict[str, dict] = {}
         self._lottery_entries: dict[str, dict] = {}
-
-    @property
-    def using_firestore(self) -> bool:
-        return self.db is not None
-
-    def list_locations(self) -> list[UserLocation]:
-        if not self.using_firestore:
-            return store.locations
-
-        docs = (
-            self.db.collection('locations')
-            .order_by('created_at', direction=firestore.Query.DESCENDING)
-            .limit(2000)
-            .stream()
-        )
-
-        result: list[UserLocation] = []
-        for doc in docs:
-            raw = doc.to_dict() or {}
-            created_at = raw.get('created_at')
-            if not isinstance(created_at, datetime):
-                created_at = datetime.now(timezone.utc)
-
-            result.append(
-                UserLocation(
-                    id=str(raw.get('id', doc.id)),
-                    uid=str(raw.get('uid', 'unknown')),
-                    name=str(raw.get('name', 'User')),
-                    city=str(raw.get('city', 'Unknown')),
-                    country=str(raw.get('country', 'Unknown')),
-                    lat=float(raw.get('lat', 0.0)),
-                    lng=float(raw.get('lng', 0.0)),
-                    created_at=created_at,
-                )
+        self._leaderboard_index = SortedIndex()
+        self._period_indexes: dict[str, SortedIndex] = {}
+        self._rank_snapshot: ClickerRankSnapshot | None = None
+        self.locations = LocationRepository(db=self.db)
+        self._record_versions: OrderedDict[str, int] = OrderedDict()
+        self._record_versions_lock = threading.Lock()
+        self._record_version_counter = itertools.count(1)
+        self._evicted_record_version = 0
+        self._record_cache: TtlLruCache[str, dict] | None = None
+        if (
+            self.using_firestore
+            and settings.clicker_record_cache_size > 0
+            and settings.clicker_record_cache_ttl_seconds > 0
+        ):
+            self._record_cache = TtlLruCache(
+                name='clicker_records',
+                max_size=settings.clicker_record_cache_size,
+                ttl_seconds=settings.clicker_record_cache_ttl_seconds,
+            )
+        self._write_buffer: ClickerWriteBuffer | None = None
+        if self.using_firestore and settings.clicker_write_behind:
+            self._write_buffer = ClickerWriteBuffer(
+                writer=self._write_clicker_batch,
+                flush_interval_seconds=settings.clicker_flush_interval_seconds,
+                max_dirty=settings.clicker_flush_max_dirty,
             )
 
-        return result
-
-    def create_location(self, payload: UserLocationCreate) -> UserLocation:
-        city, country = self._resolve_location_details(payload)
-        location = UserLocation(
-            id=f'loc-{int(datetime.now(timezone.utc).timestamp() * 1000)}',
-            uid=payload.uid,
-            name=payload.name,
-            city=city,
-            country=country,
-            lat=payload.lat,
-            lng=payload.lng,
-            created_at=datetime.now(timezone.utc),
-        )
-
-        if not self.using_firestore:
-            store.locations.insert(0, location)
-            return location
-
-        self.db.collection('locations').document(location.id).set(location.model_dump())
-        return location
-
-    def _resolve_location_details(self, payload: UserLocationCreate) -> tuple[str, str]:
-        city = payload.city.strip() if isinstance(payload.city, str) else ''
-        country = payload.country.strip() if isinstance(payload.country, str) else ''
+        self._leaderboard_materializer: PeriodicWorker | None = None
+        if self.using_firestore and settings.clicker_leaderboard_snapshot_seconds > 0:
+            self._leaderboard_materializer = PeriodicWorker(
+                name='clicker-leaderboard-materializer',
+                interval_seconds=settings.clicker_leaderboard_snapshot_seconds,
+                task=self.materialize_clicker_leaderboard,
+            )
 
-        if not self._is_placeholder(city) and not self._is_placeholder(country):
-            return city, country
+        self._rank_builder: PeriodicWorker | None = None
+        if self.using_firestore:
+            self._rank_builder = PeriodicWorker(
+                name='clicker-rank-snapshot',
+                interval_seconds=settings.clicker_rank_snapshot_seconds,
+                task=self.refresh_rank_snapshot,
+            )
 
-        geocoded = self.geocoder.reverse(payload.lat, payload.lng)
-        if not geocoded:
-            return city or 'Unknown', country or 'Unknown'
+        self._point_shards = 0
+        self._rating_rollup: ClickerWriteBuffer | None = None
+        if self.using_firestore and self._write_buffer is None and settings.clicker_point_shards > 1:
+            self._point_shards = settings.clicker_point_shards
+            self._shard_cursor = itertools.count(random.randrange(self._point_shards))
+            self._rating_rollup = ClickerWriteBuffer(
+                writer=self._rollup_clicker_ratings,
+                flush_interval_seconds=settings.clicker_rating_rollup_seconds,
+                max_dirty=settings.clicker_flush_max_dirty,
+            )
 
-        resolved_city = geocoded.city if self._is_placeholder(city) and geocoded.city else city
-        resolved_country = geocoded.country if self._is_placeholder(country) and geocoded.country else country
-        return resolved_city or 'Unknown', resolved_country or 'Unknown'
+    @property
+    def using_firestore(self) -> bool:
+        return self.db is not None
 
-    @classmethod
-    def _is_placeholder(cls, value: str) -> bool:
-        return value.strip().lower() in cls._PLACEHOLDER_VALUES
+    @property
+    def using_point_shards(self) -> bool:
+        return self._point_shards > 0
+
+    def close(self) -> None:
+        if self._leaderboard_materializer is not None:
+            self._leaderboard_materializer.close()
+        if self._rank_builder is not None:
+            self._rank_builder.close()
+        if self._write_buffer is not None:
+            self._write_buffer.close()
+        if self._rating_rollup is not None:
+            self._rating_rollup.close()
+
+    def flush_clicker_writes(self) -> int:
+        flushed = 0
+        for buffer in (self._write_buffer, self._rating_rollup):
+            if buffer is not None:
+                flushed += buffer.flush()
+        return flushed
 
     @staticmethod
     def build_clicker_uid(telegram_user_id: int) -> str:
@@ -134,25 +171,14 @@ class NightRepository:
             return value
         return None
 
-    @staticmethod
-    def _points_for_level(level: int) -> int:
-        normalized_level = max(1, level)
-        if normalized_level <= 30:
-            return (normalized_level - 1) * 10_000
-        return 290_000 + (normalized_level - 30) * 100_000
+    def _points_for_level(self, level: int) -> int:
+        return self.level_curve.points_for_level(level)
 
-    @classmethod
-    def _level_from_points(cls, points: int) -> int:
-        normalized_points = max(0, points)
-        if normalized_points < 290_000:
-            return normalized_points // 10_000 + 1
-        return 30 + (normalized_points - 290_000) // 100_000
+    def _level_from_points(self, points: int) -> int:
+        return self.level_curve.level_from_points(points)
 
-    @classmethod
-    def _next_level_points(cls, level: int) -> int | None:
-        if level < 1:
-            return cls._points_for_level(2)
-        return cls._points_for_level(level + 1)
+    def _next_level_points(self, level: int) -> int | None:
+        return self.level_curve.next_level_points(level)
 
     @staticmethod
     def _display_name(
@@ -193,8 +219,10 @@ class NightRepository:
             'lottery_joined': False,
             'lottery_entered_at': None,
             'night_mode_unlocked': False,
-            'last_tap_second': 0,
-            'taps_in_second': 0,
+            'daily_id': None,
+            'daily_base': 0,
+            'weekly_id': None,
+            'weekly_base': 0,
             'created_at': now,
             'updated_at': now,
         }
@@ -240,11 +268,13 @@ class NightRepository:
             'lottery_joined': bool(raw.get('lottery_joined', False)),
             'lottery_entered_at': lottery_entered_at,
             'night_mode_unlocked': bool(raw.get('night_mode_unlocked', False)),
-            'last_tap_second': int(raw.get('last_tap_second', 0)),
-            'taps_in_second': max(0, int(raw.get('taps_in_second', 0))),
             'created_at': created_at,
             'updated_at': updated_at,
         }
+        for period in self._LEADERBOARD_PERIODS:
+            period_id = raw.get(f'{period}_id')
+            record[f'{period}_id'] = period_id if isinstance(period_id, str) else None
+            record[f'{period}_base'] = int(raw.get(f'{period}_base') or 0)
         return record
 
     def _serialize_clicker_record(self, record: dict) -> dict:
@@ -264,49 +294,327 @@ class NightRepository:
             'lottery_joined': bool(record.get('lottery_joined', False)),
             'lottery_entered_at': record.get('lottery_entered_at'),
             'night_mode_unlocked': bool(record.get('night_mode_unlocked', False)),
-            'last_tap_second': int(record.get('last_tap_second', 0)),
-            'taps_in_second': int(record.get('taps_in_second', 0)),
+            'daily_id': record.get('daily_id'),
+            'daily_base': int(record.get('daily_base', 0)),
+            'weekly_id': record.get('weekly_id'),
+            'weekly_base': int(record.get('weekly_base', 0)),
             'created_at': record.get('created_at'),
             'updated_at': record.get('updated_at'),
         }
 
     def _save_clicker_record(self, record: dict) -> None:
         uid = str(record['uid'])
+        self._bump_record_version(uid)
         if not self.using_firestore:
             self._clicker_users[uid] = record.copy()
+            self._leaderboard_index.upsert(uid, self._leaderboard_key(record))
+            self._index_period_points(record)
             return
 
         payload = self._serialize_clicker_record(record)
-        self.db.collection('users').document(uid).set(payload, merge=True)
+        if self.using_point_shards:
+            for field in self._SHARDED_COUNTERS:
+                payload.pop(field, None)
+            self._increment_point_shards(record)
+
+        persisted = record.get('_persisted') if self._write_buffer is None else None
+        user_ref = self.db.collection('users').document(uid)
+        if persisted is None:
+            user_ref.set(payload, merge=True)
+        else:
+            changes = {field: value for field, value in payload.items() if persisted.get(field) != value}
+            if changes:
+                user_ref.update(self._as_increments(changes, persisted, self._SHARDED_COUNTERS))
+        record['_persisted'] = payload
+        self._cache_clicker_record(record)
+        if self._write_buffer is not None:
+            self._write_buffer.put(record)
+
+    def _leaderboard_key(self, record: dict) -> tuple[int, float]:
+        updated_at = self._safe_datetime(record.get('updated_at'))
+        return -int(record.get('points', 0)), -(updated_at.timestamp() if updated_at else 0.0)
 
-    def _upsert_clicker_rating(self, record: dict) -> None:
-        payload = {
+    @staticmethod
+    def _period_id(period: str, now: datetime) -> str:
+        if period == 'daily':
+            return now.astimezone(timezone.utc).strftime('%Y-%m-%d')
+        year, week, _ = now.astimezone(timezone.utc).isocalendar()
+        return f'{year}-W{week:02d}'
+
+    @staticmethod
+    def _period_points(record: dict, period: str) -> int:
+        return max(0, int(record.get('points', 0)) - int(record.get(f'{period}_base', 0)))
+
+    def _roll_period_buckets(self, record: dict, now: datetime) -> bool:
+        rolled = False
+        for period in self._LEADERBOARD_PERIODS:
+            period_id = self._period_id(period, now)
+            if record.get(f'{period}_id') != period_id:
+                record[f'{period}_id'] = period_id
+                record[f'{period}_base'] = int(record.get('points', 0))
+                rolled = True
+        return rolled
+
+    def _exclude_from_periods(self, record: dict, points: int) -> None:
+        for period in self._LEADERBOARD_PERIODS:
+            record[f'{period}_base'] = int(record.get(f'{period}_base', 0)) + points
+
+    def _index_period_points(self, record: dict) -> None:
+        now = datetime.now(timezone.utc)
+        current = {self._period_id(period, now) for period in self._LEADERBOARD_PERIODS}
+        for stale in set(self._period_indexes) - current:
+            self._period_indexes.pop(stale, None)
+
+        uid = str(record['uid'])
+        updated_at = self._safe_datetime(record.get('updated_at'))
+        for period in self._LEADERBOARD_PERIODS:
+            period_id = record.get(f'{period}_id')
+            if period_id not in current:
+                continue
+            index = self._period_indexes.setdefault(period_id, SortedIndex())
+            index.upsert(
+                uid,
+                (-self._period_points(record, period), -(updated_at.timestamp() if updated_at else 0.0)),
+            )
+
+    def _cache_clicker_record(self, record: dict) -> None:
+        if self._record_cache is not None:
+            self._record_cache.set(str(record['uid']), record.copy())
+
+    def _serialize_clicker_rating(self, record: dict) -> dict:
+        return {
             'uid': record['uid'],
             'telegram_user_id': record.get('telegram_user_id'),
             'display_name': record.get('display_name', 'Player'),
             'points': int(record.get('points', 0)),
             'level': int(record.get('level', 1)),
             'referrals': int(record.get('referrals', 0)),
+            'daily_id': record.get('daily_id'),
+            'daily_points': self._period_points(record, 'daily'),
+            'weekly_id': record.get('weekly_id'),
+            'weekly_points': self._period_points(record, 'weekly'),
             'updated_at': record.get('updated_at') or datetime.now(timezone.utc),
         }
 
+    def _rating_snapshot(self, record: dict) -> dict:
+        payload = self._serialize_clicker_rating(record)
+        return {field: payload[field] for field in self._RATING_FIELDS}
+
+    def _remember_persisted(self, record: dict, raw: dict) -> None:
+        payload = self._serialize_clicker_record(record)
+        if self.using_point_shards:
+            for field in self._SHARDED_COUNTERS:
+                payload.pop(field, None)
+        record['_persisted'] = {field: raw[field] for field in payload if field in raw}
+        record['_persisted_rating'] = self._rating_snapshot(record) if raw.get('rating_synced') else None
+
+    def _upsert_clicker_rating(self, record: dict) -> None:
         if not self.using_firestore:
             return
 
-        self.db.collection('ratings').document(str(record['uid'])).set(payload, merge=True)
+        snapshot = self._rating_snapshot(record)
+        persisted = record.get('_persisted_rating') if self._write_buffer is None else None
+        if persisted == snapshot:
+            return
+        record['_persisted_rating'] = snapshot
+        self._cache_clicker_record(record)
+
+        if self._rating_rollup is not None:
+            self._rating_rollup.stage(record)
+            return
 
-    def _fetch_clicker_record(self, uid: str, now: datetime) -> dict | None:
+        rating_ref = self.db.collection('ratings').document(str(record['uid']))
+        payload = self._serialize_clicker_rating(record)
+        if persisted is None:
+            batch = self.db.batch()
+            batch.set(rating_ref, payload, merge=True)
+            batch.set(self.db.collection('users').document(str(record['uid'])), {'rating_synced': True}, merge=True)
+            batch.commit()
+            return
+        payload = {
+            field: value
+            for field, value in payload.items()
+            if field == 'updated_at' or persisted.get(field, value) != value
+        }
+        payload = self._as_increments(payload, persisted, self._SHARDED_COUNTERS)
+        rolled = [
+            period
+            for period in self._LEADERBOARD_PERIODS
+            if persisted.get(f'{period}_id') != snapshot.get(f'{period}_id')
+        ]
+        stored = (rating_ref.get().to_dict() or {}) if rolled else {}
+        gained = snapshot['points'] - int(persisted.get('points') or 0)
+        for period in self._LEADERBOARD_PERIODS:
+            field = f'{period}_points'
+            if period not in rolled:
+                payload = self._as_increments(payload, persisted, (field,))
+            elif stored.get(f'{period}_id') == snapshot.get(f'{period}_id'):
+                payload[field] = firestore.Increment(gained)
+        rating_ref.set(payload, merge=True)
+
+    @staticmethod
+    def _as_increments(changes: dict, persisted: dict, counters) -> dict:
+        result = dict(changes)
+        for field in counters:
+            value = result.get(field)
+            previous = persisted.get(field)
+            if isinstance(value, int) and isinstance(previous, int):
+                result[field] = firestore.Increment(value - previous)
+        return result
+
+    def _bump_record_version(self, uid: str) -> None:
+        with self._record_versions_lock:
+            self._record_versions[uid] = next(self._record_version_counter)
+            self._record_versions.move_to_end(uid)
+            while len(self._record_versions) > self._RECORD_VERSIONS_LIMIT:
+                self._evicted_record_version = self._record_versions.popitem(last=False)[1]
+
+    def _record_version(self, uid: str) -> int:
+        return self._record_versions.get(uid, self._evicted_record_version)
+
+    def _session_record(self, session: ClickerSession, now: datetime) -> dict:
+        version = self._record_version(session.uid)
+        if session.record is None or session.version != version:
+            session.record = self._get_or_create_clicker_record(
+                uid=session.uid,
+                now=now,
+                telegram_user_id=self._telegram_id_from_uid(session.uid),
+            )
+            session.version = self._record_version(session.uid)
+        return session.record
+
+    def _persist_clicker_tap(self, record: dict, profile_changed: bool = False) -> None:
+        self._bump_record_version(str(record['uid']))
+        if self.using_point_shards:
+            if profile_changed:
+                self._save_clicker_record(record)
+            else:
+                self._increment_point_shards(record)
+                self._cache_clicker_record(record)
+            self._upsert_clicker_rating(record)
+            return
+
+        self._save_clicker_record(record)
+        self._upsert_clicker_rating(record)
+
+    def _point_shards_ref(self, uid: str):
+        return self.db.collection('users').document(uid).collection(self._POINT_SHARDS_COLLECTION)
+
+    def _increment_point_shards(self, record: dict) -> None:
+        increments = {}
+        for field in self._SHARDED_COUNTERS:
+            delta = int(record.get(field, 0)) - int(record.get(f'_stored_{field}', 0))
+            if delta:
+                increments[field] = firestore.Increment(delta)
+        if not increments:
+            return
+
+        shard_id = str(next(self._shard_cursor) % self._point_shards)
+        self._point_shards_ref(str(record['uid'])).document(shard_id).set(increments, merge=True)
+        self._track_stored_counters(record)
+
+    def _aggregate_point_shards(self, uid: str, raw: dict) -> dict[str, int]:
+        totals = {field: int(raw.get(field) or 0) for field in self._SHARDED_COUNTERS}
+        for doc in self._point_shards_ref(uid).stream():
+            shard = doc.to_dict() or {}
+            for field in self._SHARDED_COUNTERS:
+                totals[field] += int(shard.get(field) or 0)
+        return totals
+
+    def _track_stored_counters(self, record: dict) -> None:
+        for field in self._SHARDED_COUNTERS:
+            record[f'_stored_{field}'] = int(record.get(field, 0))
+
+    def _rollup_clicker_ratings(self, records: list[dict]) -> None:
+        batch = self.db.batch()
+        operations = 0
+        now = datetime.now(timezone.utc)
+        for record in records:
+            uid = str(record['uid'])
+            snapshot = self.db.collection('users').document(uid).get()
+            raw = snapshot.to_dict() or {}
+            totals = self._aggregate_point_shards(uid, raw)
+            rolled = record.copy()
+            rolled.update(totals)
+            rolled['level'] = max(1, self._level_from_points(totals['points']))
+            rolled['updated_at'] = record.get('updated_at') or now
+
+            batch.set(
+                self.db.collection('ratings').document(uid),
+                self._serialize_clicker_rating(rolled),
+                merge=True,
+            )
+            operations += 1
+            if operations >= self._FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                batch = self.db.batch()
+                operations = 0
+
+        if operations:
+            batch.commit()
+
+    def _write_clicker_batch(self, records: list[dict]) -> None:
+        batch = self.db.batch()
+        operations = 0
+        for record in records:
+            uid = str(record['uid'])
+            batch.set(
+                self.db.collection('users').document(uid),
+                self._serialize_clicker_record(record),
+                merge=True,
+            )
+            batch.set(
+                self.db.collection('ratings').document(uid),
+                self._serialize_clicker_rating(record),
+                merge=True,
+            )
+            operations += 2
+            if operations >= self._FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                batch = self.db.batch()
+                operations = 0
+
+        if operations:
+            batch.commit()
+        if self._record_cache is not None:
+            for record in records:
+                self._record_cache.pop(str(record['uid']))
+
+    def _peek_clicker_record(self, uid: str, now: datetime) -> dict | None:
         if not self.using_firestore:
             raw = self._clicker_users.get(uid)
             if raw is None:
                 return None
             return self._normalize_clicker_record(raw, uid=uid, now=now)
 
+        if self._write_buffer is not None:
+            buffered = self._write_buffer.get(uid)
+            if buffered is not None:
+                return buffered
+
+        if self._record_cache is not None:
+            cached = self._record_cache.get(uid)
+            if cached is not None:
+                return cached.copy()
+        return None
+
+    def _fetch_clicker_record(self, uid: str, now: datetime) -> dict | None:
+        record = self._peek_clicker_record(uid, now)
+        if record is not None or not self.using_firestore:
+            return record
+
         snapshot = self.db.collection('users').document(uid).get()
         if not snapshot.exists:
             return None
         raw = snapshot.to_dict() or {}
-        return self._normalize_clicker_record(raw, uid=uid, now=now)
+        if self.using_point_shards:
+            raw.update(self._aggregate_point_shards(uid, raw))
+        record = self._normalize_clicker_record(raw, uid=uid, now=now)
+        if self.using_point_shards:
+            self._track_stored_counters(record)
+        self._remember_persisted(record, raw)
+        self._cache_clicker_record(record)
+        return record
 
     def _get_or_create_clicker_record(
         self,
@@ -358,7 +666,12 @@ class NightRepository:
 
         return current
 
-    def _to_clicker_state(self, record: dict, now: datetime) -> ClickerState:
+    def _to_clicker_state(
+        self,
+        record: dict,
+        now: datetime,
+        taps_in_current_second: int = 0,
+    ) -> ClickerState:
         daily_claimed_at = self._safe_datetime(record.get('daily_bonus_claimed_at'))
         next_daily_bonus_at: datetime | None = None
         daily_bonus_available = True
@@ -385,7 +698,7 @@ class NightRepository:
             lottery_joined=bool(record.get('lottery_joined', False)),
             lottery_entered_at=self._safe_datetime(record.get('lottery_entered_at')),
             night_mode_unlocked=bool(record.get('night_mode_unlocked', False)),
-            taps_in_current_second=max(0, int(record.get('taps_in_second', 0))),
+            taps_in_current_second=max(0, taps_in_current_second),
             level_start_points=self._points_for_level(level),
             next_level_points=self._next_level_points(level),
             updated_at=self._safe_datetime(record.get('updated_at')) or now,
@@ -410,6 +723,12 @@ class NightRepository:
         )
         return self._to_clicker_state(record, now=now)
 
+    def open_clicker_session(self, uid: str) -> tuple[ClickerSession, ClickerState]:
+        now = datetime.now(timezone.utc)
+        session = ClickerSession(uid=uid)
+        record = self._session_record(session, now=now)
+        return session, self._to_clicker_state(record, now=now)
+
     def get_clicker_state(self, uid: str) -> ClickerState:
         now = datetime.now(timezone.utc)
         telegram_user_id = self._telegram_id_from_uid(uid)
@@ -420,54 +739,146 @@ class NightRepository:
         )
         return self._to_clicker_state(record, now=now)
 
-    def tap_clicker(self, uid: str, taps: int) -> tuple[bool, int, int, int, bool, str, ClickerState]:
+    def tap_clicker(
+        self,
+        uid: str,
+        taps: int,
+        session: ClickerSession | None = None,
+    ) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
         now = datetime.now(timezone.utc)
-        telegram_user_id = self._telegram_id_from_uid(uid)
-        record = self._get_or_create_clicker_record(uid=uid, now=now, telegram_user_id=telegram_user_id)
-
         requested_taps = max(1, int(taps))
-        current_second = int(now.timestamp())
-        last_second = int(record.get('last_tap_second', 0))
-        taps_used = int(record.get('taps_in_second', 0)) if last_second == current_second else 0
-        max_taps = max(1, settings.clicker_max_taps_per_second)
-        allowed_taps = max(0, max_taps - taps_used)
-        accepted_taps = min(requested_taps, allowed_taps)
+        decision = self.tap_limiter.acquire(uid, requested_taps, now=now.timestamp())
+        return self._apply_clicker_taps(
+            uid=uid,
+            now=now,
+            requested_taps=requested_taps,
+            decision=decision,
+            session=session,
+        )
+
+    def tap_clicker_batch(
+        self,
+        uid: str,
+        timestamps_ms: list[int],
+        buckets: list[int],
+        session: ClickerSession | None = None,
+    ) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
+        now = datetime.now(timezone.utc)
+        max_seconds = max(1, settings.clicker_tap_batch_max_seconds)
+        max_slots = max_seconds * self._TAP_SLOTS_PER_SECOND
+        if timestamps_ms:
+            requested_taps = len(timestamps_ms)
+            slots = self._tap_slots_from_timestamps(timestamps_ms, max_slots)
+        else:
+            requested_taps = sum(max(0, int(count)) for count in buckets)
+            slots = [max(0, int(count)) for count in buckets[:max_slots]]
+
+        accepted = self._accept_tap_slots(slots, max(1, settings.clicker_max_taps_per_second))
+        decision = self.tap_limiter.acquire(
+            uid,
+            sum(accepted),
+            now=now.timestamp(),
+            capacity=max(1, settings.clicker_max_taps_per_second) * max_seconds,
+            recent=sum(accepted[-self._TAP_SLOTS_PER_SECOND:]),
+        )
+        return self._apply_clicker_taps(
+            uid=uid,
+            now=now,
+            requested_taps=requested_taps,
+            decision=decision,
+            session=session,
+        )
+
+    @classmethod
+    def _tap_slots_from_timestamps(cls, timestamps_ms: list[int], max_slots: int) -> list[int]:
+        started_at = min(timestamps_ms)
+        slot_ms = 1000 // cls._TAP_SLOTS_PER_SECOND
+        slots = [0] * min(max_slots, (max(timestamps_ms) - started_at) // slot_ms + 1)
+        for timestamp in timestamps_ms:
+            index = (timestamp - started_at) // slot_ms
+            if index < len(slots):
+                slots[index] += 1
+        return slots
+
+    @classmethod
+    def _accept_tap_slots(cls, slots: list[int], max_taps_per_second: int) -> list[int]:
+        accepted = [0] * len(slots)
+        window_taps = 0
+        for index, requested in enumerate(slots):
+            if index >= cls._TAP_SLOTS_PER_SECOND:
+                window_taps -= accepted[index - cls._TAP_SLOTS_PER_SECOND]
+            accepted[index] = min(requested, max(0, max_taps_per_second - window_taps))
+            window_taps += accepted[index]
+        return accepted
+
+    def _apply_clicker_taps(
+        self,
+        uid: str,
+        now: datetime,
+        requested_taps: int,
+        decision: RateLimitDecision,
+        session: ClickerSession | None = None,
+    ) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
+        telegram_user_id = self._telegram_id_from_uid(uid)
+        accepted_taps = decision.granted
         rejected_taps = max(0, requested_taps - accepted_taps)
-        throttled = accepted_taps == 0
-
-        multiplier = max(1, int(record.get('multiplier', 1)))
-        added_points = accepted_taps * multiplier
-        if added_points > 0:
-            record['points'] = int(record.get('points', 0)) + added_points
-            new_level = self._level_from_points(int(record['points']))
-            record['level'] = new_level
-            record['multiplier'] = new_level
-            record['night_mode_unlocked'] = True
-
-        record['last_tap_second'] = current_second
-        record['taps_in_second'] = taps_used + accepted_taps
-        record['updated_at'] = now
+        record = self._session_record(session, now=now) if session is not None else None
+
+        if accepted_taps == 0:
+            if record is None:
+                record = self._peek_clicker_record(uid=uid, now=now)
+            return (
+                False,
+                0,
+                rejected_taps,
+                0,
+                True,
+                f'Tap limit reached. Max {self.tap_limiter.rate:g} taps/sec.',
+                self._to_clicker_state(record, now=now, taps_in_current_second=decision.used) if record else None,
+            )
 
-        self._save_clicker_record(record)
-        self._upsert_clicker_rating(record)
+        if record is None:
+            record = self._get_or_create_clicker_record(uid=uid, now=now, telegram_user_id=telegram_user_id)
+        if self._write_buffer is not None:
+            record, (added_points, _) = self._write_buffer.apply(
+                record,
+                lambda current: self._add_tap_points(current, accepted_taps, now),
+            )
+            self._bump_record_version(uid)
+        else:
+            added_points, profile_changed = self._add_tap_points(record, accepted_taps, now)
+            self._persist_clicker_tap(record, profile_changed=profile_changed)
+        if session is not None:
+            session.record = record
+            session.version = self._record_version(uid)
 
-        if throttled:
-            message = 'Tap limit reached. Max 10 taps/sec.'
-        elif rejected_taps > 0:
+        if rejected_taps > 0:
             message = 'Part of taps were rejected by anti-cheat.'
         else:
             message = 'Tap accepted.'
 
         return (
-            added_points > 0,
+            True,
             accepted_taps,
             rejected_taps,
             added_points,
-            throttled,
+            False,
             message,
-            self._to_clicker_state(record, now=now),
+            self._to_clicker_state(record, now=now, taps_in_current_second=decision.used),
         )
 
+    def _add_tap_points(self, record: dict, taps: int, now: datetime) -> tuple[int, bool]:
+        added_points = taps * max(1, int(record.get('multiplier', 1)))
+        profile_changed = not bool(record.get('night_mode_unlocked', False))
+        profile_changed = self._roll_period_buckets(record, now) or profile_changed
+        record['points'] = int(record.get('points', 0)) + added_points
+        new_level = self._level_from_points(int(record['points']))
+        record['level'] = new_level
+        record['multiplier'] = new_level
+        record['night_mode_unlocked'] = True
+        record['updated_at'] = now
+        return added_points, profile_changed
+
     def claim_daily_bonus(self, uid: str) -> tuple[bool, int, str, ClickerState]:
         now = datetime.now(timezone.utc)
         telegram_user_id = self._telegram_id_from_uid(uid)
@@ -479,6 +890,7 @@ class NightRepository:
 
         level = max(1, int(record.get('level', 1)))
         added_points = level * max(1, settings.clicker_daily_bonus_per_level)
+        self._roll_period_buckets(record, now)
         record['points'] = int(record.get('points', 0)) + added_points
         new_level = self._level_from_points(int(record['points']))
         record['level'] = new_level
@@ -517,16 +929,19 @@ class NightRepository:
         user_target_level = int(record.get('level', 1)) + bonus_levels
         ref_target_level = int(referrer_record.get('level', 1)) + bonus_levels
 
-        record['points'] = max(int(record.get('points', 0)), self._points_for_level(user_target_level))
+        self._roll_period_buckets(record, now)
+        user_points = int(record.get('points', 0))
+        record['points'] = max(user_points, self._points_for_level(user_target_level))
         record['level'] = self._level_from_points(int(record['points']))
         record['multiplier'] = int(record['level'])
         record['referred_by'] = referrer_telegram_id
         record['updated_at'] = now
+        self._exclude_from_periods(record, int(record['points']) - user_points)
 
-        referrer_record['points'] = max(
-            int(referrer_record.get('points', 0)),
-            self._points_for_level(ref_target_level),
-        )
+        self._roll_period_buckets(referrer_record, now)
+        referrer_points = int(referrer_record.get('points', 0))
+        referrer_record['points'] = max(referrer_points, self._points_for_level(ref_target_level))
+        self._exclude_from_periods(referrer_record, int(referrer_record['points']) - referrer_points)
         referrer_record['level'] = self._level_from_points(int(referrer_record['points']))
         referrer_record['multiplier'] = int(referrer_record['level'])
         referrer_record['referrals'] = max(0, int(referrer_record.get('referrals', 0))) + 1
@@ -540,55 +955,269 @@ class NightRepository:
         return True, 'Referral bonus applied (+3 levels for both).', self._to_clicker_state(record, now=now)
 
     def clicker_leaderboard(self, limit: int = 50) -> list[ClickerLeaderboardItem]:
-        normalized_limit = min(50, max(1, int(limit)))
+        items, _, _ = self.clicker_leaderboard_page(limit=limit)
+        return items
+
+    def clicker_leaderboard_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[ClickerLeaderboardItem], str | None, datetime | None]:
+        normalized_limit = min(self._LEADERBOARD_PAGE_LIMIT, max(1, int(limit)))
+        now = datetime.now(timezone.utc)
+        after = self._decode_leaderboard_cursor(cursor) if cursor else None
+        snapshot_at: datetime | None = None
+        source = 'live'
 
         if not self.using_firestore:
-            rows = sorted(
-                self._clicker_users.values(),
-                key=lambda row: (
-                    -int(row.get('points', 0)),
-                    -(self._safe_datetime(row.get('updated_at')) or datetime.now(timezone.utc)).timestamp(),
-                ),
-            )[:normalized_limit]
-            now = datetime.now(timezone.utc)
-            return [
-                ClickerLeaderboardItem(
-                    rank=index + 1,
-                    uid=str(row.get('uid', 'unknown')),
-                    telegram_user_id=row.get('telegram_user_id'),
-                    display_name=str(row.get('display_name', 'Player')),
-                    points=max(0, int(row.get('points', 0))),
-                    level=max(1, int(row.get('level', 1))),
-                    referrals=max(0, int(row.get('referrals', 0))),
-                    updated_at=self._safe_datetime(row.get('updated_at')) or now,
+            if after is None:
+                start, uids = 0, self._leaderboard_index.head(normalized_limit + 1)
+            else:
+                _, points, updated_at, uid, _ = after
+                entry = (*self._leaderboard_key({'points': points, 'updated_at': updated_at}), uid)
+                start, uids = self._leaderboard_index.slice_after(entry, normalized_limit + 1)
+            rows = [(start + index + 1, self._clicker_users[uid], uid) for index, uid in enumerate(uids)]
+            has_more = len(rows) > normalized_limit
+        else:
+            snapshot = None
+            if after is None:
+                if normalized_limit <= settings.clicker_leaderboard_snapshot_size:
+                    snapshot = self._read_leaderboard_snapshot(now)
+            elif after[0] != 'live':
+                snapshot = self._read_leaderboard_snapshot(now)
+                if snapshot is None or snapshot[0].isoformat() != after[0]:
+                    raise CursorError('Leaderboard snapshot expired, reload the first page')
+            if snapshot is not None:
+                snapshot_at, snapshot_rows = snapshot
+                start = after[4] if after is not None else 0
+                end = min(start + normalized_limit, settings.clicker_leaderboard_snapshot_size)
+                rows = [
+                    (start + index + 1, raw, str(raw.get('uid', '')))
+                    for index, raw in enumerate(snapshot_rows[start:end])
+                ]
+                has_more = len(snapshot_rows) > end
+                if end < settings.clicker_leaderboard_snapshot_size:
+                    source = snapshot_at.isoformat()
+            else:
+                query = self._ratings_ranking_query()
+                start = 0
+                if after is not None:
+                    _, points, updated_at, uid, start = after
+                    query = query.start_after({'points': points, 'updated_at': updated_at, 'uid': uid})
+                docs = query.limit(normalized_limit + 1).stream()
+                rows = [(start + index + 1, doc.to_dict() or {}, doc.id) for index, doc in enumerate(docs)]
+                has_more = len(rows) > normalized_limit
+
+        items = [self._to_leaderboard_item(rank, raw, uid, now) for rank, raw, uid in rows[:normalized_limit]]
+        next_cursor = None
+        if has_more and items:
+            last = items[-1]
+            next_cursor = encode_cursor([source, last.points, last.updated_at.isoformat(), last.uid, last.rank])
+        return items, next_cursor, snapshot_at
+
+    def materialize_clicker_leaderboard(self) -> int:
+        if not self.using_firestore:
+            return 0
+        size = max(1, settings.clicker_leaderboard_snapshot_size)
+        rows = []
+        for doc in self._ratings_ranking_query().limit(size + 1).stream():
+            raw = doc.to_dict() or {}
+            rows.append({
+                'uid': str(raw.get('uid') or doc.id),
+                'telegram_user_id': raw.get('telegram_user_id'),
+                'display_name': raw.get('display_name', 'Player'),
+                'points': int(raw.get('points', 0)),
+                'level': int(raw.get('level', 1)),
+                'referrals': int(raw.get('referrals', 0)),
+                'updated_at': raw.get('updated_at'),
+            })
+        self.db.collection(self._LEADERBOARD_SNAPSHOTS_COLLECTION).document('current').set({
+            'rows': rows,
+            'size': size,
+            'built_at': datetime.now(timezone.utc),
+        })
+        return len(rows)
+
+    def _read_leaderboard_snapshot(self, now: datetime) -> tuple[datetime, list[dict]] | None:
+        if self._leaderboard_materializer is None:
+            return None
+        self._leaderboard_materializer.start()
+
+        snapshot = self.db.collection(self._LEADERBOARD_SNAPSHOTS_COLLECTION).document('current').get()
+        if not snapshot.exists:
+            return None
+        raw = snapshot.to_dict() or {}
+        built_at = self._safe_datetime(raw.get('built_at'))
+        max_age = timedelta(seconds=settings.clicker_leaderboard_snapshot_seconds * 2)
+        if built_at is None or now - built_at > max_age:
+            return None
+        if int(raw.get('size') or 0) < settings.clicker_leaderboard_snapshot_size:
+            return None
+        rows = raw.get('rows')
+        return built_at, rows if isinstance(rows, list) else []
+
+    def _ratings_ranking_query(self):
+        return (
+            self.db.collection('ratings')
+            .order_by('points', direction=firestore.Query.DESCENDING)
+            .order_by('updated_at', direction=firestore.Query.DESCENDING)
+            .order_by('uid', direction=firestore.Query.ASCENDING)
+        )
+
+    def clicker_period_leaderboard(
+        self,
+        period: str,
+        limit: int = 50,
+    ) -> tuple[str, list[ClickerLeaderboardItem]]:
+        if period not in self._LEADERBOARD_PERIODS:
+            raise ValueError(f'Unknown leaderboard period: {period}')
+        normalized_limit = min(self._LEADERBOARD_PAGE_LIMIT, max(1, int(limit)))
+        now = datetime.now(timezone.utc)
+        period_id = self._period_id(period, now)
+
+        if not self.using_firestore:
+            index = self._period_indexes.get(period_id)
+            uids = index.head(normalized_limit) if index is not None else []
+            rows = [(self._clicker_users[uid], uid) for uid in uids]
+            items = [
+                self._to_leaderboard_item(
+                    position + 1,
+                    {**raw, 'points': self._period_points(raw, period)},
+                    uid,
+                    now,
                 )
-                for index, row in enumerate(rows)
+                for position, (raw, uid) in enumerate(rows)
             ]
+            return period_id, items
 
         docs = (
             self.db.collection('ratings')
-            .order_by('points', direction=firestore.Query.DESCENDING)
+            .where(filter=firestore.FieldFilter(f'{period}_id', '==', period_id))
+            .order_by(f'{period}_points', direction=firestore.Query.DESCENDING)
+            .order_by('updated_at', direction=firestore.Query.DESCENDING)
             .limit(normalized_limit)
             .stream()
         )
+        items = []
+        for position, doc in enumerate(docs):
+            raw = doc.to_dict() or {}
+            raw['points'] = raw.get(f'{period}_points', 0)
+            items.append(self._to_leaderboard_item(position + 1, raw, doc.id, now))
+        return period_id, items
+
+    def _decode_leaderboard_cursor(self, cursor: str) -> tuple[str, int, datetime, str, int]:
+        source, points, updated_at, uid, rank = decode_cursor(cursor, size=5)
+        try:
+            decoded = (
+                str(source),
+                int(points),
+                datetime.fromisoformat(str(updated_at)),
+                str(uid),
+                max(0, int(rank)),
+            )
+        except (TypeError, ValueError) as exc:
+            raise CursorError('Invalid cursor') from exc
+        if decoded[2].tzinfo is None:
+            raise CursorError('Invalid cursor')
+        return decoded
 
-        result: list[ClickerLeaderboardItem] = []
+    def clicker_rank(
+        self,
+        uid: str,
+        above: int = 5,
+        below: int = 5,
+    ) -> tuple[
+        int | None,
+        int,
+        ClickerLeaderboardItem | None,
+        list[ClickerLeaderboardItem],
+        list[ClickerLeaderboardItem],
+        datetime | None,
+    ]:
         now = datetime.now(timezone.utc)
-        for index, doc in enumerate(docs):
+        above = max(0, int(above))
+        below = max(0, int(below))
+        record = self._fetch_clicker_record(uid=uid, now=now)
+
+        if not self.using_firestore:
+            index = self._leaderboard_index.rank(uid) if record is not None else None
+            if index is None:
+                return None, len(self._leaderboard_index), None, [], [], None
+            start = max(0, index - above)
+            window = self._leaderboard_index.slice(start, index + below + 1)
+            items = [
+                self._to_leaderboard_item(start + offset + 1, self._clicker_users[member], member, now)
+                for offset, member in enumerate(window)
+            ]
+            split = index - start
+            return index + 1, len(self._leaderboard_index), items[split], items[:split], items[split + 1:], None
+
+        self._rank_builder.start()
+        snapshot = self._rank_snapshot
+        if snapshot is None:
+            return None, 0, None, [], [], None
+        if record is None:
+            return None, len(snapshot.rows), None, [], [], snapshot.built_at
+        own_index = snapshot.positions.get(uid)
+        total = len(snapshot.rows) + (0 if own_index is not None else 1)
+        index = bisect_left(snapshot.keys, (*self._leaderboard_key(record), uid))
+        if own_index is not None and own_index < index:
+            index -= 1
+
+        def other(position: int) -> dict:
+            if own_index is not None and position >= own_index:
+                position += 1
+            return snapshot.rows[position]
+
+        others = total - 1
+        neighbours_above = [
+            self._to_leaderboard_item(position + 1, other(position), '', now)
+            for position in range(max(0, index - above), index)
+        ]
+        neighbours_below = [
+            self._to_leaderboard_item(position + 2, other(position), '', now)
+            for position in range(index, min(others, index + below))
+        ]
+        me = self._to_leaderboard_item(index + 1, self._serialize_clicker_rating(record), uid, now)
+        return index + 1, total, me, neighbours_above, neighbours_below, snapshot.built_at
+
+    def refresh_rank_snapshot(self) -> int:
+        snapshot = self._build_rank_snapshot(datetime.now(timezone.utc))
+        self._rank_snapshot = snapshot
+        return len(snapshot.rows)
+
+    def _build_rank_snapshot(self, now: datetime) -> ClickerRankSnapshot:
+        docs = (
+            self.db.collection('ratings')
+            .select(['uid', 'telegram_user_id', 'display_name', 'points', 'level', 'referrals', 'updated_at'])
+            .order_by('points', direction=firestore.Query.DESCENDING)
+            .stream()
+        )
+        entries = []
+        for doc in docs:
             raw = doc.to_dict() or {}
-            result.append(
-                ClickerLeaderboardItem(
-                    rank=index + 1,
-                    uid=str(raw.get('uid', doc.id)),
-                    telegram_user_id=raw.get('telegram_user_id') if isinstance(raw.get('telegram_user_id'), int) else None,
-                    display_name=str(raw.get('display_name', 'Player')),
-                    points=max(0, int(raw.get('points', 0))),
-                    level=max(1, int(raw.get('level', 1))),
-                    referrals=max(0, int(raw.get('referrals', 0))),
-                    updated_at=self._safe_datetime(raw.get('updated_at')) or now,
-                )
-            )
-        return result
+            raw['uid'] = str(raw.get('uid') or doc.id)
+            entries.append(((*self._leaderboard_key(raw), raw['uid']), raw))
+        entries.sort(key=lambda entry: entry[0])
+        return ClickerRankSnapshot(
+            built_at=now,
+            rows=[raw for _, raw in entries],
+            keys=[key for key, _ in entries],
+            positions={raw['uid']: index for index, (_, raw) in enumerate(entries)},
+        )
+
+    def _to_leaderboard_item(self, rank: int, raw: dict, fallback_uid: str, now: datetime) -> ClickerLeaderboardItem:
+        telegram_user_id = raw.get('telegram_user_id')
+        return ClickerLeaderboardItem(
+            rank=rank,
+            uid=str(raw.get('uid') or fallback_uid or 'unknown'),
+            telegram_user_id=telegram_user_id if isinstance(telegram_user_id, int) else None,
+            display_name=str(raw.get('display_name', 'Player')),
+            points=max(0, int(raw.get('points', 0))),
+            level=max(1, int(raw.get('level', 1))),
+            referrals=max(0, int(raw.get('referrals', 0))),
+            updated_at=self._safe_datetime(raw.get('updated_at')) or now,
+        )
 
     def enter_lottery(self, uid: str) -> tuple[bool, str, datetime | None, ClickerState]:
         now = datetime.now(timezone.utc)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+FlushWriter = Callable[[list[dict]], None]
+T = TypeVar('T')
+
+
+class ClickerWriteBuffer:
+    _MAX_BACKOFF_SECONDS = 60.0
+
+    def __init__(
+        self,
+        writer: FlushWriter,
+        flush_interval_seconds: float = 2.0,
+        max_dirty: int = 200,
+        idle_seconds: float = 60.0,
+    ) -> None:
+        self._writer = writer
+        self.flush_interval_seconds = max(0.05, flush_interval_seconds)
+        self.max_dirty = max(1, max_dirty)
+        self.idle_seconds = max(self.flush_interval_seconds, idle_seconds)
+
+        self._records: dict[str, dict] = {}
+        self._touched_at: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.failures = 0
+
+    @property
+    def dirty_count(self) -> int:
+        with self._lock:
+            return len(self._dirty)
+
+    def get(self, uid: str) -> dict | None:
+        with self._lock:
+            record = self._records.get(uid)
+            if record is None:
+                return None
+            self._touched_at[uid] = time.monotonic()
+            return record.copy()
+
+    def put(self, record: dict) -> None:
+        uid = str(record['uid'])
+        with self._lock:
+            self._records[uid] = record.copy()
+            self._touched_at[uid] = time.monotonic()
+            self._dirty.discard(uid)
+
+    def stage(self, record: dict) -> None:
+        uid = str(record['uid'])
+        with self._lock:
+            self._records[uid] = record.copy()
+            self._touched_at[uid] = time.monotonic()
+            self._dirty.add(uid)
+            dirty_count = len(self._dirty)
+
+        self._ensure_flusher()
+        if dirty_count >= self.max_dirty:
+            self._wake.set()
+
+    def apply(self, record: dict, change: Callable[[dict], T]) -> tuple[dict, T]:
+        uid = str(record['uid'])
+        with self._lock:
+            current = self._records.get(uid)
+            if current is None:
+                current = record.copy()
+                self._records[uid] = current
+            result = change(current)
+            self._touched_at[uid] = time.monotonic()
+            self._dirty.add(uid)
+            dirty_count = len(self._dirty)
+            updated = current.copy()
+
+        self._ensure_flusher()
+        if dirty_count >= self.max_dirty:
+            self._wake.set()
+        return updated, result
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                pending = [self._records[uid].copy() for uid in self._dirty]
+                self._dirty.clear()
+
+            if pending:
+                try:
+                    self._writer(pending)
+                except Exception:
+                    with self._lock:
+                        self._dirty.update(str(record['uid']) for record in pending)
+                    raise
+
+            self._evict_idle()
+            return len(pending)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval_seconds * 2)
+        self.flush()
+
+    def _evict_idle(self) -> None:
+        deadline = time.monotonic() - self.idle_seconds
+        with self._lock:
+            stale = [
+                uid
+                for uid, touched_at in self._touched_at.items()
+                if touched_at < deadline and uid not in self._dirty
+            ]
+            for uid in stale:
+                self._records.pop(uid, None)
+                self._touched_at.pop(uid, None)
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name='clicker-write-buffer',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        delay = self.flush_interval_seconds
+        while not self._stopped.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.flush()
+                delay = self.flush_interval_seconds
+            except Exception:
+                self.failures += 1
+                delay = min(self._MAX_BACKOFF_SECONDS, delay * 2)
+                logger.exception(
+                    'clicker write buffer flush failed (%s dirty records, retrying in %.1fs)',
+                    self.dirty_count,
+                    delay,
+                )
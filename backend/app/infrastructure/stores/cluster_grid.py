@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+
+from app.core.geohash import BoundingBox
+
+MAX_MERCATOR_LAT = 85.05112878
+
+Cell = tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class Cluster:
+    zoom: int
+    x: int
+    y: int
+    count: int
+    lat: float
+    lng: float
+
+
+def cell_of(lat: float, lng: float, zoom: int, cell_bits: int) -> tuple[int, int]:
+    size = 1 << (zoom + cell_bits)
+    lat = min(MAX_MERCATOR_LAT, max(-MAX_MERCATOR_LAT, lat))
+    x = int((lng + 180.0) / 360.0 * size)
+    sin_lat = math.sin(math.radians(lat))
+    y = int((0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * size)
+    return min(size - 1, max(0, x)), min(size - 1, max(0, y))
+
+
+def cell_ranges(bbox: BoundingBox, zoom: int, cell_bits: int) -> list[tuple[int, int, int, int]]:
+    ranges = []
+    for part in bbox.parts():
+        low_x, low_y = cell_of(part.max_lat, part.min_lng, zoom, cell_bits)
+        high_x, high_y = cell_of(part.min_lat, part.max_lng, zoom, cell_bits)
+        ranges.append((low_x, high_x, low_y, high_y))
+    return ranges
+
+
+def range_size(ranges: list[tuple[int, int, int, int]]) -> int:
+    return sum((high_x - low_x + 1) * (high_y - low_y + 1) for low_x, high_x, low_y, high_y in ranges)
+
+
+class ClusterGrid:
+    def __init__(self, max_zoom: int = 14, cell_bits: int = 2) -> None:
+        self.max_zoom = max_zoom
+        self.cell_bits = cell_bits
+        self._cells: list[dict[tuple[int, int], list[float]]] = [{} for _ in range(max_zoom + 1)]
+        self._lock = threading.Lock()
+
+    def cells(self, lat: float, lng: float) -> list[Cell]:
+        return [(zoom, *cell_of(lat, lng, zoom, self.cell_bits)) for zoom in range(self.max_zoom + 1)]
+
+    def add(self, lat: float, lng: float, weight: int = 1) -> None:
+        with self._lock:
+            for zoom, x, y in self.cells(lat, lng):
+                level = self._cells[zoom]
+                aggregate = level.setdefault((x, y), [0, 0.0, 0.0])
+                aggregate[0] += weight
+                aggregate[1] += lat * weight
+                aggregate[2] += lng * weight
+                if aggregate[0] <= 0:
+                    del level[(x, y)]
+
+    def remove(self, lat: float, lng: float) -> None:
+        self.add(lat, lng, weight=-1)
+
+    def clusters(self, zoom: int, bbox: BoundingBox) -> list[Cluster]:
+        zoom = min(self.max_zoom, max(0, zoom))
+        ranges = cell_ranges(bbox, zoom, self.cell_bits)
+        level = self._cells[zoom]
+        result = []
+        with self._lock:
+            if range_size(ranges) > len(level):
+                keys = [
+                    key
+                    for key in level
+                    if any(low_x <= key[0] <= high_x and low_y <= key[1] <= high_y for low_x, high_x, low_y, high_y in ranges)
+                ]
+            else:
+                keys = [
+                    (x, y)
+                    for low_x, high_x, low_y, high_y in ranges
+                    for x in range(low_x, high_x + 1)
+                    for y in range(low_y, high_y + 1)
+                ]
+            for x, y in keys:
+                aggregate = level.get((x, y))
+                if aggregate is not None:
+                    count, sum_lat, sum_lng = aggregate
+                    result.append(Cluster(zoom, x, y, int(count), sum_lat / count, sum_lng / count))
+        return result
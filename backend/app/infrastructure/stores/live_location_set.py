@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import secrets
+import threading
+from collections import OrderedDict, deque
+from typing import Iterator
+
+from app.domain.schemas import UserLocation
+
+
+class LiveLocationSet:
+    def __init__(self) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._entries: OrderedDict[str, tuple[int, UserLocation]] = OrderedDict()
+        self._by_city: dict[str, OrderedDict[str, None]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[UserLocation]:
+        with self._lock:
+            locations = [location for _, location in reversed(self._entries.values())]
+        return iter(locations)
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def oldest_sequence(self) -> int:
+        return 0
+
+    def get(self, uid: str) -> UserLocation | None:
+        entry = self._entries.get(uid)
+        return entry[1] if entry is not None else None
+
+    def upsert(self, location: UserLocation) -> UserLocation | None:
+        with self._lock:
+            previous = self._entries.pop(location.uid, None)
+            if previous is not None:
+                self._unindex_city(previous[1])
+            self._entries[location.uid] = (self._sequence, location)
+            self._by_city.setdefault(self._city_key(location.city), OrderedDict())[location.uid] = None
+            self._sequence += 1
+        return previous[1] if previous is not None else None
+
+    def latest(self, limit: int) -> tuple[list[UserLocation], int]:
+        with self._lock:
+            result = []
+            for _, location in reversed(self._entries.values()):
+                if len(result) >= limit:
+                    break
+                result.append(location)
+            return result, self._sequence
+
+    def since(self, sequence: int, limit: int) -> tuple[list[UserLocation], int]:
+        with self._lock:
+            oldest: deque[tuple[int, UserLocation]] = deque(maxlen=max(0, limit))
+            for entry in reversed(self._entries.values()):
+                if entry[0] < sequence:
+                    break
+                oldest.append(entry)
+            if not oldest:
+                return [], max(sequence, 0)
+            return [location for _, location in reversed(oldest)], oldest[0][0] + 1
+
+    def by_uid(self, uid: str, limit: int) -> list[UserLocation]:
+        location = self.get(uid)
+        return [location] if location is not None and limit > 0 else []
+
+    def by_city(self, city: str, limit: int) -> list[UserLocation]:
+        with self._lock:
+            uids = self._by_city.get(self._city_key(city))
+            if not uids:
+                return []
+            result = []
+            for uid in reversed(uids):
+                if len(result) >= limit:
+                    break
+                result.append(self._entries[uid][1])
+            return result
+
+    def _unindex_city(self, location: UserLocation) -> None:
+        key = self._city_key(location.city)
+        uids = self._by_city.get(key)
+        if uids is not None:
+            uids.pop(location.uid, None)
+            if not uids:
+                del self._by_city[key]
+
+    @staticmethod
+    def _city_key(city: str) -> str:
+        return city.strip()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import secrets
+import threading
+from collections import deque
+from typing import Iterable, Iterator
+
+from app.domain.schemas import UserLocation
+
+
+class LocationRing:
+    def __init__(self, capacity: int, items: Iterable[UserLocation] = ()) -> None:
+        self.capacity = max(1, int(capacity))
+        self.epoch = secrets.token_hex(4)
+        self._slots: list[UserLocation | None] = [None] * self.capacity
+        self._sequence = 0
+        self._by_uid: dict[str, deque[int]] = {}
+        self._by_city: dict[str, deque[int]] = {}
+        self._lock = threading.Lock()
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return min(self._sequence, self.capacity)
+
+    def __iter__(self) -> Iterator[UserLocation]:
+        with self._lock:
+            newest = self._sequence
+        sequence = newest
+        while sequence > max(0, newest - self.capacity):
+            sequence -= 1
+            with self._lock:
+                if sequence < self._sequence - self.capacity:
+                    return
+                location = self._slots[sequence % self.capacity]
+            if location is not None:
+                yield location
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def oldest_sequence(self) -> int:
+        return max(0, self._sequence - self.capacity)
+
+    def append(self, location: UserLocation) -> UserLocation | None:
+        with self._lock:
+            sequence = self._sequence
+            slot = sequence % self.capacity
+            evicted = self._slots[slot]
+            if evicted is not None:
+                self._unindex(self._by_uid, evicted.uid, sequence - self.capacity)
+                self._unindex(self._by_city, self._city_key(evicted.city), sequence - self.capacity)
+            self._slots[slot] = location
+            self._by_uid.setdefault(location.uid, deque()).append(sequence)
+            self._by_city.setdefault(self._city_key(location.city), deque()).append(sequence)
+            self._sequence = sequence + 1
+        return evicted
+
+    def latest(self, limit: int) -> tuple[list[UserLocation], int]:
+        with self._lock:
+            newest = self._sequence
+            oldest = max(self.oldest_sequence, newest - max(0, limit))
+            return [self._slots[sequence % self.capacity] for sequence in range(newest - 1, oldest - 1, -1)], newest
+
+    def since(self, sequence: int, limit: int) -> tuple[list[UserLocation], int]:
+        with self._lock:
+            start = max(sequence, self.oldest_sequence)
+            stop = min(self._sequence, start + max(0, limit))
+            return [self._slots[position % self.capacity] for position in range(start, stop)], stop
+
+    def by_uid(self, uid: str, limit: int) -> list[UserLocation]:
+        return self._select(self._by_uid, uid, limit)
+
+    def by_city(self, city: str, limit: int) -> list[UserLocation]:
+        return self._select(self._by_city, self._city_key(city), limit)
+
+    def _select(self, index: dict[str, deque[int]], key: str, limit: int) -> list[UserLocation]:
+        with self._lock:
+            sequences = index.get(key)
+            if not sequences:
+                return []
+            result = []
+            for sequence in reversed(sequences):
+                if len(result) >= limit:
+                    break
+                result.append(self._slots[sequence % self.capacity])
+            return result
+
+    @staticmethod
+    def _unindex(index: dict[str, deque[int]], key: str, sequence: int) -> None:
+        sequences = index.get(key)
+        if sequences and sequences[0] == sequence:
+            sequences.popleft()
+            if not sequences:
+                del index[key]
+
+    @staticmethod
+    def _city_key(city: str) -> str:
+        return city.strip()
@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 from hashlib import sha256
 from typing import TypedDict
 
+from app.core.config import settings
 from app.domain.schemas import CityRankingItem, UserLocation
+from app.infrastructure.stores.location_ring import LocationRing
 
 
 class BoundQr(TypedDict):
@@ -17,45 +19,48 @@ class BoundQr(TypedDict):
 
 @dataclass
 class InMemoryStore:
-    locations: list[UserLocation]
+    locations: LocationRing
     city_ranking: list[CityRankingItem]
     bound_qr: dict[str, BoundQr]
 
 
 now = datetime.now(timezone.utc)
 store = InMemoryStore(
-    locations=[
-        UserLocation(
-            id='loc-1',
-            uid='demo-user-1',
-            name='Night Rider',
-            city='Yerevan',
-            country='Armenia',
-            lat=40.1772,
-            lng=44.5035,
-            created_at=now,
-        ),
-        UserLocation(
-            id='loc-2',
-            uid='demo-user-2',
-            name='Moscow Clubber',
-            city='Moscow',
-            country='Russia',
-            lat=55.7558,
-            lng=37.6173,
-            created_at=now,
-        ),
-        UserLocation(
-            id='loc-3',
-            uid='demo-user-3',
-            name='Almaty Neon',
-            city='Almaty',
-            country='Kazakhstan',
-            lat=43.222,
-            lng=76.8512,
-            created_at=now,
-        ),
-    ],
+    locations=LocationRing(
+        capacity=settings.locations_memory_capacity,
+        items=[
+            UserLocation(
+                id='loc-3',
+                uid='demo-user-3',
+                name='Almaty Neon',
+                city='Almaty',
+                country='Kazakhstan',
+                lat=43.222,
+                lng=76.8512,
+                created_at=now,
+            ),
+            UserLocation(
+                id='loc-2',
+                uid='demo-user-2',
+                name='Moscow Clubber',
+                city='Moscow',
+                country='Russia',
+                lat=55.7558,
+                lng=37.6173,
+                created_at=now,
+            ),
+            UserLocation(
+                id='loc-1',
+                uid='demo-user-1',
+                name='Night Rider',
+                city='Yerevan',
+                country='Armenia',
+                lat=40.1772,
+                lng=44.5035,
+                created_at=now,
+            ),
+        ],
+    ),
     city_ranking=[
         CityRankingItem(city='Yerevan', country='Armenia', count_items=132, updated_at=now),
         CityRankingItem(city='Moscow', country='Russia', count_items=117, updated_at=now),
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Hashable
+
+SortKey = tuple
+
+
+class SortedIndex:
+    _LOAD = 512
+
+    def __init__(self) -> None:
+        self._lists: list[list[SortKey]] = []
+        self._maxes: list[SortKey] = []
+        self._entries: dict[Hashable, SortKey] = {}
+        self._fenwick: list[int] | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self._entries
+
+    def upsert(self, member: Hashable, key: SortKey) -> None:
+        entry = (*key, member)
+        with self._lock:
+            current = self._entries.get(member)
+            if current == entry:
+                return
+            if current is not None:
+                self._remove_entry(current)
+            self._insert_entry(entry)
+            self._entries[member] = entry
+
+    def discard(self, member: Hashable) -> None:
+        with self._lock:
+            current = self._entries.pop(member, None)
+            if current is not None:
+                self._remove_entry(current)
+
+    def head(self, limit: int) -> list[Hashable]:
+        return self.slice(0, limit)
+
+    def rank(self, member: Hashable) -> int | None:
+        with self._lock:
+            entry = self._entries.get(member)
+            if entry is None:
+                return None
+            index = bisect_left(self._maxes, entry)
+            return self._prefix(index) + bisect_left(self._lists[index], entry)
+
+    def slice(self, start: int, stop: int) -> list[Hashable]:
+        return [entry[-1] for entry in self._slice_entries(start, stop)]
+
+    def slice_after(self, entry: SortKey, limit: int) -> tuple[int, list[Hashable]]:
+        with self._lock:
+            start = self._position_after(entry)
+            return start, self.slice(start, start + limit)
+
+    def entries_after(self, entry: SortKey, limit: int) -> list[SortKey]:
+        with self._lock:
+            start = self._position_after(entry)
+            return self._slice_entries(start, start + limit)
+
+    def _position_after(self, entry: SortKey) -> int:
+        index = bisect_right(self._maxes, entry)
+        if index == len(self._lists):
+            return len(self._entries)
+        return self._prefix(index) + bisect_right(self._lists[index], entry)
+
+    def _slice_entries(self, start: int, stop: int) -> list[SortKey]:
+        start = max(0, start)
+        result: list[SortKey] = []
+        with self._lock:
+            if stop <= start or start >= len(self._entries):
+                return result
+            index, offset = self._locate(start)
+            remaining = stop - start
+            while index < len(self._lists) and remaining > 0:
+                chunk = self._lists[index][offset:offset + remaining]
+                result.extend(chunk)
+                remaining -= len(chunk)
+                index += 1
+                offset = 0
+        return result
+
+    def _insert_entry(self, entry: SortKey) -> None:
+        if not self._lists:
+            self._lists.append([entry])
+            self._maxes.append(entry)
+            self._fenwick = None
+            return
+
+        index = bisect_left(self._maxes, entry)
+        if index == len(self._maxes):
+            index -= 1
+            self._lists[index].append(entry)
+        else:
+            insort(self._lists[index], entry)
+        self._maxes[index] = self._lists[index][-1]
+
+        chunk = self._lists[index]
+        if len(chunk) > self._LOAD * 2:
+            half = chunk[self._LOAD:]
+            del chunk[self._LOAD:]
+            self._maxes[index] = chunk[-1]
+            self._lists.insert(index + 1, half)
+            self._maxes.insert(index + 1, half[-1])
+            self._fenwick = None
+        else:
+            self._fenwick_add(index, 1)
+
+    def _remove_entry(self, entry: SortKey) -> None:
+        index = bisect_left(self._maxes, entry)
+        chunk = self._lists[index]
+        position = bisect_left(chunk, entry)
+        del chunk[position]
+        if chunk:
+            self._maxes[index] = chunk[-1]
+            self._fenwick_add(index, -1)
+        else:
+            del self._lists[index]
+            del self._maxes[index]
+            self._fenwick = None
+
+    def _tree(self) -> list[int]:
+        if self._fenwick is None:
+            tree = [0] + [len(chunk) for chunk in self._lists]
+            for position in range(1, len(tree)):
+                parent = position + (position & -position)
+                if parent < len(tree):
+                    tree[parent] += tree[position]
+            self._fenwick = tree
+        return self._fenwick
+
+    def _fenwick_add(self, index: int, delta: int) -> None:
+        if self._fenwick is None:
+            return
+        position = index + 1
+        while position < len(self._fenwick):
+            self._fenwick[position] += delta
+            position += position & -position
+
+    def _prefix(self, index: int) -> int:
+        tree = self._tree()
+        total = 0
+        position = index
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def _locate(self, offset: int) -> tuple[int, int]:
+        tree = self._tree()
+        position = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            candidate = position + step
+            if candidate < len(tree) and tree[candidate] <= offset:
+                position = candidate
+                offset -= tree[candidate]
+            step >>= 1
+        return position, offset
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+from typing import Generic, Hashable, TypeVar
+
+from app.core.geohash import BoundingBox, haversine_km, radius_bbox
+
+V = TypeVar('V')
+Cell = tuple[int, int]
+
+
+class SpatialGridIndex(Generic[V]):
+    def __init__(self, cell_degrees: float = 0.25) -> None:
+        self.cell_degrees = float(cell_degrees)
+        self._rows = math.ceil(180.0 / self.cell_degrees)
+        self._columns = math.ceil(360.0 / self.cell_degrees)
+        self._cells: dict[Cell, dict[Hashable, tuple[float, float, V]]] = {}
+        self._members: dict[Hashable, Cell] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self._members
+
+    def get(self, member: Hashable) -> V | None:
+        with self._lock:
+            cell = self._members.get(member)
+            if cell is None:
+                return None
+            return self._cells[cell][member][2]
+
+    def upsert(self, member: Hashable, lat: float, lng: float, value: V) -> None:
+        cell = self._cell(lat, lng)
+        with self._lock:
+            current = self._members.get(member)
+            if current is not None and current != cell:
+                self._remove(member, current)
+            self._cells.setdefault(cell, {})[member] = (lat, lng, value)
+            self._members[member] = cell
+
+    def discard(self, member: Hashable) -> None:
+        with self._lock:
+            cell = self._members.pop(member, None)
+            if cell is not None:
+                self._remove(member, cell)
+
+    def nearby(self, lat: float, lng: float, radius_km: float, limit: int) -> list[tuple[float, V]]:
+        bbox = radius_bbox(lat, lng, radius_km)
+        found: list[tuple[float, int, V]] = []
+        with self._lock:
+            for cell in self._cells_in(bbox):
+                for point_lat, point_lng, value in self._cells.get(cell, {}).values():
+                    if not bbox.contains(point_lat, point_lng):
+                        continue
+                    distance = haversine_km(lat, lng, point_lat, point_lng)
+                    if distance <= radius_km:
+                        found.append((distance, len(found), value))
+        return [(distance, value) for distance, _, value in heapq.nsmallest(limit, found)]
+
+    def within(self, bbox: BoundingBox) -> list[V]:
+        with self._lock:
+            return [
+                value
+                for cell in self._cells_in(bbox)
+                for point_lat, point_lng, value in self._cells.get(cell, {}).values()
+                if bbox.contains(point_lat, point_lng)
+            ]
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        row = min(self._rows - 1, max(0, int((lat + 90.0) // self.cell_degrees)))
+        column = min(self._columns - 1, max(0, int((lng + 180.0) // self.cell_degrees)))
+        return row, column
+
+    def _remove(self, member: Hashable, cell: Cell) -> None:
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            return
+        bucket.pop(member, None)
+        if not bucket:
+            del self._cells[cell]
+
+    def _cells_in(self, bbox: BoundingBox) -> list[Cell]:
+        cells: list[Cell] = []
+        for part in bbox.parts():
+            low_row, low_column = self._cell(part.min_lat, part.min_lng)
+            high_row, high_column = self._cell(part.max_lat, part.max_lng)
+            count = (high_row - low_row + 1) * (high_column - low_column + 1)
+            if count > len(self._cells):
+                cells.extend(
+                    cell
+                    for cell in self._cells
+                    if low_row <= cell[0] <= high_row and low_column <= cell[1] <= high_column
+                )
+                continue
+            cells.extend(
+                (row, column)
+                for row in range(low_row, high_row + 1)
+                for column in range(low_column, high_column + 1)
+            )
+        return cells
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.core.config import settings
+from app.core.container import get_repository, get_token_revocations
+from app.infrastructure.firebase_admin import close_firebase_token_verifier, start_firebase_token_verifier
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    start_firebase_token_verifier()
+    get_token_revocations()
+    yield
+    close_firebase_token_verifier()
+    get_repository().close()
+
 
 app = FastAPI(
     title=settings.app_name,
     version='0.3.0',
-    description='Night Mode API (Clean Architecture + FastAPI + Firebase Admin + JWT)'
+    description='Night Mode API (Clean Architecture + FastAPI + Firebase Admin + JWT)',
+    lifespan=lifespan,
 )
 
 app.add_middleware(
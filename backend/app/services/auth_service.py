@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+import time
+
 from fastapi import HTTPException, status
 
 from app.core.config import settings
-from app.core.security import AuthUser, create_access_token
-from app.domain.schemas import AuthTokenOut
-from app.infrastructure.firebase_admin import verify_firebase_token
+from app.core.security import AuthUser, create_access_token, create_refresh_token, decode_refresh_token
+from app.core.token_revocation import TokenRevocationList
+from app.domain.schemas import AuthTokenOut, ClickerTokenOut
+from app.infrastructure.firebase_admin import verify_firebase_token, verify_firebase_token_async
 
 
 class AuthService:
+    def __init__(self, revocations: TokenRevocationList) -> None:
+        self.revocations = revocations
+
     def firebase_login(self, firebase_id_token: str) -> AuthTokenOut:
-        claims = verify_firebase_token(firebase_id_token)
+        return self._firebase_session(verify_firebase_token(firebase_id_token))
+
+    async def firebase_login_async(self, firebase_id_token: str) -> AuthTokenOut:
+        return self._firebase_session(await verify_firebase_token_async(firebase_id_token))
+
+    def _firebase_session(self, claims: dict | None) -> AuthTokenOut:
         if claims is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,3 +48,29 @@ class AuthService:
 
     def me(self, user: AuthUser) -> AuthUser:
         return user
+
+    def issue_session(self, uid: str) -> ClickerTokenOut:
+        access_token, expires_in = create_access_token(uid=uid)
+        refresh_token, refresh_expires_in = create_refresh_token(uid=uid)
+        return ClickerTokenOut(
+            access_token=access_token,
+            expires_in=expires_in,
+            refresh_token=refresh_token,
+            refresh_expires_in=refresh_expires_in,
+            uid=uid,
+        )
+
+    def refresh_session(self, refresh_token: str) -> ClickerTokenOut:
+        claims = decode_refresh_token(refresh_token)
+        if self.revocations.is_revoked(claims.jti, claims.uid, claims.issued_at):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Refresh token revoked')
+        if not self.revocations.revoke(claims.jti, claims.expires_at):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Refresh token already used')
+        return self.issue_session(claims.uid)
+
+    def revoke_session(self, refresh_token: str, all_sessions: bool = False) -> bool:
+        claims = decode_refresh_token(refresh_token)
+        if all_sessions:
+            self.revocations.revoke_user(claims.uid, issued_before=time.time())
+            return True
+        return self.revocations.revoke(claims.jti, claims.expires_at)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from app.core.geohash import BoundingBox
 from app.domain.schemas import (
     CityRankingItem,
     ClickerLeaderboardItem,
@@ -11,7 +12,8 @@ from app.domain.schemas import (
     UserLocation,
     UserLocationCreate,
 )
-from app.infrastructure.repositories.night_repository import NightRepository
+from app.infrastructure.repositories.night_repository import ClickerSession, NightRepository
+from app.infrastructure.stores.cluster_grid import Cluster
 
 
 class NightService:
@@ -19,10 +21,44 @@ class NightService:
         self.repository = repository
 
     def list_locations(self) -> list[UserLocation]:
-        return self.repository.list_locations()
+        return self.repository.locations.list_locations()
+
+    def filter_locations(
+        self,
+        uid: str | None = None,
+        city: str | None = None,
+        limit: int = 200,
+    ) -> list[UserLocation]:
+        return self.repository.locations.filter_locations(uid=uid, city=city, limit=limit)
+
+    def sync_locations(self, since: str | None = None, limit: int = 500) -> tuple[list[UserLocation], str, bool]:
+        return self.repository.locations.sync_locations(since=since, limit=limit)
+
+    def list_locations_page(
+        self,
+        bbox: BoundingBox | None = None,
+        limit: int = 200,
+        cursor: str | None = None,
+    ) -> tuple[list[UserLocation], str | None]:
+        return self.repository.locations.list_locations_page(bbox=bbox, limit=limit, cursor=cursor)
+
+    def nearby_locations(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: int = 50,
+    ) -> list[tuple[float, UserLocation]]:
+        return self.repository.locations.nearby_locations(lat=lat, lng=lng, radius_km=radius_km, limit=limit)
+
+    def location_clusters(self, zoom: int, bbox: BoundingBox) -> tuple[int, list[Cluster]]:
+        return self.repository.locations.location_clusters(zoom=zoom, bbox=bbox)
+
+    def location_history(self, uid: str, limit: int = 20) -> list[UserLocation]:
+        return self.repository.locations.location_history(uid=uid, limit=limit)
 
     def create_location(self, payload: UserLocationCreate) -> UserLocation:
-        return self.repository.create_location(payload)
+        return self.repository.locations.create_location(payload)
 
     def list_city_ranking(self) -> list[CityRankingItem]:
         return self.repository.list_city_ranking()
@@ -50,8 +86,30 @@ class NightService:
     def get_clicker_state(self, uid: str) -> ClickerState:
         return self.repository.get_clicker_state(uid)
 
-    def tap_clicker(self, uid: str, taps: int) -> tuple[bool, int, int, int, bool, str, ClickerState]:
-        return self.repository.tap_clicker(uid=uid, taps=taps)
+    def open_clicker_session(self, uid: str) -> tuple[ClickerSession, ClickerState]:
+        return self.repository.open_clicker_session(uid)
+
+    def tap_clicker(
+        self,
+        uid: str,
+        taps: int,
+        session: ClickerSession | None = None,
+    ) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
+        return self.repository.tap_clicker(uid=uid, taps=taps, session=session)
+
+    def tap_clicker_batch(
+        self,
+        uid: str,
+        timestamps_ms: list[int],
+        buckets: list[int],
+        session: ClickerSession | None = None,
+    ) -> tuple[bool, int, int, int, bool, str, ClickerState | None]:
+        return self.repository.tap_clicker_batch(
+            uid=uid,
+            timestamps_ms=timestamps_ms,
+            buckets=buckets,
+            session=session,
+        )
 
     def claim_daily_bonus(self, uid: str) -> tuple[bool, int, str, ClickerState]:
         return self.repository.claim_daily_bonus(uid=uid)
@@ -62,6 +120,35 @@ class NightService:
     def clicker_leaderboard(self, limit: int = 50) -> list[ClickerLeaderboardItem]:
         return self.repository.clicker_leaderboard(limit=limit)
 
+    def clicker_leaderboard_page(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[ClickerLeaderboardItem], str | None, datetime | None]:
+        return self.repository.clicker_leaderboard_page(limit=limit, cursor=cursor)
+
+    def clicker_period_leaderboard(
+        self,
+        period: str,
+        limit: int = 50,
+    ) -> tuple[str, list[ClickerLeaderboardItem]]:
+        return self.repository.clicker_period_leaderboard(period=period, limit=limit)
+
+    def clicker_rank(
+        self,
+        uid: str,
+        above: int = 5,
+        below: int = 5,
+    ) -> tuple[
+        int | None,
+        int,
+        ClickerLeaderboardItem | None,
+        list[ClickerLeaderboardItem],
+        list[ClickerLeaderboardItem],
+        datetime | None,
+    ]:
+        return self.repository.clicker_rank(uid=uid, above=above, below=below)
+
     def enter_lottery(self, uid: str) -> tuple[bool, str, datetime | None, ClickerState]:
         return self.repository.enter_lottery(uid=uid)
 
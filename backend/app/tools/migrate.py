@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+
+from app.infrastructure.repositories.night_repository import NightRepository
+
+try:
+    from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+    _WRITE_CONFLICTS: tuple[type[Exception], ...] = (AlreadyExists, FailedPrecondition, NotFound)
+except Exception:  # pragma: no cover
+    _WRITE_CONFLICTS = ()
+
+logger = logging.getLogger(__name__)
+
+Write = tuple[str, str, dict]
+Transform = Callable[[NightRepository, list[tuple[str, dict]]], list[Write]]
+GroupedTransform = Callable[[NightRepository, list[tuple[str, dict]]], list[list[Write]]]
+
+_BATCH_LIMIT = 500
+_GUARDED_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class Migration:
+    collection: str
+    transform: Transform | GroupedTransform
+    description: str
+    grouped: bool = False
+    guarded: bool = False
+
+
+@dataclass
+class MigrationStats:
+    scanned: int = 0
+    changed: int = 0
+    written: int = 0
+    pages: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return max(1e-9, time.perf_counter() - self.started_at)
+
+    def report(self) -> str:
+        return (
+            f'scanned {self.scanned} docs, changed {self.changed}, wrote {self.written} in {self.elapsed:.1f}s '
+            f'({self.scanned / self.elapsed:.0f} docs/s scanned, {self.written / self.elapsed:.0f} docs/s written)'
+        )
+
+
+def _with_counters(repository: NightRepository, uid: str, raw: dict) -> dict:
+    if not repository.using_point_shards:
+        return raw
+    merged = dict(raw)
+    merged.update(repository._aggregate_point_shards(uid, raw))
+    return merged
+
+
+def _without_counters(repository: NightRepository, changes: dict) -> dict:
+    if repository.using_point_shards:
+        for counter in repository._SHARDED_COUNTERS:
+            changes.pop(counter, None)
+    return changes
+
+
+def normalize_users(repository: NightRepository, docs: list[tuple[str, dict]]) -> list[Write]:
+    now = datetime.now(timezone.utc)
+    writes: list[Write] = []
+    for uid, raw in docs:
+        current = _with_counters(repository, uid, raw)
+        record = repository._normalize_clicker_record(current, uid=uid, now=now)
+        payload = repository._serialize_clicker_record(record)
+        changes = {name: value for name, value in payload.items() if current.get(name) != value}
+        changes = _without_counters(repository, changes)
+        if not changes:
+            continue
+        writes.append(('users', uid, changes))
+        if any(name in changes for name in ('points', 'level', 'display_name', 'referrals', 'telegram_user_id')):
+            writes.append(('ratings', uid, repository._serialize_clicker_rating(record)))
+    return writes
+
+
+def recompute_levels(repository: NightRepository, docs: list[tuple[str, dict]]) -> list[Write]:
+    rows = [(uid, _with_counters(repository, uid, raw)) for uid, raw in docs]
+    levels = repository.level_curve.levels_from_points([int(raw.get('points') or 0) for _, raw in rows])
+    writes: list[Write] = []
+    for (uid, raw), level in zip(rows, levels):
+        level = max(1, int(level))
+        if raw.get('level') == level and raw.get('multiplier') == level:
+            continue
+        writes.append(('users', uid, {'level': level, 'multiplier': level}))
+        writes.append(('ratings', uid, {'level': level}))
+    return writes
+
+
+def geohash_locations(repository: NightRepository, docs: list[tuple[str, dict]]) -> list[Write]:
+    locations = repository.locations
+    writes: list[Write] = []
+    for location_id, raw in docs:
+        payload = locations._location_document(locations._to_user_location(raw, location_id))
+        if raw.get('geohash') != payload['geohash']:
+            writes.append(('locations', location_id, {'geohash': payload['geohash']}))
+    return writes
+
+
+def cluster_locations(repository: NightRepository, docs: list[tuple[str, dict]]) -> list[list[Write]]:
+    groups: list[list[tuple[str, tuple[float, float]]]] = []
+    cells: set[tuple[int, int, int]] = set()
+    for location_id, raw in docs:
+        if raw.get('clustered'):
+            continue
+        point = (float(raw.get('lat', 0.0)), float(raw.get('lng', 0.0)))
+        point_cells = set(repository.locations._location_clusters.cells(*point))
+        if not groups or len(cells | point_cells) + len(groups[-1]) + 1 > _BATCH_LIMIT:
+            groups.append([])
+            cells = set()
+        groups[-1].append((location_id, point))
+        cells |= point_cells
+    return [_cluster_group(repository, group) for group in groups]
+
+
+def _cluster_group(repository: NightRepository, group: list[tuple[str, tuple[float, float]]]) -> list[Write]:
+    locations = repository.locations
+    writes: list[Write] = [
+        (locations._LOCATION_CLUSTERS_COLLECTION, doc_id, payload)
+        for doc_id, payload in locations._location_cluster_writes([point for _, point in group])
+    ]
+    writes.extend(('locations', location_id, {'clustered': True}) for location_id, _ in group)
+    return writes
+
+
+MIGRATIONS: dict[str, Migration] = {
+    'normalize-users': Migration(
+        collection='users',
+        transform=normalize_users,
+        description='rewrite users through _normalize_clicker_record and refresh their ratings',
+    ),
+    'recompute-levels': Migration(
+        collection='users',
+        transform=recompute_levels,
+        description='recompute level and multiplier from points with the configured level curve',
+    ),
+    'geohash-locations': Migration(
+        collection='locations',
+        transform=geohash_locations,
+        description='store the geohash used by bbox queries on existing locations',
+    ),
+    'cluster-locations': Migration(
+        collection='locations',
+        transform=cluster_locations,
+        description='add existing locations to the per-zoom map cluster aggregates',
+        grouped=True,
+        guarded=True,
+    ),
+}
+
+
+class Migrator:
+    def __init__(
+        self,
+        repository: NightRepository,
+        name: str,
+        page_size: int = 500,
+        concurrency: int = 4,
+        checkpoint_path: str | None = None,
+        dry_run: bool = False,
+        use_bulk_writer: bool = False,
+        max_docs: int | None = None,
+    ) -> None:
+        if name not in MIGRATIONS:
+            raise ValueError(f'Unknown migration: {name}')
+        self.repository = repository
+        self.db = repository.db
+        self.name = name
+        self.migration = MIGRATIONS[name]
+        self.page_size = max(1, page_size)
+        self.concurrency = max(1, concurrency)
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+        self.use_bulk_writer = use_bulk_writer
+        self.max_docs = max_docs
+        self.stats = MigrationStats()
+
+    def run(self) -> MigrationStats:
+        last_id = self._load_checkpoint()
+        if last_id is not None:
+            logger.info('Resuming %s after %s', self.name, last_id)
+
+        pending: deque[tuple[str, list[Future]]] = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='migrate') as executor:
+            while self.max_docs is None or self.stats.scanned < self.max_docs:
+                docs, update_times = self._fetch_page(last_id)
+                if not docs:
+                    break
+                last_id = docs[-1][0]
+                self.stats.pages += 1
+                self.stats.scanned += len(docs)
+
+                if self.migration.grouped:
+                    groups = self.migration.transform(self.repository, docs)
+                else:
+                    groups = [[write] for write in self.migration.transform(self.repository, docs)]
+                writes = [write for group in groups for write in group]
+                self.stats.changed += sum(1 for collection, _, _ in writes if collection == self.migration.collection)
+                if self.dry_run:
+                    if self.stats.pages == 1:
+                        for collection, doc_id, changes in writes[:3]:
+                            logger.info('[dry-run] %s/%s <- %s', collection, doc_id, sorted(changes))
+                    continue
+
+                pending.append((last_id, self._submit(executor, groups, update_times)))
+                while len(pending) > self.concurrency or (pending and all(f.done() for f in pending[0][1])):
+                    self._complete(pending.popleft())
+
+                if self.stats.pages % 20 == 0:
+                    logger.info('%s: %s', self.name, self.stats.report())
+
+            while pending:
+                self._complete(pending.popleft())
+
+        if not self.dry_run:
+            self._save_checkpoint(last_id, done=True)
+        logger.info('%s finished: %s', self.name, self.stats.report())
+        return self.stats
+
+    def _fetch_page(self, last_id: str | None) -> tuple[list[tuple[str, dict]], dict[str, object]]:
+        query = self.db.collection(self.migration.collection).order_by('__name__')
+        if last_id is not None:
+            query = query.start_after({'__name__': last_id})
+        limit = self.page_size
+        if self.max_docs is not None:
+            limit = min(limit, self.max_docs - self.stats.scanned)
+        snapshots = list(query.limit(limit).stream())
+        return [(doc.id, doc.to_dict() or {}) for doc in snapshots], {doc.id: doc.update_time for doc in snapshots}
+
+    def _submit(
+        self,
+        executor: ThreadPoolExecutor,
+        groups: list[list[Write]],
+        update_times: dict[str, object],
+    ) -> list[Future]:
+        if self.use_bulk_writer and not self.migration.grouped:
+            return [executor.submit(self._commit_bulk, [write for group in groups for write in group])]
+        batches: list[list[Write]] = []
+        for group in groups:
+            if not batches or len(batches[-1]) + len(group) > _BATCH_LIMIT:
+                batches.append([])
+            batches[-1].extend(group)
+        if self.migration.guarded:
+            return [executor.submit(self._commit_guarded, batch, update_times) for batch in batches]
+        return [executor.submit(self._commit_batch, batch) for batch in batches]
+
+    def _commit_batch(self, writes: list[Write], update_times: dict[str, object] | None = None) -> int:
+        batch = self.db.batch()
+        for collection, doc_id, changes in writes:
+            reference = self.db.collection(collection).document(doc_id)
+            if update_times is not None and collection == self.migration.collection:
+                batch.update(reference, changes, option=self.db.write_option(last_update_time=update_times[doc_id]))
+            else:
+                batch.set(reference, changes, merge=True)
+        if writes:
+            batch.commit()
+        return len(writes)
+
+    def _commit_guarded(self, writes: list[Write], update_times: dict[str, object], attempt: int = 1) -> int:
+        try:
+            return self._commit_batch(writes, update_times)
+        except _WRITE_CONFLICTS:
+            if attempt >= _GUARDED_ATTEMPTS:
+                raise
+        reference = self.db.collection(self.migration.collection)
+        snapshots = [
+            reference.document(doc_id).get()
+            for collection, doc_id, _ in writes
+            if collection == self.migration.collection
+        ]
+        docs = [(doc.id, doc.to_dict() or {}) for doc in snapshots if doc.exists]
+        update_times = {doc.id: doc.update_time for doc in snapshots if doc.exists}
+        return sum(
+            self._commit_guarded(group, update_times, attempt + 1)
+            for group in self.migration.transform(self.repository, docs)
+        )
+
+    def _commit_bulk(self, writes: list[Write]) -> int:
+        writer = self.db.bulk_writer()
+        for collection, doc_id, changes in writes:
+            writer.set(self.db.collection(collection).document(doc_id), changes, merge=True)
+        writer.close()
+        return len(writes)
+
+    def _complete(self, item: tuple[str, list[Future]]) -> None:
+        last_id, futures = item
+        for future in futures:
+            self.stats.written += future.result()
+        self._save_checkpoint(last_id)
+
+    def _load_checkpoint(self) -> str | None:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding='utf-8') as handle:
+            state = json.load(handle)
+        if state.get('migration') != self.name:
+            raise ValueError(f'Checkpoint {self.checkpoint_path} belongs to {state.get("migration")!r}')
+        if state.get('done'):
+            logger.info('Checkpoint %s is complete, starting over', self.checkpoint_path)
+            return None
+        return state.get('last_id')
+
+    def _save_checkpoint(self, last_id: str | None, done: bool = False) -> None:
+        if not self.checkpoint_path:
+            return
+        state = {
+            'migration': self.name,
+            'last_id': last_id,
+            'done': done,
+            'scanned': self.stats.scanned,
+            'written': self.stats.written,
+            'saved_at': datetime.now(timezone.utc).isoformat(),
+        }
+        temporary = f'{self.checkpoint_path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle)
+        os.replace(temporary, self.checkpoint_path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.tools.migrate', description='Rewrite clicker documents in Firestore')
+    parser.add_argument('migration', choices=sorted(MIGRATIONS))
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--checkpoint', default=None, help='progress file (default: .migrate-<migration>.json)')
+    parser.add_argument('--no-checkpoint', action='store_true')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--bulk-writer', action='store_true', help='write with Firestore BulkWriter instead of batches')
+    parser.add_argument('--max-docs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+    )
+
+    repository = NightRepository()
+    if not repository.using_firestore:
+        logger.error('Firestore is not configured (USE_FIREBASE and service account settings)')
+        return 1
+
+    checkpoint = None if args.no_checkpoint else args.checkpoint or f'.migrate-{args.migration}.json'
+    migrator = Migrator(
+        repository=repository,
+        name=args.migration,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        checkpoint_path=checkpoint,
+        dry_run=args.dry_run,
+        use_bulk_writer=args.bulk_writer,
+        max_docs=args.max_docs,
+    )
+    try:
+        stats = migrator.run()
+    finally:
+        repository.close()
+    print(stats.report())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
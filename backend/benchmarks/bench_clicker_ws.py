@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.container import get_night_service
+from app.core.security import create_access_token
+from app.main import app
+from app.services.night_service import NightService
+from benchmarks.common import patched_repository
+
+
+def run(taps: int) -> dict[str, float]:
+    with patched_repository(None, clicker_max_taps_per_second=10**6, clicker_tap_burst=10**6) as repository:
+        app.dependency_overrides[get_night_service] = lambda: NightService(repository=repository)
+        try:
+            client = TestClient(app)
+            token, _ = create_access_token(uid='tg:1')
+            headers = {'Authorization': f'Bearer {token}'}
+            client.get('/api/clicker/state', headers=headers)
+
+            started = time.perf_counter()
+            for _ in range(taps):
+                client.post('/api/clicker/tap', json={'taps': 1}, headers=headers)
+            http_rate = taps / (time.perf_counter() - started)
+
+            with client.websocket_connect(f'/api/clicker/ws?token={token}') as websocket:
+                websocket.receive_json()
+                started = time.perf_counter()
+                for _ in range(taps):
+                    websocket.send_json({'taps': 1})
+                    websocket.receive_json()
+                ws_rate = taps / (time.perf_counter() - started)
+        finally:
+            app.dependency_overrides.pop(get_night_service, None)
+
+    return {'http': http_rate, 'ws': ws_rate}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Taps per second on one worker: HTTP /tap vs /ws')
+    parser.add_argument('--taps', type=int, default=2000)
+    args = parser.parse_args()
+
+    result = run(args.taps)
+    print(f'HTTP POST /api/clicker/tap: {result["http"]:8.0f} taps/s')
+    print(f'WebSocket /api/clicker/ws:  {result["ws"]:8.0f} taps/s ({result["ws"] / result["http"]:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.infrastructure.firebase_tokens import FirebaseTokenVerifier
+from benchmarks.common import measure
+from benchmarks.fake_key_server import FakeKeyServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Firebase ID token verification: cold keys, warm keys, cached claims')
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--calls', type=int, default=5_000)
+    args = parser.parse_args()
+
+    with FakeKeyServer() as server:
+        tokens = [server.mint(f'user-{index}', email=f'user{index}@example.com') for index in range(args.users)]
+        cursor = iter(range(1 << 62))
+
+        def next_token() -> str:
+            return tokens[next(cursor) % len(tokens)]
+
+        def build(cache_size: int) -> FirebaseTokenVerifier:
+            return FirebaseTokenVerifier(
+                project_id=server.project_id,
+                certs_url=server.url,
+                cache_size=cache_size,
+            )
+
+        cold = build(0)
+
+        def cold_keys() -> None:
+            cold.keys._keys = {}
+            cold.verify(next_token())
+
+        warm = build(0)
+        warm.keys.refresh()
+        cached = build(args.users)
+        cached.keys.refresh()
+        cached_async = build(args.users)
+        cached_async.keys.refresh()
+
+        async def run_async(count: int) -> float:
+            started = time.perf_counter()
+            for _ in range(count):
+                await cached_async.verify_async(next_token())
+            return count / (time.perf_counter() - started)
+
+        results = {
+            'key fetch per call': measure(cold_keys, max(1, args.calls // 10)),
+            'warm public keys': measure(lambda: warm.verify(next_token()), args.calls),
+            'cached claims': measure(lambda: cached.verify(next_token()), args.calls),
+            'cached claims (async)': asyncio.run(run_async(args.calls)),
+        }
+        for verifier in (cold, warm, cached, cached_async):
+            verifier.close()
+
+    print(f'{args.users} distinct ID tokens, {args.calls} calls per variant, {server.requests} key fetches')
+    for name, rate in results.items():
+        print(f'  {name:<24} {rate:>10.0f} verifications/s')
+
+
+if __name__ == '__main__':
+    main()
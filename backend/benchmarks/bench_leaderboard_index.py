@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import patched_repository
+
+
+def full_sort_top(users: dict[str, dict], limit: int) -> list[dict]:
+    return sorted(
+        users.values(),
+        key=lambda row: (-int(row.get('points', 0)), -row['updated_at'].timestamp()),
+    )[:limit]
+
+
+def run(users: int, limit: int, rounds: int) -> dict[str, float]:
+    rng = random.Random(users)
+    started_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with patched_repository(None) as repository:
+        for index in range(users):
+            record = repository._base_clicker_user(
+                uid=f'tg:{index}',
+                now=started_at + timedelta(seconds=index),
+                telegram_user_id=index,
+            )
+            record['points'] = rng.randrange(0, 5_000_000)
+            repository._save_clicker_record(record)
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            full_sort_top(repository._clicker_users, limit)
+        full_sort_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            repository.clicker_leaderboard(limit=limit)
+        index_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        sample = [repository._clicker_users[f'tg:{rng.randrange(users)}'].copy() for _ in range(10_000)]
+        started = time.perf_counter()
+        for record in sample:
+            record['points'] += rng.randrange(1, 100)
+            repository._save_clicker_record(record)
+        update_us = (time.perf_counter() - started) * 1_000_000 / len(sample)
+
+    return {'full_sort_ms': full_sort_ms, 'index_ms': index_ms, 'update_us': update_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='In-memory leaderboard: full sort vs sorted index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    for users in args.sizes:
+        result = run(users, args.limit, args.rounds)
+        print(
+            f'{users:>9} users: full sort {result["full_sort_ms"]:9.2f} ms, '
+            f'index top-{args.limit} {result["index_ms"]:6.3f} ms, '
+            f'save with index update {result["update_us"]:6.1f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
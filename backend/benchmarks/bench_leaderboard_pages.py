@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.cursors import encode_cursor
+from benchmarks.common import patched_repository
+from benchmarks.fake_firestore import FakeFirestore
+
+
+def seed(repository, users: int) -> None:
+    rng = random.Random(users)
+    started_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for index in range(users):
+        record = repository._base_clicker_user(
+            uid=f'tg:{index}',
+            now=started_at + timedelta(seconds=rng.randrange(86_400)),
+            telegram_user_id=index,
+        )
+        record['points'] = rng.randrange(0, 5_000_000)
+        repository._save_clicker_record(record)
+        repository._upsert_clicker_rating(record)
+
+
+def cursor_before_page(repository, page: int, page_size: int) -> str | None:
+    if page <= 1:
+        return None
+    position = (page - 1) * page_size - 1
+    uid = repository._leaderboard_index.slice(position, position + 1)[0]
+    record = repository._clicker_users[uid]
+    return encode_cursor(['live', record['points'], record['updated_at'].isoformat(), uid, position + 1])
+
+
+def run_memory(users: int, pages: list[int], page_size: int, rounds: int) -> dict[int, float]:
+    result: dict[int, float] = {}
+    with patched_repository(None) as repository:
+        seed(repository, users)
+        for page in pages:
+            cursor = cursor_before_page(repository, page, page_size)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                repository.clicker_leaderboard_page(limit=page_size, cursor=cursor)
+            result[page] = (time.perf_counter() - started) * 1_000_000 / rounds
+    return result
+
+
+def run_firestore(users: int, pages: list[int], page_size: int) -> dict[int, tuple[int, int]]:
+    result: dict[int, tuple[int, int]] = {}
+    with patched_repository(None) as memory:
+        seed(memory, users)
+        db = FakeFirestore()
+        with patched_repository(db, clicker_record_cache_size=0) as repository:
+            for uid in memory._clicker_users:
+                repository._upsert_clicker_rating(memory._clicker_users[uid].copy())
+            for page in pages:
+                cursor = cursor_before_page(memory, page, page_size)
+                db.reset_counters()
+                repository.clicker_leaderboard_page(limit=page_size, cursor=cursor)
+                result[page] = (db.reads, min(users, page * page_size))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Leaderboard pagination: cost of page 1 vs deep pages')
+    parser.add_argument('--users', type=int, default=200_000)
+    parser.add_argument('--firestore-users', type=int, default=60_000)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100, 1_000])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f'memory mode, {args.users} users')
+    for page, latency_us in run_memory(args.users, args.pages, args.page_size, args.rounds).items():
+        print(f'  page {page:>5}: {latency_us:7.1f} us per page')
+
+    print(f'firestore mode, {args.firestore_users} ratings')
+    for page, (reads, offset_reads) in run_firestore(args.firestore_users, args.pages, args.page_size).items():
+        print(f'  page {page:>5}: {reads:>4} reads with cursor, {offset_reads:>6} reads with offset paging')
+
+
+if __name__ == '__main__':
+    main()
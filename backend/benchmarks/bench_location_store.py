@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.domain.schemas import UserLocation, UserLocationCreate
+from app.infrastructure.stores import memory_store
+from app.infrastructure.stores.location_ring import LocationRing
+from benchmarks.common import patched_repository
+
+CITIES = [('Yerevan', 40.1772, 44.5035), ('Moscow', 55.7558, 37.6173), ('Almaty', 43.222, 76.8512)]
+
+
+def make_locations(count: int) -> list[UserLocation]:
+    rng = random.Random(count)
+    started_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    locations = []
+    for index in range(count):
+        city, lat, lng = rng.choice(CITIES)
+        locations.append(
+            UserLocation(
+                id=f'loc-{index}',
+                uid=f'user-{rng.randrange(count // 10 + 1)}',
+                name='Night Rider',
+                city=city,
+                country='Unknown',
+                lat=lat + rng.gauss(0, 0.5),
+                lng=lng + rng.gauss(0, 0.5),
+                created_at=started_at + timedelta(seconds=index),
+            )
+        )
+    return locations
+
+
+def traced(callback) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = callback()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='In-memory location store: memory per location and insert cost')
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--inserts', type=int, default=20_000)
+    args = parser.parse_args()
+
+    payload_bytes, locations = traced(lambda: make_locations(args.count))
+    ring_bytes, ring = traced(lambda: LocationRing(args.count, locations))
+
+    def through_repository():
+        memory_store.store.locations = LocationRing(args.count)
+        with patched_repository(None) as repository:
+            for location in locations:
+                evicted = memory_store.store.locations.append(location)
+                if evicted is None:
+                    repository.locations._location_index.upsert(location.id, location.lat, location.lng, location)
+                    repository.locations._location_clusters.add(location.lat, location.lng)
+            return repository
+
+    full_bytes, _ = traced(through_repository)
+    print(f'{args.count} locations')
+    print(f'  UserLocation objects             {payload_bytes / args.count:8.0f} bytes/location')
+    print(f'  ring + uid/city indexes          {ring_bytes / args.count:8.0f} bytes/location')
+    print(f'  ring + spatial index + clusters  {full_bytes / args.count:8.0f} bytes/location')
+
+    extra = [
+        UserLocationCreate(uid=f'user-{index}', city='Yerevan', country='Armenia', lat=40.18, lng=44.5)
+        for index in range(args.inserts)
+    ]
+    as_list = list(reversed(locations))
+    started = time.perf_counter()
+    for location in locations[:args.inserts]:
+        as_list.insert(0, location)
+    list_us = (time.perf_counter() - started) * 1_000_000 / args.inserts
+
+    started = time.perf_counter()
+    for location in locations[:args.inserts]:
+        ring.append(location)
+    ring_us = (time.perf_counter() - started) * 1_000_000 / args.inserts
+
+    memory_store.store.locations = LocationRing(args.count, locations)
+    with patched_repository(None) as repository:
+        started = time.perf_counter()
+        for payload in extra:
+            repository.locations.create_location(payload)
+        create_us = (time.perf_counter() - started) * 1_000_000 / args.inserts
+        started = time.perf_counter()
+        for index in range(1_000):
+            repository.locations.filter_locations(uid=f'user-{index}', limit=50)
+        by_uid_us = (time.perf_counter() - started) * 1_000
+    print(f'  insert at {args.count}: list.insert(0) {list_us:6.1f} us, ring append {ring_us:6.2f} us')
+    print(f'  create_location with eviction  {create_us:6.1f} us, per-uid read {by_uid_us:6.1f} us')
+
+
+if __name__ == '__main__':
+    main()
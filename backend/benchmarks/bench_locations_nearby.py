@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+from app.core.geohash import haversine_km
+from app.domain.schemas import UserLocation
+from app.infrastructure.stores.spatial_index import SpatialGridIndex
+from benchmarks.common import patched_repository
+from benchmarks.fake_firestore import FakeFirestore
+
+CITIES = [(40.1772, 44.5035), (55.7558, 37.6173), (43.222, 76.8512), (41.7151, 44.8271), (25.2048, 55.2708)]
+
+
+def random_points(count: int, seed: int) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        lat, lng = rng.choice(CITIES)
+        points.append((lat + rng.gauss(0, 1.5), lng + rng.gauss(0, 1.5)))
+    return points
+
+
+def linear_scan(points: list[tuple[float, float]], lat: float, lng: float, radius_km: float, limit: int) -> list:
+    found = [
+        (distance, index)
+        for index, (point_lat, point_lng) in enumerate(points)
+        if (distance := haversine_km(lat, lng, point_lat, point_lng)) <= radius_km
+    ]
+    return sorted(found)[:limit]
+
+
+def run_memory(count: int, radius_km: float, limit: int, queries: int) -> dict[str, float]:
+    points = random_points(count, count)
+    index: SpatialGridIndex[int] = SpatialGridIndex(cell_degrees=0.25)
+    started = time.perf_counter()
+    for position, (lat, lng) in enumerate(points):
+        index.upsert(position, lat, lng, position)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(7)
+    centers = [points[rng.randrange(count)] for _ in range(queries)]
+    started = time.perf_counter()
+    for lat, lng in centers:
+        index.nearby(lat, lng, radius_km, limit)
+    index_ms = (time.perf_counter() - started) * 1000 / queries
+
+    scan_rounds = max(1, min(queries, 3))
+    started = time.perf_counter()
+    for lat, lng in centers[:scan_rounds]:
+        linear_scan(points, lat, lng, radius_km, limit)
+    scan_ms = (time.perf_counter() - started) * 1000 / scan_rounds
+    return {'build_s': build_s, 'index_ms': index_ms, 'scan_ms': scan_ms}
+
+
+def run_firestore(count: int, radius_km: float, limit: int, queries: int) -> dict[str, float]:
+    db = FakeFirestore()
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with patched_repository(db) as repository:
+        collection = db.collection('locations')
+        for position, (lat, lng) in enumerate(random_points(count, count)):
+            location = UserLocation(
+                id=f'loc-{position}',
+                uid=f'user-{position}',
+                name='User',
+                city='Unknown',
+                country='Unknown',
+                lat=lat,
+                lng=lng,
+                created_at=created_at,
+            )
+            collection.document(location.id).set(repository.locations._location_document(location))
+
+        rng = random.Random(7)
+        reads_before = db.reads
+        for _ in range(queries):
+            lat, lng = rng.choice(CITIES)
+            repository.locations.nearby_locations(lat, lng, radius_km, limit)
+        return {'reads': (db.reads - reads_before) / queries}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Nearby locations: grid index vs linear haversine scan')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--radius-km', type=float, default=5.0)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--firestore-points', type=int, default=20_000)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        result = run_memory(count, args.radius_km, args.limit, args.queries)
+        print(
+            f'{count:>9} points: build {result["build_s"]:6.2f} s, '
+            f'grid {result["index_ms"]:7.3f} ms/query, linear scan {result["scan_ms"]:9.2f} ms/query'
+        )
+
+    if args.firestore_points:
+        result = run_firestore(args.firestore_points, args.radius_km, args.limit, 5)
+        print(
+            f'firestore mode, {args.firestore_points} docs: {result["reads"]:.0f} reads/query '
+            f'(vs {args.firestore_points} for a full scan)'
+        )
+
+
+if __name__ == '__main__':
+    main()
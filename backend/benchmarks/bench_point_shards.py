@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import SimClock, patched_repository
+from benchmarks.fake_firestore import ContentionError, FakeFirestore
+
+
+def run(shards: int, taps_per_second: int, seconds: int) -> dict[str, float]:
+    clock = SimClock()
+    db = FakeFirestore(max_writes_per_doc_per_second=1.0, clock=clock)
+    with patched_repository(
+        db,
+        clicker_max_taps_per_second=10**6,
+        clicker_tap_burst=10**6,
+        clicker_write_behind=False,
+        clicker_point_shards=shards,
+        clicker_rating_rollup_seconds=3600,
+        clicker_record_cache_size=0,
+    ) as repository:
+        uid = repository.upsert_clicker_user(telegram_user_id=1, first_name='Bench').uid
+        start = clock.now + 10
+        accepted = 0
+        rejected = 0
+
+        for step in range(taps_per_second * seconds):
+            clock.now = start + step / taps_per_second
+            try:
+                repository.tap_clicker(uid=uid, taps=1)
+                accepted += 1
+            except ContentionError:
+                rejected += 1
+
+            if (step + 1) % taps_per_second == 0:
+                try:
+                    repository.flush_clicker_writes()
+                except ContentionError:
+                    pass
+
+        clock.now = start + seconds + 10
+        persisted = repository.get_clicker_state(uid).points
+
+    return {
+        'accepted_per_second': accepted / seconds,
+        'rejected': rejected,
+        'persisted_points': persisted,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sustained tap writes per uid against a contended fake Firestore')
+    parser.add_argument('--rate', type=int, default=10, help='tap requests per simulated second')
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--shards', type=int, default=16)
+    args = parser.parse_args()
+
+    for label, shards in (('single document', 0), (f'{args.shards} shards', args.shards)):
+        result = run(shards=shards, taps_per_second=args.rate, seconds=args.seconds)
+        print(
+            f'{label:>16}: {result["accepted_per_second"]:6.2f} writes/s per uid, '
+            f'{result["rejected"]:5d} contention errors, '
+            f'{result["persisted_points"]} points persisted'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.core import progression
+from app.core.progression import LevelCurve
+from benchmarks.common import measure
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Level curve lookups: per call and bulk recompute')
+    parser.add_argument('--curve', default='30:10000,*:100000')
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--users', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(14)
+    curves = {
+        'configured': LevelCurve.parse(args.curve),
+        '1000 levels': LevelCurve.parse('1000:5000x1.004,*:1000000'),
+    }
+    for name, curve in curves.items():
+        top = curve.points_for_level(len(curve.thresholds) + 10)
+        samples = [rng.randrange(0, top) for _ in range(1_024)]
+        cursor = iter(range(1 << 62))
+        rate = measure(lambda: curve.level_from_points(samples[next(cursor) & 1023]), args.calls)
+        print(f'{name:>12}: {len(curve.thresholds):>5} thresholds, level_from_points {rate / 1e6:5.2f} M calls/s')
+
+    curve = curves['configured']
+    numpy = progression.np
+    for users in args.users:
+        points = [rng.randrange(0, 20_000_000) for _ in range(users)]
+
+        progression.np = None
+        python_curve = LevelCurve.parse(args.curve)
+        started = time.perf_counter()
+        python_curve.levels_from_points(points)
+        python_seconds = time.perf_counter() - started
+        progression.np = numpy
+
+        line = f'{users:>9} users: python {users / python_seconds / 1e6:6.2f} M/s'
+        if numpy is not None:
+            array = numpy.asarray(points, dtype=numpy.int64)
+            started = time.perf_counter()
+            curve.levels_from_points(array)
+            numpy_seconds = time.perf_counter() - started
+            line += f', numpy {users / numpy_seconds / 1e6:7.2f} M/s'
+        else:
+            line += ', numpy not installed'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import security
+from app.core.security import create_access_token, get_current_user_optional, require_user
+
+
+def run(tokens: list[str], requests: int, cached: bool) -> float:
+    cache = security._verified_tokens
+    if cache is not None:
+        cache.clear()
+    security._verified_tokens = cache if cached else None
+    rng = random.Random(16)
+    credentials = [HTTPAuthorizationCredentials(scheme='Bearer', credentials=token) for token in tokens]
+    try:
+        started = time.perf_counter()
+        for _ in range(requests):
+            require_user(get_current_user_optional(rng.choice(credentials)))
+        return (time.perf_counter() - started) * 1_000_000 / requests
+    finally:
+        security._verified_tokens = cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='require_user overhead with and without the verified-token cache')
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--requests', type=int, default=100_000, help='tap requests spread over the users')
+    args = parser.parse_args()
+
+    tokens = [create_access_token(uid=f'tg:{index}')[0] for index in range(args.users)]
+    uncached = run(tokens, args.requests, cached=False)
+    cached = run(tokens, args.requests, cached=True)
+    print(f'{args.users} users, {args.requests} requests')
+    print(f'  jwt.decode every request: {uncached:6.2f} us per require_user')
+    print(f'  verified-token cache:     {cached:6.2f} us per require_user')
+    if security._verified_tokens is not None:
+        stats = security._verified_tokens.stats()
+        print(f'  cache hits {stats["hits"]:.0f}, misses {stats["misses"]:.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+from app.core import telegram_webapp
+from app.core.telegram_webapp import verify_telegram_init_data, verify_telegram_init_data_cached
+from benchmarks.common import measure
+
+BOT_TOKEN = '123456:bench-token'
+
+
+def signed_init_data(telegram_user_id: int, auth_date: int) -> str:
+    fields = {
+        'auth_date': str(auth_date),
+        'query_id': f'AAH{telegram_user_id}',
+        'user': json.dumps({'id': telegram_user_id, 'first_name': 'Night', 'username': f'rider{telegram_user_id}'}),
+    }
+    data_check_string = '\n'.join(f'{key}={fields[key]}' for key in sorted(fields))
+    secret_key = hmac.new(b'WebAppData', BOT_TOKEN.encode('utf-8'), hashlib.sha256).digest()
+    fields['hash'] = hmac.new(secret_key, data_check_string.encode('utf-8'), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Telegram initData verification: full, precomputed key, cached')
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--calls', type=int, default=50_000)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    payloads = [signed_init_data(index + 1, now) for index in range(args.users)]
+    cursor = iter(range(1 << 62))
+
+    def next_payload() -> str:
+        return payloads[next(cursor) % len(payloads)]
+
+    def cold_key() -> None:
+        telegram_webapp._secret_key.cache_clear()
+        verify_telegram_init_data(next_payload(), BOT_TOKEN)
+
+    results = {
+        'secret key per call': measure(cold_key, args.calls),
+        'precomputed secret key': measure(lambda: verify_telegram_init_data(next_payload(), BOT_TOKEN), args.calls),
+    }
+    if telegram_webapp._verified_init_data is not None:
+        telegram_webapp._verified_init_data.clear()
+        results['verified initData cache'] = measure(
+            lambda: verify_telegram_init_data_cached(next_payload(), BOT_TOKEN),
+            args.calls,
+        )
+
+    print(f'{args.users} distinct initData payloads, {args.calls} calls per variant')
+    for name, rate in results.items():
+        print(f'  {name:<24} {rate:>10.0f} verifications/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.core.config import settings
+from app.infrastructure.repositories import location_repository, night_repository
+from app.infrastructure.repositories.night_repository import NightRepository
+
+
+class SimClock:
+    def __init__(self, start: float = 1_000.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@contextmanager
+def patched_repository(db: Any | None = None, **overrides: Any) -> Iterator[NightRepository]:
+    original_settings = night_repository.settings
+    original_client = night_repository.get_firestore_client
+    patched_settings = dataclasses.replace(settings, **overrides)
+    night_repository.settings = patched_settings
+    location_repository.settings = patched_settings
+    night_repository.get_firestore_client = lambda: db
+    repository = NightRepository()
+    try:
+        yield repository
+    finally:
+        repository.close()
+        night_repository.settings = original_settings
+        location_repository.settings = original_settings
+        night_repository.get_firestore_client = original_client
+
+
+def measure(callback: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        callback()
+    elapsed = time.perf_counter() - started
+    return repeat / elapsed if elapsed > 0 else float('inf')
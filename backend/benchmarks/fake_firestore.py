@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+
+class ContentionError(RuntimeError):
+    pass
+
+
+class FakeSnapshot:
+    def __init__(self, reference: 'FakeDocumentRef', data: dict | None, update_time: int | None = None) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self.update_time = update_time
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict | None:
+        return copy.copy(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeFirestore:
+    def __init__(
+        self,
+        max_writes_per_doc_per_second: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._docs: dict[str, dict] = {}
+        self._update_times: dict[str, int] = {}
+        self._versions = itertools.count(1)
+        self._last_write: dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.max_writes_per_doc_per_second = max_writes_per_doc_per_second
+        self.clock = clock
+        self.reads = 0
+        self.writes = 0
+        self.contention_errors = 0
+
+    def collection(self, path: str) -> 'FakeCollection':
+        return FakeCollection(self, path)
+
+    def document(self, path: str) -> 'FakeDocumentRef':
+        return FakeDocumentRef(self, path)
+
+    def batch(self) -> 'FakeBatch':
+        return FakeBatch(self)
+
+    def bulk_writer(self) -> 'FakeBatch':
+        return FakeBatch(self, auto_commit=True)
+
+    @staticmethod
+    def write_option(**kwargs: Any) -> dict:
+        return kwargs
+
+    def reset_counters(self) -> None:
+        self.reads = 0
+        self.writes = 0
+        self.contention_errors = 0
+
+    def _read(self, path: str) -> dict | None:
+        with self._lock:
+            self.reads += 1
+            data = self._docs.get(path)
+            return copy.copy(data) if data is not None else None
+
+    def _write(self, path: str, data: dict, merge: bool) -> None:
+        with self._lock:
+            if self.max_writes_per_doc_per_second > 0:
+                now = self.clock()
+                last = self._last_write.get(path)
+                if last is not None and now - last < 1.0 / self.max_writes_per_doc_per_second:
+                    self.contention_errors += 1
+                    raise ContentionError(f'Too much contention on {path}')
+                self._last_write[path] = now
+
+            self.writes += 1
+            current = self._docs.get(path) if merge else None
+            result = dict(current or {})
+            for key, value in data.items():
+                if value is transforms.DELETE_FIELD:
+                    result.pop(key, None)
+                elif isinstance(value, transforms.Increment):
+                    result[key] = (result.get(key) or 0) + value.value
+                else:
+                    result[key] = copy.copy(value)
+            self._docs[path] = result
+            self._update_times[path] = next(self._versions)
+
+    def _delete(self, path: str) -> None:
+        with self._lock:
+            self.writes += 1
+            self._docs.pop(path, None)
+            self._update_times.pop(path, None)
+
+    def _children(self, collection_path: str) -> list[tuple[str, dict]]:
+        prefix = f'{collection_path}/'
+        with self._lock:
+            return [
+                (path, copy.copy(data))
+                for path, data in self._docs.items()
+                if path.startswith(prefix) and '/' not in path[len(prefix):]
+            ]
+
+
+class FakeDocumentRef:
+    def __init__(self, db: FakeFirestore, path: str) -> None:
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def get(self) -> FakeSnapshot:
+        with self._db._lock:
+            return FakeSnapshot(self, self._db._read(self.path), self._db._update_times.get(self.path))
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._db._write(self.path, data, merge=merge)
+
+    def update(self, data: dict) -> None:
+        if self._db._read(self.path) is None:
+            raise KeyError(f'No document to update: {self.path}')
+        self._db.reads -= 1
+        self._db._write(self.path, data, merge=True)
+
+    def create(self, data: dict) -> None:
+        if self._db._read(self.path) is not None:
+            raise KeyError(f'Document already exists: {self.path}')
+        self._db.reads -= 1
+        self._db._write(self.path, data, merge=False)
+
+    def delete(self) -> None:
+        self._db._delete(self.path)
+
+    def collection(self, name: str) -> 'FakeCollection':
+        return FakeCollection(self._db, f'{self.path}/{name}')
+
+
+class FakeCollection:
+    def __init__(
+        self,
+        db: FakeFirestore,
+        path: str,
+        filters: tuple = (),
+        orders: tuple = (),
+        limit_value: int | None = None,
+        cursor: tuple | None = None,
+        fields: tuple | None = None,
+    ) -> None:
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_value
+        self._cursor = cursor
+        self._fields = fields
+
+    def document(self, document_id: str | None = None) -> FakeDocumentRef:
+        if document_id is None:
+            document_id = f'auto-{time.monotonic_ns()}'
+        return FakeDocumentRef(self._db, f'{self.path}/{document_id}')
+
+    def _clone(self, **changes: Any) -> 'FakeCollection':
+        state = {
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit_value': self._limit,
+            'cursor': self._cursor,
+            'fields': self._fields,
+        }
+        state.update(changes)
+        return FakeCollection(self._db, self.path, **state)
+
+    def where(
+        self,
+        field_path: str | None = None,
+        op_string: str | None = None,
+        value: Any = None,
+        filter: FieldFilter | None = None,
+    ) -> 'FakeCollection':
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._clone(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = 'ASCENDING') -> 'FakeCollection':
+        return self._clone(orders=self._orders + ((field_path, direction),))
+
+    def select(self, field_paths: Any) -> 'FakeCollection':
+        return self._clone(fields=tuple(field_paths))
+
+    def limit(self, count: int) -> 'FakeCollection':
+        return self._clone(limit_value=count)
+
+    def start_after(self, document_fields: Any) -> 'FakeCollection':
+        return self._clone(cursor=('after', document_fields))
+
+    def start_at(self, document_fields: Any) -> 'FakeCollection':
+        return self._clone(cursor=('at', document_fields))
+
+    def get(self) -> list[FakeSnapshot]:
+        return list(self.stream())
+
+    def stream(self) -> Iterator[FakeSnapshot]:
+        rows = [
+            (FakeDocumentRef(self._db, path), data)
+            for path, data in self._db._children(self.path)
+            if all(self._matches(data, *item) for item in self._filters)
+        ]
+        for field, direction in reversed(self._orders):
+            rows.sort(
+                key=lambda row: self._sort_value(self._field(row, field)),
+                reverse=direction == 'DESCENDING',
+            )
+
+        if self._cursor is not None:
+            mode, fields = self._cursor
+            rows = self._apply_cursor(rows, mode, fields)
+
+        if self._limit is not None:
+            rows = rows[: self._limit]
+
+        for reference, data in rows:
+            self._db.reads += 1
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            yield FakeSnapshot(reference, data, self._db._update_times.get(reference.path))
+
+    def _apply_cursor(self, rows: list, mode: str, fields: Any) -> list:
+        if isinstance(fields, FakeSnapshot):
+            values = [self._field((fields.reference, fields.to_dict() or {}), field) for field, _ in self._orders]
+        elif isinstance(fields, dict):
+            values = [fields.get(field) for field, _ in self._orders]
+        else:
+            values = list(fields)
+
+        def position(row: tuple) -> tuple:
+            key = []
+            for (field, direction), value in zip(self._orders, values):
+                current = self._sort_value(self._field(row, field))
+                target = self._sort_value(value)
+                if current == target:
+                    key.append(0)
+                elif (current < target) != (direction == 'DESCENDING'):
+                    key.append(-1)
+                else:
+                    key.append(1)
+            return tuple(key)
+
+        zero = tuple(0 for _ in values)
+        if mode == 'after':
+            return [row for row in rows if position(row) > zero]
+        return [row for row in rows if position(row) >= zero]
+
+    @staticmethod
+    def _field(row: tuple, field: str) -> Any:
+        reference, data = row
+        if field == '__name__':
+            return reference.id
+        return data.get(field)
+
+    @staticmethod
+    def _sort_value(value: Any) -> Any:
+        if value is None:
+            return (0, 0)
+        if hasattr(value, 'timestamp'):
+            return (1, value.timestamp())
+        if isinstance(value, (int, float)):
+            return (1, value)
+        return (2, str(value))
+
+    @classmethod
+    def _matches(cls, data: dict, field: str, op: str, value: Any) -> bool:
+        current = data.get(field)
+        if op == '==':
+            return current == value
+        if op == 'in':
+            return current in value
+        if current is None:
+            return False
+        left, right = cls._sort_value(current), cls._sort_value(value)
+        if op == '<':
+            return left < right
+        if op == '<=':
+            return left <= right
+        if op == '>':
+            return left > right
+        if op == '>=':
+            return left >= right
+        raise ValueError(f'Unsupported operator: {op}')
+
+
+class FakeBatch:
+    def __init__(self, db: FakeFirestore, auto_commit: bool = False) -> None:
+        self._db = db
+        self._auto_commit = auto_commit
+        self._operations: list[tuple] = []
+
+    def set(self, reference: FakeDocumentRef, data: dict, merge: bool = False) -> None:
+        self._operations.append(('set', reference, data, merge))
+        if self._auto_commit:
+            self.commit()
+
+    def update(self, reference: FakeDocumentRef, data: dict, option: dict | None = None) -> None:
+        self._operations.append(('update', reference, data, option or {}))
+        if self._auto_commit:
+            self.commit()
+
+    def create(self, reference: FakeDocumentRef, data: dict) -> None:
+        self._operations.append(('create', reference, data, False))
+        if self._auto_commit:
+            self.commit()
+
+    def delete(self, reference: FakeDocumentRef) -> None:
+        self._operations.append(('delete', reference, None, False))
+        if self._auto_commit:
+            self.commit()
+
+    def commit(self) -> list:
+        operations, self._operations = self._operations, []
+        with self._db._lock:
+            for kind, reference, _, option in operations:
+                update_time = self._db._update_times.get(reference.path)
+                if kind == 'create' and update_time is not None:
+                    raise AlreadyExists(f'Document already exists: {reference.path}')
+                if kind == 'update' and update_time is None:
+                    raise NotFound(f'No document to update: {reference.path}')
+                if kind == 'update' and option.get('last_update_time', update_time) != update_time:
+                    raise FailedPrecondition(f'Document changed: {reference.path}')
+            for kind, reference, data, merge in operations:
+                if kind == 'delete':
+                    reference.delete()
+                elif kind == 'update':
+                    self._db._write(reference.path, data, merge=True)
+                else:
+                    self._db._write(reference.path, data, merge=merge)
+        return operations
+
+    def flush(self) -> None:
+        self.commit()
+
+    def close(self) -> None:
+        self.commit()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+
+class FakeKeyServer:
+    def __init__(self, project_id: str = 'night-mode-bench', keys: int = 2, max_age_seconds: int = 3600) -> None:
+        self.project_id = project_id
+        self.max_age_seconds = max_age_seconds
+        self.requests = 0
+        self._private_keys: dict[str, rsa.RSAPrivateKey] = {}
+        self._certificates: dict[str, str] = {}
+        for index in range(keys):
+            self.add_key(f'bench-key-{index}')
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                server.requests += 1
+                body = json.dumps(server._certificates).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', f'public, max-age={server.max_age_seconds}')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                return
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/certs'
+
+    def __enter__(self) -> FakeKeyServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def add_key(self, kid: str) -> None:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+        now = datetime.now(timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=1))
+            .sign(private_key, hashes.SHA256())
+        )
+        self._private_keys[kid] = private_key
+        self._certificates[kid] = certificate.public_bytes(serialization.Encoding.PEM).decode('utf-8')
+
+    def mint(self, uid: str, kid: str | None = None, ttl_seconds: int = 3600, **claims: object) -> str:
+        kid = kid or next(iter(self._private_keys))
+        now = int(time.time())
+        payload = {
+            'iss': f'https://securetoken.google.com/{self.project_id}',
+            'aud': self.project_id,
+            'sub': uid,
+            'user_id': uid,
+            'auth_time': now,
+            'iat': now,
+            'exp': now + ttl_seconds,
+            **claims,
+        }
+        return jwt.encode(payload, self._private_keys[kid], algorithm='RS256', headers={'kid': kid})
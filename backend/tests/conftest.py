@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from contextlib import ExitStack
+
+import pytest
+
+from benchmarks.common import patched_repository
+
+
+@pytest.fixture
+def make_repository():
+    with ExitStack() as stack:
+        def build(db=None, **overrides):
+            overrides.setdefault('clicker_rate_limiter', 'memory')
+            overrides.setdefault('clicker_max_taps_per_second', 10**6)
+            overrides.setdefault('clicker_tap_burst', 10**6)
+            overrides.setdefault('clicker_write_behind', False)
+            overrides.setdefault('clicker_point_shards', 0)
+            overrides.setdefault('clicker_record_cache_size', 0)
+            overrides.setdefault('clicker_leaderboard_snapshot_seconds', 0)
+            return stack.enter_context(patched_repository(db, **overrides))
+
+        yield build
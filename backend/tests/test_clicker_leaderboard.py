@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core.cursors import CursorError, decode_cursor, encode_cursor
+from benchmarks.fake_firestore import FakeFirestore
+
+
+def seed(repository, players: int) -> list[str]:
+    uids = []
+    for telegram_user_id in range(1, players + 1):
+        uid = repository.upsert_clicker_user(telegram_user_id=telegram_user_id, first_name=f'P{telegram_user_id}').uid
+        repository.tap_clicker(uid=uid, taps=telegram_user_id)
+        uids.append(uid)
+    return list(reversed(uids))
+
+
+def materialize(repository) -> None:
+    worker = repository._leaderboard_materializer
+    worker.start()
+    deadline = time.monotonic() + 5
+    while worker.runs == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker.runs == 1
+
+
+def walk(repository, limit: int) -> tuple[list[tuple[int, str]], list[str]]:
+    rows, sources, cursor = [], [], None
+    while True:
+        items, cursor, _ = repository.clicker_leaderboard_page(limit=limit, cursor=cursor)
+        rows.extend((item.rank, item.uid) for item in items)
+        if cursor is None:
+            return rows, sources
+        sources.append(decode_cursor(cursor, size=5)[0])
+
+
+@pytest.mark.parametrize('backend', ['memory', 'firestore'])
+def test_pages_cover_the_ranking_once(make_repository, backend):
+    repository = make_repository(FakeFirestore() if backend == 'firestore' else None)
+    expected = seed(repository, 7)
+    rows, sources = walk(repository, limit=3)
+    assert rows == list(enumerate(expected, start=1))
+    assert set(sources) == {'live'}
+
+
+def test_snapshot_pages_continue_on_live_ratings(make_repository):
+    repository = make_repository(
+        FakeFirestore(),
+        clicker_leaderboard_snapshot_seconds=3600,
+        clicker_leaderboard_snapshot_size=4,
+    )
+    expected = seed(repository, 9)
+    materialize(repository)
+
+    rows, sources = walk(repository, limit=3)
+    assert rows == list(enumerate(expected, start=1))
+    assert sources[0] != 'live'
+    assert sources[1:] == ['live'] * (len(sources) - 1)
+
+
+def test_rebuilt_snapshot_expires_its_cursors(make_repository):
+    repository = make_repository(
+        FakeFirestore(),
+        clicker_leaderboard_snapshot_seconds=3600,
+        clicker_leaderboard_snapshot_size=4,
+    )
+    seed(repository, 6)
+    materialize(repository)
+    _, cursor, snapshot_at = repository.clicker_leaderboard_page(limit=2)
+    assert snapshot_at is not None
+
+    repository.materialize_clicker_leaderboard()
+    with pytest.raises(CursorError):
+        repository.clicker_leaderboard_page(limit=2, cursor=cursor)
+
+
+@pytest.mark.parametrize('values', [
+    ['live', 10, '2026-01-01T00:00:00', 'tg_1', 1],
+    ['live', 'ten', '2026-01-01T00:00:00+00:00', 'tg_1', 1],
+    ['live', 10, '2026-01-01T00:00:00+00:00', 'tg_1'],
+])
+def test_invalid_cursors_are_rejected(make_repository, values):
+    repository = make_repository()
+    with pytest.raises(CursorError):
+        repository.clicker_leaderboard_page(limit=2, cursor=encode_cursor(values))
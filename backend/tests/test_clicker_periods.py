@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.infrastructure.repositories.night_repository import NightRepository
+from benchmarks.fake_firestore import FakeFirestore
+
+
+def tap(repository, telegram_user_id: int, taps: int) -> str:
+    uid = repository.upsert_clicker_user(telegram_user_id=telegram_user_id, first_name=f'P{telegram_user_id}').uid
+    assert repository.tap_clicker(uid=uid, taps=taps)[0]
+    return uid
+
+
+def test_period_ids():
+    now = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    assert NightRepository._period_id('daily', now) == '2026-01-01'
+    assert NightRepository._period_id('weekly', now) == '2026-W01'
+
+
+def test_roll_period_buckets_resets_the_base(make_repository):
+    repository = make_repository()
+    now = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    record = {'points': 120, 'daily_id': '2026-01-04', 'daily_base': 100, 'weekly_id': '2026-W02', 'weekly_base': 20}
+
+    assert repository._period_points(record, 'daily') == 20
+    assert repository._roll_period_buckets(record, now)
+    assert record['daily_id'] == '2026-01-05'
+    assert repository._period_points(record, 'daily') == 0
+    assert repository._period_points(record, 'weekly') == 100
+    assert not repository._roll_period_buckets(record, now)
+
+
+def test_exclude_from_periods_keeps_bonus_out_of_period_points(make_repository):
+    repository = make_repository()
+    record = {'points': 50, 'daily_base': 0, 'weekly_base': 10}
+    record['points'] += 30
+    repository._exclude_from_periods(record, 30)
+    assert repository._period_points(record, 'daily') == 50
+    assert repository._period_points(record, 'weekly') == 40
+
+
+@pytest.mark.parametrize('backend', ['memory', 'firestore'])
+def test_period_leaderboard_orders_period_points(make_repository, backend):
+    repository = make_repository(FakeFirestore() if backend == 'firestore' else None)
+    first = tap(repository, 1, 3)
+    second = tap(repository, 2, 7)
+    tap(repository, 1, 1)
+
+    for period in ('daily', 'weekly'):
+        period_id, items = repository.clicker_period_leaderboard(period, limit=10)
+        assert period_id == repository._period_id(period, datetime.now(timezone.utc))
+        assert [(item.uid, item.points, item.rank) for item in items] == [(second, 7, 1), (first, 4, 2)]
+
+    with pytest.raises(ValueError):
+        repository.clicker_period_leaderboard('monthly')
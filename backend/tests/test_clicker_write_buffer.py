@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.infrastructure.stores.clicker_write_buffer import ClickerWriteBuffer
+from benchmarks.fake_firestore import FakeFirestore
+
+
+class Writer:
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+        self.fail = False
+
+    def __call__(self, records: list[dict]) -> None:
+        if self.fail:
+            raise RuntimeError('firestore unavailable')
+        self.batches.append(records)
+
+
+@pytest.fixture
+def writer():
+    return Writer()
+
+
+@pytest.fixture
+def buffer(writer):
+    buffer = ClickerWriteBuffer(writer, flush_interval_seconds=3600)
+    yield buffer
+    writer.fail = False
+    buffer.close()
+
+
+def add_points(points: int):
+    def change(record: dict) -> int:
+        record['points'] = record.get('points', 0) + points
+        return record['points']
+
+    return change
+
+
+def test_put_caches_without_marking_dirty(buffer, writer):
+    buffer.put({'uid': 'a', 'points': 1})
+    assert buffer.get('a') == {'uid': 'a', 'points': 1}
+    assert buffer.dirty_count == 0
+    assert buffer.flush() == 0
+    assert writer.batches == []
+
+
+def test_get_returns_a_copy(buffer):
+    buffer.put({'uid': 'a', 'points': 1})
+    buffer.get('a')['points'] = 99
+    assert buffer.get('a')['points'] == 1
+
+
+def test_apply_merges_into_the_buffered_record(buffer, writer):
+    buffer.put({'uid': 'a', 'points': 10})
+    updated, result = buffer.apply({'uid': 'a', 'points': 0}, add_points(5))
+    assert result == 15
+    assert updated == {'uid': 'a', 'points': 15}
+    assert buffer.dirty_count == 1
+
+    assert buffer.flush() == 1
+    assert writer.batches == [[{'uid': 'a', 'points': 15}]]
+    assert buffer.dirty_count == 0
+
+
+def test_concurrent_apply_loses_no_updates(buffer, writer):
+    record = {'uid': 'a', 'points': 0}
+
+    def tap() -> None:
+        for _ in range(200):
+            buffer.apply(record, add_points(1))
+
+    threads = [threading.Thread(target=tap) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    buffer.flush()
+    assert writer.batches[-1] == [{'uid': 'a', 'points': 1600}]
+
+
+def test_failed_flush_keeps_records_dirty(buffer, writer):
+    buffer.stage({'uid': 'a', 'points': 1})
+    writer.fail = True
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.dirty_count == 1
+
+    writer.fail = False
+    assert buffer.flush() == 1
+    assert writer.batches == [[{'uid': 'a', 'points': 1}]]
+
+
+def test_flush_evicts_idle_clean_records(buffer):
+    buffer.idle_seconds = 0
+    buffer.put({'uid': 'clean'})
+    buffer.stage({'uid': 'dirty'})
+    buffer._evict_idle()
+    assert buffer.get('clean') is None
+    assert buffer.get('dirty') is not None
+
+
+def test_max_dirty_wakes_the_flusher(writer):
+    buffer = ClickerWriteBuffer(writer, flush_interval_seconds=3600, max_dirty=2)
+    try:
+        buffer.stage({'uid': 'a'})
+        buffer.stage({'uid': 'b'})
+        for _ in range(100):
+            if writer.batches:
+                break
+            threading.Event().wait(0.01)
+        assert sorted(record['uid'] for record in writer.batches[0]) == ['a', 'b']
+    finally:
+        buffer.close()
+
+
+def test_close_flushes_pending_records(writer):
+    buffer = ClickerWriteBuffer(writer, flush_interval_seconds=3600)
+    buffer.stage({'uid': 'a', 'points': 3})
+    buffer.close()
+    assert writer.batches == [[{'uid': 'a', 'points': 3}]]
+
+
+def test_write_behind_taps_reach_firestore_on_flush(make_repository):
+    db = FakeFirestore()
+    repository = make_repository(
+        db,
+        clicker_write_behind=True,
+        clicker_flush_interval_seconds=3600,
+        clicker_record_cache_size=100,
+    )
+    uid = repository.upsert_clicker_user(telegram_user_id=1, first_name='Buffered').uid
+    for _ in range(10):
+        repository.tap_clicker(uid=uid, taps=3)
+    assert repository.get_clicker_state(uid).points == 30
+
+    assert repository.flush_clicker_writes() == 1
+    assert db._read(f'users/{uid}')['points'] == 30
+    assert db._read(f'ratings/{uid}')['points'] == 30
+    assert repository._record_cache.peek(uid) is None
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.cursors import CursorError, decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    values = ['live', 120, '2026-01-01T00:00:00+00:00', 'tg_1', 7]
+    token = encode_cursor(values)
+    assert '=' not in token
+    assert decode_cursor(token, size=5) == values
+
+
+@pytest.mark.parametrize('token', ['not base64!', encode_cursor(['a']) + '$', 'e30'])
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(CursorError):
+        decode_cursor(token, size=1)
+
+
+def test_size_mismatch_is_rejected():
+    with pytest.raises(CursorError):
+        decode_cursor(encode_cursor(['a', 'b']), size=3)
+
+
+def test_cursor_error_is_a_value_error():
+    assert issubclass(CursorError, ValueError)
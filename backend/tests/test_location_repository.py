@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.core import geohash
+from app.core.geohash import BoundingBox
+from app.domain.schemas import UserLocationCreate
+from app.infrastructure.stores import memory_store
+from app.infrastructure.stores.location_ring import LocationRing
+from app.tools.migrate import Migrator
+from benchmarks.fake_firestore import FakeFirestore
+
+BBOX = BoundingBox(39.6, 43.9, 40.8, 45.1)
+
+
+@pytest.fixture(autouse=True)
+def empty_ring(monkeypatch):
+    monkeypatch.setattr(memory_store.store, 'locations', LocationRing(capacity=10_000))
+
+
+@pytest.fixture(params=['memory', 'firestore'])
+def locations(request, make_repository):
+    db = FakeFirestore() if request.param == 'firestore' else None
+    return make_repository(db).locations
+
+
+def payload(uid: str, lat: float, lng: float) -> UserLocationCreate:
+    return UserLocationCreate(uid=uid, city='Yerevan', country='Armenia', lat=lat, lng=lng)
+
+
+def seed(locations, count: int) -> list:
+    rng = random.Random(count)
+    return [
+        locations.create_location(payload(f'user-{index}', 40.2 + rng.gauss(0, 0.5), 44.5 + rng.gauss(0, 0.5)))
+        for index in range(count)
+    ]
+
+
+def test_bbox_pages_follow_geohash_order(locations):
+    created = seed(locations, 300)
+    expected = sorted(
+        (geohash.encode(item.lat, item.lng), item.id)
+        for item in created
+        if BBOX.contains(item.lat, item.lng)
+    )
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = locations.list_locations_page(bbox=BBOX, limit=40, cursor=cursor)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            break
+    assert seen == [location_id for _, location_id in expected]
+
+
+def test_latest_pages_are_newest_first(locations):
+    created = seed(locations, 25)
+    seen, cursor = [], None
+    while True:
+        page, cursor = locations.list_locations_page(limit=10, cursor=cursor)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            break
+    assert seen == [item.id for item in reversed(created)]
+
+
+def test_nearby_matches_brute_force(locations):
+    created = seed(locations, 200)
+    expected = sorted(
+        (geohash.haversine_km(40.2, 44.5, item.lat, item.lng), item.id)
+        for item in created
+        if geohash.haversine_km(40.2, 44.5, item.lat, item.lng) <= 25
+    )[:15]
+    found = locations.nearby_locations(40.2, 44.5, radius_km=25, limit=15)
+    assert [item.id for _, item in found] == [location_id for _, location_id in expected]
+
+
+def test_clusters_count_every_location(locations):
+    seed(locations, 50)
+    zoom, clusters = locations.location_clusters(0, BoundingBox(-85, -180, 85, 180))
+    assert zoom == 0
+    assert sum(cluster.count for cluster in clusters) == 50
+    with pytest.raises(ValueError):
+        locations.location_clusters(14, BoundingBox(-85, -180, 85, 180))
+
+
+@pytest.mark.parametrize('backend', ['memory', 'firestore'])
+def test_live_mode_moves_a_single_location_per_uid(make_repository, backend):
+    db = FakeFirestore() if backend == 'firestore' else None
+    locations = make_repository(db, locations_live_mode=True, locations_coalesce_seconds=0).locations
+    locations.create_location(payload('user-1', 40.2, 44.5))
+    moved = locations.create_location(payload('user-1', 55.75, 37.62))
+
+    assert moved.id == 'user-1'
+    assert [item.id for item in locations.location_history('user-1')] == ['user-1', 'user-1']
+    assert [item.lat for item in locations.location_history('user-1')] == [55.75, 40.2]
+    assert [item.id for _, item in locations.nearby_locations(55.75, 37.62, radius_km=5)] == ['user-1']
+    assert locations.nearby_locations(40.2, 44.5, radius_km=5) == []
+    _, clusters = locations.location_clusters(0, BoundingBox(-85, -180, 85, 180))
+    assert sum(cluster.count for cluster in clusters) == 1
+
+
+def test_live_upsert_retries_after_a_concurrent_write(make_repository):
+    db = FakeFirestore()
+    locations = make_repository(db, locations_live_mode=True, locations_coalesce_seconds=0).locations
+    locations.create_location(payload('user-1', 40.2, 44.5))
+
+    write = locations._write_live_location
+    attempts = []
+
+    def interleaved(reference, snapshot, location, history_size):
+        attempts.append(snapshot.update_time)
+        if len(attempts) == 1:
+            reference.set({'name': 'concurrent'}, merge=True)
+        write(reference, snapshot, location, history_size)
+
+    locations._write_live_location = interleaved
+    locations.create_location(payload('user-1', 55.75, 37.62))
+
+    assert len(attempts) == 2
+    assert attempts[0] != attempts[1]
+    assert db._read('locations/user-1')['lat'] == 55.75
+    _, clusters = locations.location_clusters(0, BoundingBox(-85, -180, 85, 180))
+    assert sum(cluster.count for cluster in clusters) == 1
+
+
+def test_cluster_migration_counts_each_location_once(make_repository):
+    db = FakeFirestore()
+    repository = make_repository(db)
+    for index in range(30):
+        db.document(f'locations/loc-{index:03d}').set(
+            {'uid': f'user-{index}', 'lat': 40.0 + index / 100, 'lng': 44.0, 'created_at': None}
+        )
+
+    Migrator(repository, 'cluster-locations', page_size=7).run()
+    Migrator(repository, 'cluster-locations', page_size=7).run()
+
+    _, clusters = repository.locations.location_clusters(0, BoundingBox(-85, -180, 85, 180))
+    assert sum(cluster.count for cluster in clusters) == 30
+    assert all(raw.get('clustered') for _, raw in db._children('locations'))
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.core.geohash import BoundingBox, haversine_km
+from app.domain.schemas import UserLocation
+from app.infrastructure.stores.cluster_grid import ClusterGrid
+from app.infrastructure.stores.live_location_set import LiveLocationSet
+from app.infrastructure.stores.location_ring import LocationRing
+from app.infrastructure.stores.spatial_index import SpatialGridIndex
+
+STARTED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def location(index: int, uid: str | None = None, city: str = 'Yerevan', lat: float = 40.18, lng: float = 44.5) -> UserLocation:
+    return UserLocation(
+        id=f'loc-{index}',
+        uid=uid or f'user-{index}',
+        name='Night Rider',
+        city=city,
+        country='Armenia',
+        lat=lat,
+        lng=lng,
+        created_at=STARTED_AT + timedelta(seconds=index),
+    )
+
+
+def test_ring_evicts_oldest_and_keeps_secondary_indexes():
+    ring = LocationRing(capacity=3)
+    evicted = [ring.append(location(index, uid=f'user-{index % 2}', city='Moscow' if index % 2 else 'Yerevan')) for index in range(5)]
+    assert [item.id if item else None for item in evicted] == [None, None, None, 'loc-0', 'loc-1']
+    assert [item.id for item in ring] == ['loc-4', 'loc-3', 'loc-2']
+    assert [item.id for item in ring.by_uid('user-0', 10)] == ['loc-4', 'loc-2']
+    assert [item.id for item in ring.by_city('Moscow', 10)] == ['loc-3']
+
+
+def test_ring_since_resumes_from_sequence():
+    ring = LocationRing(capacity=4, items=[location(index) for index in range(3)])
+    latest, sequence = ring.latest(2)
+    assert [item.id for item in latest] == ['loc-2', 'loc-1']
+    ring.append(location(3))
+    ring.append(location(4))
+    added, sequence = ring.since(sequence, 10)
+    assert [item.id for item in added] == ['loc-3', 'loc-4']
+    assert ring.since(sequence, 10) == ([], sequence)
+    assert [item.id for item in ring.since(0, 10)[0]] == ['loc-1', 'loc-2', 'loc-3', 'loc-4']
+
+
+def test_live_set_keeps_one_location_per_uid():
+    live = LiveLocationSet()
+    live.upsert(location(0, uid='a', city='Yerevan'))
+    live.upsert(location(1, uid='b', city='Yerevan'))
+    _, sequence = live.latest(10)
+    previous = live.upsert(location(2, uid='a', city='Moscow'))
+
+    assert previous.id == 'loc-0'
+    assert len(live) == 2
+    assert [item.id for item in live] == ['loc-2', 'loc-1']
+    assert [item.id for item in live.by_city('Yerevan', 10)] == ['loc-1']
+    assert [item.id for item in live.by_city('Moscow', 10)] == ['loc-2']
+    assert [item.id for item in live.since(sequence, 10)[0]] == ['loc-2']
+
+
+def test_spatial_index_matches_brute_force():
+    rng = random.Random(3)
+    index: SpatialGridIndex[str] = SpatialGridIndex(cell_degrees=0.25)
+    points = {}
+    for member in range(2000):
+        points[member] = (40 + rng.uniform(-2, 2), 44 + rng.uniform(-2, 2))
+        index.upsert(member, *points[member], value=member)
+    index.upsert(0, 60.0, 10.0, value=0)
+    points[0] = (60.0, 10.0)
+    index.discard(1)
+    del points[1]
+
+    found = index.nearby(40.0, 44.0, 50.0, limit=20)
+    expected = sorted(
+        (haversine_km(40.0, 44.0, lat, lng), member)
+        for member, (lat, lng) in points.items()
+        if haversine_km(40.0, 44.0, lat, lng) <= 50.0
+    )[:20]
+    assert [member for _, member in found] == [member for _, member in expected]
+
+    bbox = BoundingBox(39.5, 43.5, 40.5, 44.5)
+    assert sorted(index.within(bbox)) == sorted(member for member, point in points.items() if bbox.contains(*point))
+
+
+def test_cluster_grid_counts_and_centroids():
+    grid = ClusterGrid(max_zoom=4, cell_bits=2)
+    grid.add(40.0, 44.0)
+    grid.add(42.0, 46.0)
+    grid.add(-33.9, 151.2)
+    world = BoundingBox(-85, -180, 85, 180)
+
+    assert sum(cluster.count for cluster in grid.clusters(0, world)) == 3
+    grid.remove(-33.9, 151.2)
+    clusters = grid.clusters(0, world)
+    assert [(cluster.count, round(cluster.lat, 3), round(cluster.lng, 3)) for cluster in clusters] == [(2, 41.0, 45.0)]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from benchmarks.fake_firestore import FakeFirestore
+
+
+def shard_totals(db: FakeFirestore, uid: str) -> int:
+    return sum(int(raw.get('points') or 0) for _, raw in db._children(f'users/{uid}/point_shards'))
+
+
+def test_taps_increment_shards_instead_of_the_user_document(make_repository):
+    db = FakeFirestore()
+    repository = make_repository(db, clicker_point_shards=4, clicker_rating_rollup_seconds=3600)
+    assert repository.using_point_shards
+    uid = repository.upsert_clicker_user(telegram_user_id=1, first_name='Shard').uid
+
+    for _ in range(20):
+        repository.tap_clicker(uid=uid, taps=1)
+
+    assert shard_totals(db, uid) == 20
+    assert not (db._read(f'users/{uid}') or {}).get('points')
+    assert 1 < len(db._children(f'users/{uid}/point_shards')) <= 4
+
+
+def test_rollup_writes_aggregated_ratings(make_repository):
+    db = FakeFirestore()
+    repository = make_repository(db, clicker_point_shards=4, clicker_rating_rollup_seconds=3600)
+    uid = repository.upsert_clicker_user(telegram_user_id=1, first_name='Shard').uid
+    for _ in range(12):
+        repository.tap_clicker(uid=uid, taps=2)
+
+    repository.flush_clicker_writes()
+    assert db._read(f'ratings/{uid}')['points'] == 24
+    assert repository.get_clicker_state(uid).points == 24
+
+
+def test_shards_are_disabled_with_write_behind(make_repository):
+    repository = make_repository(FakeFirestore(), clicker_point_shards=4, clicker_write_behind=True)
+    assert not repository.using_point_shards
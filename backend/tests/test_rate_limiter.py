@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from app.core.config import settings
+from app.core.rate_limiter import InMemoryTokenBucket, SqliteTokenBucket, build_tap_rate_limiter
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limiter(request, tmp_path):
+    if request.param == 'sqlite':
+        return SqliteTokenBucket(path=str(tmp_path / 'limiter.sqlite3'), rate=10, capacity=10)
+    return InMemoryTokenBucket(rate=10, capacity=10)
+
+
+def test_burst_is_capped_by_capacity(limiter):
+    decision = limiter.acquire('uid', 25, now=100.0)
+    assert decision.granted == 10
+    assert decision.remaining == 0
+    assert limiter.acquire('uid', 1, now=100.0).granted == 0
+
+
+def test_tokens_refill_with_elapsed_time(limiter):
+    limiter.acquire('uid', 10, now=100.0)
+    assert limiter.acquire('uid', 10, now=100.5).granted == 5
+    assert limiter.acquire('uid', 10, now=200.0).granted == 10
+
+
+def test_keys_are_independent(limiter):
+    limiter.acquire('first', 10, now=100.0)
+    assert limiter.acquire('second', 10, now=100.0).granted == 10
+
+
+def test_used_counts_grants_within_the_current_second(limiter):
+    assert limiter.acquire('uid', 3, now=100.1).used == 3
+    assert limiter.acquire('uid', 2, now=100.9).used == 5
+    assert limiter.acquire('uid', 1, now=101.5).used == 1
+
+
+def test_recent_caps_the_per_second_count(limiter):
+    decision = limiter.acquire('uid', 40, now=100.0, capacity=40, recent=4)
+    assert decision.granted == 40
+    assert decision.capacity == 40
+    assert decision.used == 4
+
+
+def test_reset_refills_every_bucket(limiter):
+    limiter.acquire('uid', 10, now=100.0)
+    limiter.reset()
+    assert limiter.acquire('uid', 10, now=100.0).granted == 10
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'limiter.sqlite3')
+    SqliteTokenBucket(path=path, rate=10, capacity=10).acquire('uid', 10, now=100.0)
+    assert SqliteTokenBucket(path=path, rate=10, capacity=10).acquire('uid', 10, now=100.0).granted == 0
+
+
+def test_memory_prune_keeps_active_buckets():
+    limiter = InMemoryTokenBucket(rate=10, capacity=10, max_keys=2)
+    limiter.acquire('stale', 10, now=0.0)
+    limiter.acquire('active', 10, now=100.0)
+    limiter.acquire('new', 1, now=100.0)
+    assert set(limiter._buckets) == {'active', 'new'}
+
+
+def test_build_tap_rate_limiter_picks_backend(tmp_path):
+    memory = dataclasses.replace(settings, clicker_rate_limiter='memory')
+    sqlite = dataclasses.replace(
+        settings,
+        clicker_rate_limiter='sqlite',
+        clicker_rate_limiter_path=str(tmp_path / 'limiter.sqlite3'),
+    )
+    assert isinstance(build_tap_rate_limiter(memory), InMemoryTokenBucket)
+    assert isinstance(build_tap_rate_limiter(sqlite), SqliteTokenBucket)
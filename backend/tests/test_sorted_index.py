@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import random
+
+from app.infrastructure.stores.sorted_index import SortedIndex
+
+
+def build(count: int, seed: int = 7) -> tuple[SortedIndex, dict[str, tuple]]:
+    rng = random.Random(seed)
+    index = SortedIndex()
+    keys = {}
+    for position in range(count):
+        member = f'uid-{position}'
+        keys[member] = (-rng.randrange(100), -rng.random())
+        index.upsert(member, keys[member])
+    return index, keys
+
+
+def ordered(keys: dict[str, tuple]) -> list[str]:
+    return [member for member, _ in sorted(keys.items(), key=lambda item: (*item[1], item[0]))]
+
+
+def test_head_and_slice_follow_key_order():
+    index, keys = build(3000)
+    expected = ordered(keys)
+    assert len(index) == 3000
+    assert index.head(10) == expected[:10]
+    assert index.slice(1500, 1520) == expected[1500:1520]
+    assert index.slice(2990, 4000) == expected[2990:]
+    assert index.slice(10, 5) == []
+
+
+def test_rank_matches_position():
+    index, keys = build(3000)
+    expected = ordered(keys)
+    for position in (0, 511, 512, 1024, 2999):
+        assert index.rank(expected[position]) == position
+    assert index.rank('missing') is None
+
+
+def test_upsert_moves_member_and_discard_removes_it():
+    index, keys = build(2000)
+    index.upsert('uid-5', (-1000, 0.0))
+    keys['uid-5'] = (-1000, 0.0)
+    assert index.head(1) == ['uid-5']
+
+    index.discard('uid-5')
+    index.discard('uid-5')
+    del keys['uid-5']
+    assert 'uid-5' not in index
+    assert index.slice(0, len(keys)) == ordered(keys)
+
+
+def test_slice_after_resumes_past_entry():
+    index, keys = build(3000)
+    expected = ordered(keys)
+    member = expected[1234]
+    start, members = index.slice_after((*keys[member], member), 5)
+    assert start == 1235
+    assert members == expected[1235:1240]
+
+
+def test_slice_after_unknown_entry_uses_sort_position():
+    index = SortedIndex()
+    for member, points in (('a', -30), ('b', -20), ('c', -10)):
+        index.upsert(member, (points,))
+    assert index.slice_after((-25, 'zzz'), 10) == (1, ['b', 'c'])
+    assert index.slice_after((0, ''), 10) == (3, [])
+
+
+def test_entries_after_returns_keys_with_members():
+    index = SortedIndex()
+    for member, geohash in (('x', 'u0'), ('y', 'u1'), ('z', 'u1')):
+        index.upsert(member, (geohash,))
+    assert index.entries_after(('u0',), 10) == [('u0', 'x'), ('u1', 'y'), ('u1', 'z')]
+    assert index.entries_after(('u1', 'y'), 10) == [('u1', 'z')]
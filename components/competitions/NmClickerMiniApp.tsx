@@ -31,6 +31,8 @@ type ClickerState = {
 
 type AuthResponse = {
   access_token: string;
+  expires_in: number;
+  refresh_token?: string | null;
   uid: string;
   start_param?: string | null;
   state: ClickerState;
@@ -73,6 +75,7 @@ function getTelegramWebApp() {
 
 export default function NmClickerMiniApp() {
   const [token, setToken] = useState<string>('');
+  const [session, setSession] = useState<{ refreshToken: string; expiresIn: number } | null>(null);
   const [state, setState] = useState<ClickerState | null>(null);
   const [leaderboard, setLeaderboard] = useState<LeaderboardItem[]>([]);
   const [activePanel, setActivePanel] = useState<'game' | 'rating'>('game');
@@ -81,7 +84,7 @@ export default function NmClickerMiniApp() {
   const [tapPulse, setTapPulse] = useState<boolean>(false);
   const touchStartXRef = useRef<number | null>(null);
   const appliedReferralRef = useRef<boolean>(false);
-  const tapQueueRef = useRef<number>(0);
+  const tapQueueRef = useRef<number[]>([]);
   const tapTimerRef = useRef<number | null>(null);
 
   const tgUserId = state?.telegram_user_id ?? null;
@@ -183,6 +186,9 @@ export default function NmClickerMiniApp() {
         const data = (await response.json()) as AuthResponse;
         if (!active) return;
         setToken(data.access_token);
+        if (data.refresh_token) {
+          setSession({ refreshToken: data.refresh_token, expiresIn: data.expires_in });
+        }
         setState(data.state);
         setStatusText('Игрок авторизован. Тапай логотип NM.');
         setLoading(false);
@@ -202,22 +208,42 @@ export default function NmClickerMiniApp() {
     };
   }, [applyReferralIfNeeded, loadLeaderboard]);
 
+  useEffect(() => {
+    if (!session) return;
+    const timer = window.setTimeout(async () => {
+      try {
+        const response = await fetch(apiUrl('/api/clicker/auth/refresh'), {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: session.refreshToken })
+        });
+        if (!response.ok) return;
+        const data = (await response.json()) as { access_token: string; expires_in: number; refresh_token: string };
+        setToken(data.access_token);
+        setSession({ refreshToken: data.refresh_token, expiresIn: data.expires_in });
+      } catch {
+        setStatusText('Не удалось продлить сессию.');
+      }
+    }, Math.max(30, session.expiresIn - 60) * 1000);
+    return () => window.clearTimeout(timer);
+  }, [session]);
+
   const flushTapQueue = useCallback(async () => {
     if (!token || !state) return;
 
-    const taps = tapQueueRef.current;
-    tapQueueRef.current = 0;
+    const timestamps = tapQueueRef.current;
+    tapQueueRef.current = [];
     tapTimerRef.current = null;
-    if (taps <= 0) return;
+    if (timestamps.length === 0) return;
 
     try {
-      const response = await fetch(apiUrl('/api/clicker/tap'), {
+      const response = await fetch(apiUrl('/api/clicker/tap/batch'), {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
           Authorization: `Bearer ${token}`
         },
-        body: JSON.stringify({ taps })
+        body: JSON.stringify({ timestamps_ms: timestamps })
       });
       if (!response.ok) return;
       const data = (await response.json()) as {
@@ -238,11 +264,11 @@ export default function NmClickerMiniApp() {
     setTapPulse(true);
     window.setTimeout(() => setTapPulse(false), 160);
 
-    tapQueueRef.current += 1;
+    tapQueueRef.current.push(Date.now());
     if (tapTimerRef.current === null) {
       tapTimerRef.current = window.setTimeout(() => {
         void flushTapQueue();
-      }, 120);
+      }, 2000);
     }
   }, [flushTapQueue, state, token]);
 